@@ -0,0 +1,43 @@
+"""
+Compares hands scored per second by the per-rule loop against yahtzee.batch.
+
+Usage: python -m benchmarks.batch_scoring [hand count]
+"""
+import random
+import sys
+import time
+
+from yahtzee import batch
+from yahtzee.rules import standard_rules
+
+
+def per_object_loop(hands):
+    rules = standard_rules()
+    return [[rule.score(hand) for rule in rules] for hand in hands]
+
+
+def timed(label, count, fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<22} {count / elapsed:>14,.0f} hands/s  ({elapsed:.3f}s)')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(0)
+    hands = [[rng.randint(1, 6) for _ in range(5)] for _ in range(count)]
+
+    print(f'Scoring {count:,} hands against {len(standard_rules())} rules')
+    timed('Rule.calculate_value', count, per_object_loop, hands)
+    timed('score_batch (python)', count, batch.score_batch, hands, use_numpy=False)
+
+    if batch.np is not None:
+        array = batch.np.array(hands, dtype=batch.np.int8)
+        timed('score_batch (numpy)', count, batch.score_batch, array, use_numpy=True)
+    else:
+        print('score_batch (numpy)    skipped, NumPy is not installed')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares die faces drawn per second by random.randint against yahtzee.dice_rng.
+
+Usage: python -m benchmarks.dice_rng [face count]
+"""
+import sys
+import time
+from random import randint
+
+from yahtzee.dice_rng import DiceRNG, load_numpy
+from yahtzee.rules import standard_rules
+from yahtzee.simulation import new_game
+
+
+def timed(label, count, fn, unit='faces'):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28} {count / elapsed:>14,.0f} {unit}/s  ({elapsed:.3f}s)')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f'Drawing {count:,} die faces')
+    timed('randint(1, 6)', count, lambda: [randint(1, 6) for _ in range(count)])
+    for backend in ('python', 'numpy'):
+        if backend == 'numpy' and load_numpy() is None:
+            print('DiceRNG (numpy)              skipped, NumPy is not installed')
+            continue
+        rng = DiceRNG(0, block_size=65536, backend=backend)
+        timed(f'DiceRNG ({backend}).face', count, lambda: [rng.face() for _ in range(count)])
+        rng = DiceRNG(0, block_size=65536, backend=backend)
+        timed(f'DiceRNG ({backend}).roll(5)', count, lambda: [rng.roll(5) for _ in range(count // 5)])
+
+    rolls = count // 5
+    game = new_game(standard_rules())
+    game.rng = DiceRNG(0, block_size=65536)
+
+    def roll_game():
+        for _ in range(rolls):
+            game.roll_count = 0
+            game.roll()
+
+    timed('Game.roll (5 dice)', rolls, roll_game, 'rolls')
+
+
+if __name__ == '__main__':
+    main()
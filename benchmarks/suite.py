@@ -0,0 +1,356 @@
+"""
+Repeatable benchmarks of the hot paths, with baselines to catch regressions.
+
+Every benchmark is run a few times and its fastest run is kept, reported as seconds per
+operation. Results can be saved as a JSON baseline and later runs compared against it;
+a benchmark regresses when it's slower than the baseline by more than its threshold.
+
+Usage:
+    python -m benchmarks                                  run and print results
+    python -m benchmarks --save-baseline                  ... and save them as the baseline
+    python -m benchmarks --compare [--threshold 0.15] [--threshold game.roll=0.3]
+    python -m benchmarks --only rules                     run benchmarks whose name starts with "rules"
+    python -m benchmarks --verify [--compare]             first check every scorer against the rules
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from itertools import product
+from typing import Any, Callable, Dict, List, Tuple
+
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.rules import standard_rules
+from yahtzee.simulation import GreedyPolicy, new_game, play_game
+from yahtzee.ui import Backend
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALL_ROLLS = [list(roll) for roll in product(range(1, 7), repeat=5)]
+
+DEFAULT_THRESHOLD = 0.15
+
+# name -> (operations per run, function doing one run)
+Benchmark = Tuple[int, Callable[[], Any]]
+
+
+def rule_benchmarks() -> Dict[str, Benchmark]:
+    """Rule.calculate_value of every rule over all 7776 ordered rolls."""
+    def run(rule):
+        def score_all():
+            for roll in ALL_ROLLS:
+                rule.score(roll)
+        return score_all
+
+    return {f'rules.{rule.name}': (len(ALL_ROLLS), run(rule)) for rule in standard_rules()}
+
+
+def game_benchmarks() -> Dict[str, Benchmark]:
+    template = new_game(standard_rules())
+    cycles = 20_000
+
+    def roll_cycles():
+        game = template.fresh(DiceRNG(0))
+        for _ in range(cycles):
+            game.roll_count = 0
+            game.roll()
+            game.roll()
+            game.roll()
+
+    def lock_cycles():
+        for i in range(cycles // 13):
+            game = template.fresh(DiceRNG(i))
+            for rc in game.rule_controllers:
+                game.lock_in_rule(rc)
+
+    def headless_games():
+        for i in range(200):
+            play_game(template.fresh(DiceRNG(i)), GreedyPolicy())
+
+    return {
+        'game.roll': (3 * cycles, roll_cycles),
+        'game.lock_in_rule': (cycles // 13 * 13, lock_cycles),
+        'game.headless': (200, headless_games),
+    }
+
+
+class ScriptedBackend(Backend):
+    """Answers every prompt instantly: play, hold nothing, roll until forced to, then lock the first open rule."""
+
+    def table(self, rows: List[List[str]]) -> str:
+        return ''
+
+    def separator(self) -> Any:
+        return None
+
+    def prompt(self, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        question = questions[0]
+        if question['type'] == 'checkbox':
+            return {question['name']: []}
+
+        choices = [c for c in question['choices'] if c and not c.get('disabled')]
+        if question['name'] == 'selection':
+            return {'selection': choices[0]['value']}
+        names = [c['name'] for c in choices]
+        return {'next': choices[names.index('Roll') if 'Roll' in names else 0]['value']}
+
+
+def _counting(handler, counter: list):
+    def counted():
+        counter.append(1)
+        return handler()
+    return counted
+
+
+def state_machine_benchmarks() -> Dict[str, Benchmark]:
+    from main import State, StateMachine
+
+    template = new_game(standard_rules())
+    games = 20
+    counted = []
+
+    def transitions(count=False):
+        for i in range(games):
+            machine = StateMachine(template.fresh(DiceRNG(i)), ui=ScriptedBackend())
+            machine.current_state = State("STARTING_GAME", {})
+            if count:
+                machine.state_map = {name: _counting(handler, counted) for name, handler in machine.state_map.items()}
+            with contextlib.redirect_stdout(io.StringIO()):
+                machine.run()
+
+    transitions(count=True)
+    return {'state_machine.transitions': (len(counted), transitions)}
+
+
+def render_benchmarks() -> Dict[str, Benchmark]:
+    """TerminalRenderer.draw over every position of a few greedy games, as the player would see them."""
+    from yahtzee.render import TerminalRenderer
+
+    template = new_game(standard_rules())
+    policy = GreedyPolicy()
+    positions = []
+    for i in range(10):
+        game = template.fresh(DiceRNG(i))
+        game.roll()
+        while not game.game_over:
+            positions.append(game.copy())
+            if game.roll_count < 3:
+                game.hold_mask = sum(1 << d for d, hold in enumerate(policy.choose_holds(game)) if hold)
+                game.roll()
+            else:
+                game.lock_in_rule(policy.choose_rule(game))
+
+    def draw_all():
+        renderer = TerminalRenderer(io.StringIO(), rows=40)
+        for position in positions:
+            renderer.draw(position)
+
+    return {'render.draw': (len(positions), draw_all)}
+
+
+def odds_benchmarks() -> Dict[str, Benchmark]:
+    """OutcomeEngine.score_distributions for every hold of a set of rolls, cold and then memoized."""
+    from yahtzee.odds import OutcomeEngine
+    from yahtzee.scoring import ScoreTable
+
+    table = ScoreTable(standard_rules())
+    queries = [(roll, mask) for roll in ALL_ROLLS[::97] for mask in range(32)]
+    warm = OutcomeEngine(table)
+
+    def query_all(engine):
+        for roll, mask in queries:
+            engine.score_distributions(roll, mask, 2)
+
+    query_all(warm)
+    return {
+        'odds.cold': (len(queries), lambda: query_all(OutcomeEngine(table))),
+        'odds.memoized': (len(queries), lambda: query_all(warm)),
+    }
+
+
+def snapshot_benchmarks() -> Dict[str, Benchmark]:
+    """Taking and restoring snapshots of games partway through."""
+    from yahtzee.snapshot import restore, snapshot
+
+    template = new_game(standard_rules())
+    games = []
+    for i in range(1000):
+        game = template.fresh(DiceRNG(i))
+        game.roll()
+        for rc in game.rule_controllers[:i % 13]:
+            game.lock_in_rule(rc)
+        games.append(game)
+    records = [snapshot(game) for game in games]
+
+    def snapshot_all():
+        for game in games:
+            snapshot(game)
+
+    def restore_all():
+        for record in records:
+            restore(record, template)
+
+    return {
+        'snapshot.take': (len(games), snapshot_all),
+        'snapshot.restore': (len(records), restore_all),
+    }
+
+
+def env_benchmarks() -> Dict[str, Benchmark]:
+    """VectorEnv.step over 4096 games for whole turns, and the legal action masks."""
+    from yahtzee.env import N_HOLD_ACTIONS, VectorEnv, np
+
+    if np is None:
+        return {}
+    env = VectorEnv(4096, seed=0)
+    hold = np.full(env.num_envs, 0b00111)
+    locks = [np.full(env.num_envs, N_HOLD_ACTIONS + column) for column in range(len(env.table.rules))]
+
+    def play_game():
+        env.reset()
+        for lock in locks:
+            env.step(hold)
+            env.step(hold)
+            env.step(lock)
+
+    return {
+        'env.step': (3 * len(locks), play_game),
+        'env.action_masks': (100, lambda: [env.action_masks() for _ in range(100)]),
+    }
+
+
+def startup_benchmarks() -> Dict[str, Benchmark]:
+    """A fresh interpreter importing main, which is what the player waits for before the menu."""
+    def import_main():
+        subprocess.run([sys.executable, '-c', 'import main'], cwd=ROOT, check=True)
+
+    return {'startup.import_main': (1, import_main)}
+
+
+def all_benchmarks() -> Dict[str, Benchmark]:
+    benchmarks = {}
+    benchmarks.update(rule_benchmarks())
+    benchmarks.update(game_benchmarks())
+    benchmarks.update(state_machine_benchmarks())
+    benchmarks.update(render_benchmarks())
+    benchmarks.update(odds_benchmarks())
+    benchmarks.update(snapshot_benchmarks())
+    benchmarks.update(env_benchmarks())
+    benchmarks.update(startup_benchmarks())
+    return benchmarks
+
+
+def run(benchmarks: Dict[str, Benchmark], repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, (operations, fn) in benchmarks.items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        results[name] = {'seconds_per_op': best / operations, 'ops_per_sec': operations / best}
+        print(f'{name:<40} {operations / best:>14,.0f} ops/s', file=sys.stderr)
+    return results
+
+
+def parse_thresholds(values: List[str], default: float = DEFAULT_THRESHOLD) -> Tuple[float, Dict[str, float]]:
+    """
+    The default allowed slowdown and the per-benchmark ones, from --threshold values that
+    are either FRACTION or NAME=FRACTION. Raises ValueError on anything else.
+    """
+    thresholds = {}
+    for threshold in values:
+        name, _, value = threshold.rpartition('=')
+        try:
+            fraction = float(value)
+        except ValueError:
+            raise ValueError(f'Not a threshold: {threshold!r}, expected [NAME=]FRACTION.') from None
+        if not fraction >= 0:
+            raise ValueError(f'Not a threshold: {threshold!r}, the fraction must be 0 or more.')
+        if name:
+            thresholds[name] = fraction
+        else:
+            default = fraction
+    return default, thresholds
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            default_threshold: float, thresholds: Dict[str, float]) -> List[str]:
+    """Names of the benchmarks slower than their baseline by more than their threshold."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        threshold = thresholds.get(name, default_threshold)
+        change = result['seconds_per_op'] / baseline[name]['seconds_per_op'] - 1
+        marker = 'REGRESSED' if change > threshold else 'ok'
+        print(f'{name:<40} {change:+8.1%}  (threshold {threshold:.0%})  {marker}')
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths and compare against a baseline.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', default='', help='only run benchmarks whose name starts with this')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--threshold', action='append', default=[], metavar='[NAME=]FRACTION',
+                        help=f'allowed slowdown, for every benchmark or for one by name (default {DEFAULT_THRESHOLD})')
+    parser.add_argument('--output', help='also write the results as JSON to this file')
+    parser.add_argument('--verify', action='store_true',
+                        help='first check every fast scoring path against the rules on every roll '
+                             '(see yahtzee.verify), and stop if any disagrees')
+    args = parser.parse_args()
+
+    if args.verify:
+        from yahtzee.verify import format_report, verify
+
+        report = verify()
+        print(format_report(report))
+        if not report.ok:
+            sys.exit(1)
+
+    try:
+        default_threshold, thresholds = parse_thresholds(args.threshold)
+    except ValueError as e:
+        parser.error(str(e))
+
+    benchmarks = {name: b for name, b in all_benchmarks().items() if name.startswith(args.only)}
+    results = run(benchmarks, args.repeat)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        saved = {'results': {}}
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)
+        saved.update(report, results={**saved['results'], **results})
+        with open(args.baseline, 'w') as f:
+            json.dump(saved, f, indent=2)
+        print(f'Saved baseline to {args.baseline}')
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, default_threshold, thresholds):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,17 @@
+import argparse
 import sys
+import time
 from dataclasses import dataclass
-from typing import Dict, Callable, Optional
-
-import tabulate
-from inquirer2 import prompt, Separator
-
-from yahtzee.game import Game, IncompleteTurnError
-from yahtzee.rules import (Aces, Twos, Threes, Fours, Fives, Sixes, ThreeOfAKind, FourOfAKind, FullHouse, SmallStraight,
-                           LargeStraight, Yahtzee, Chance)
-
-rules = [
-    Aces(),
-    Twos(),
-    Threes(),
-    Fours(),
-    Fives(),
-    Sixes(),
-    ThreeOfAKind(),
-    FourOfAKind(),
-    FullHouse(),
-    SmallStraight(),
-    LargeStraight(),
-    Yahtzee(),
-    Chance()
-]
+from typing import TYPE_CHECKING, Dict, Callable, Optional
+
+from yahtzee.game import Game
+from yahtzee.session import CommandError, Session
+from yahtzee.ui import Backend, PlainBackend, default_backend
+
+if TYPE_CHECKING:
+    from yahtzee.advisor import Advisor
+    from yahtzee.metrics import Metrics
+    from yahtzee.render import TerminalRenderer
 
 
 @dataclass
@@ -39,10 +27,20 @@ class StateMachine:
     """
     current_state: State = State("PROMPTING_MAIN_MENU", {})
     game: Game
+    session: Session
+    ui: Backend
+    advisor: Optional["Advisor"]
+    renderer: Optional["TerminalRenderer"]
     state_map: Dict[str, Callable[[], Optional[State]]]
 
-    def __init__(self, game: Game):
+    def __init__(self, game: Game, advisor: Optional["Advisor"] = None, ui: Optional[Backend] = None,
+                 renderer: Optional["TerminalRenderer"] = None):
         self.game = game
+        self.session = Session(game)
+        self.advisor = advisor
+        self.renderer = renderer
+        self._locked_labels: Dict[int, str] = {}
+        self.ui = ui if ui is not None else default_backend()
         self.state_map = {
             "PROMPTING_MAIN_MENU": self.prompting_main_menu,
             "PROMPTING_INSTRUCTIONS": self.prompting_instructions,
@@ -56,7 +54,7 @@ class StateMachine:
 
     def starting_game(self) -> State:
         """Initial setup for the game."""
-        self.game.roll()
+        self.session.roll()
         return State("PROMPTING_GAME_MAIN", {})
 
     def prompting_main_menu(self) -> State:
@@ -68,7 +66,7 @@ class StateMachine:
         print("  \\_/\\__,_|_| |_|\\__/___\\___|\\___|")
         print("---")
 
-        answer = prompt.prompt([{
+        answer = self.ui.prompt([{
             "type": "list",
             "name": "next",
             "message": "What would you like to do?",
@@ -81,6 +79,10 @@ class StateMachine:
         return answer
 
     def display_dice(self):
+        if self.renderer:
+            self.renderer.draw(self.game)
+            return
+
         die_tbl_rows = [['In-Play'], ['Holding']]
         for dc in self.game.die_controllers:
             if not dc.holding:
@@ -92,10 +94,11 @@ class StateMachine:
 
         print("---")
         print("Dice:")
-        print(tabulate.tabulate(die_tbl_rows, tablefmt="fancy_grid"))
+        print(self.ui.table(die_tbl_rows))
         print("Turn:", self.game.locked_rules_count + 1,
               "Roll: ", self.game.roll_count,
-              "Score: ", self.game.score)
+              "Score: ", self.game.score,
+              "Bonus: ", self.game.scorecard.bonus)
         print("---")
 
     def prompting_instructions(self) -> State:
@@ -107,13 +110,13 @@ class StateMachine:
               "Scoring Categories have been locked in. The final score is the\n"
               "sum of the locked-in values, including any bonus points.")
         print("---")
-        input("Press ENTER to return...")
+        self.ui.pause("Press ENTER to return...")
         return State("PROMPTING_MAIN_MENU", {})
 
     def prompting_game_main(self) -> State:
         self.display_dice()
 
-        return prompt.prompt([{
+        return self.ui.prompt([{
             "type": "list",
             "name": "next",
             "message": "What would you like to do?",
@@ -125,30 +128,33 @@ class StateMachine:
         }]).get("next", State("TERMINATING", {"message": "Please select a valid option."}))
 
     def prompting_hold(self) -> State:
+        hold_values = self.advisor.hold_values() if self.advisor else None
+
         choices = []
-        for dc in self.game.die_controllers:
-            choices.append({"name": str(dc.value), "checked": dc.holding, "value": dc})
+        for i, dc in enumerate(self.game.die_controllers):
+            name = str(dc.value)
+            if hold_values:
+                name += f"  (hold: {hold_values[i][0]:.1f}, re-roll: {hold_values[i][1]:.1f})"
+            choices.append({"name": name, "checked": dc.holding, "value": dc})
 
-        answers = prompt.prompt([{
+        answers = self.ui.prompt([{
             "type": "checkbox",
             "name": "selections",
             "message": "Select/De-Select the dice you would like to hold/un-hold:",
             "choices": choices
         }])
+        if "selections" not in answers:
+            return State("TERMINATING", {"message": "No dice were selected."})
 
-        for dc in self.game.die_controllers:
-            if dc in answers["selections"]:
-                dc.holding = True
-            else:
-                dc.holding = False
+        self.session.hold(dc.die.index for dc in answers["selections"])
 
         return State("PROMPTING_GAME_MAIN", {})
 
     def rolling(self) -> State:
         try:
-            self.game.roll()
-        except IncompleteTurnError:
-            print("Lock in a rule before continuing to the next turn")
+            self.session.roll()
+        except CommandError as e:
+            print(e)
             return State("PROMPTING_RULES", {"selection_required": True})
 
         return State("PROMPTING_GAME_MAIN", {})
@@ -156,26 +162,38 @@ class StateMachine:
     def prompting_rules(self) -> State:
         self.display_dice()
 
+        rule_values = self.advisor.rule_values() if self.advisor else {}
+
         choices = []
         for rc in self.game.rule_controllers:
+            if rc.locked_in:
+                name = self._locked_labels.get(rc.column)
+                if name is None:
+                    name = self._locked_labels[rc.column] = f"{rc.rule_name} [{rc.locked_value}]"
+            else:
+                name = f"{rc.rule_name} [{rc.calculate_value()}]"
+            if rc in rule_values:
+                name += f"  (expected final: {rule_values[rc]:.1f})"
             choices.append({
-                "name": f"{rc.rule_name} [{(rc.locked_value or rc.calculate_value())}]",
+                "name": name,
                 "disabled": "LOCKED" if rc.locked_in else None,
                 "value": rc
             })
 
         if not self.current_state.context.get("selection_required", False):
-            choices.extend([Separator(), {"name": "Go Back", "value": "BACK"}])
+            choices.extend([self.ui.separator(), {"name": "Go Back", "value": "BACK"}])
 
-        answer = prompt.prompt([{
+        answer = self.ui.prompt([{
             "type": "list",
             "name": "selection",
             "message": "Select the rule you'd like to lock in:",
             "choices": choices
         }])
+        if "selection" not in answer:
+            return State("TERMINATING", {"message": "No rule was selected."})
 
         if answer["selection"] != "BACK":
-            self.game.lock_in_rule(answer["selection"])
+            self.session.lock(answer["selection"])
 
         return State("PROMPTING_GAME_MAIN", {})
 
@@ -184,30 +202,161 @@ class StateMachine:
             print(msg)
         sys.exit(0)
 
-    def run(self, verbose=False):
-        while not self.game.game_over:
-            next_state = self.current_state.next
-            if verbose:
-                print(next_state)
+    def run(self, verbose=False, metrics: Optional["Metrics"] = None):
+        if metrics is not None:
+            self._run_instrumented(verbose, metrics)
+        else:
+            while not self.game.game_over:
+                next_state = self.current_state.next
+                if verbose:
+                    print(next_state)
 
-            try:
-                self.current_state = self.state_map[next_state]()
-            except KeyError:
-                self.current_state = State("TERMINATING",
-                                           {"message": f"Not yet implemented: {next_state}"})
+                self.current_state = self._handler(next_state)()
 
+        if self.renderer:
+            self.renderer.close()
         print("Game Over!")
         print("Score:", self.game.score)
+        if self.advisor:
+            print(self.advisor.latency_summary())
+        if self.renderer:
+            print(self.renderer.summary())
+
+    def _handler(self, name: str) -> Callable[[], Optional[State]]:
+        """The handler of a state. Errors raised inside handlers aren't mistaken for missing states."""
+        try:
+            return self.state_map[name]
+        except KeyError:
+            return lambda: State("TERMINATING", {"message": f"Not yet implemented: {name}"})
+
+    def _run_instrumented(self, verbose: bool, metrics: "Metrics"):
+        """Same loop as run, recording each handler's calls and time, and game counters."""
+        from yahtzee.metrics import TimedBackend
+
+        ui = self.ui
+        self.ui = TimedBackend(ui, metrics)
+        self.game.metrics = metrics
+        try:
+            while not self.game.game_over:
+                next_state = self.current_state.next
+                if verbose:
+                    print(next_state)
+
+                blocked = metrics.blocked_seconds
+                start = time.perf_counter()
+                try:
+                    self.current_state = self._handler(next_state)()
+                finally:
+                    metrics.record_state(next_state, time.perf_counter() - start, metrics.blocked_seconds - blocked)
+            metrics.games += 1
+        finally:
+            self.ui = ui
+            self.game.metrics = None
+
+
+def load_advisor(game: Game, strategy_path: str) -> "Advisor":
+    """Advisor backed by the strategy file if it matches the rules, or by the heuristic otherwise."""
+    from yahtzee.advisor import Advisor
+    from yahtzee.strategy_file import StaleStrategyError, load
+
+    try:
+        return Advisor(game, load(strategy_path, game.score_table))
+    except (OSError, StaleStrategyError) as e:
+        print(f"No usable strategy file ({e}), advice will be approximate.")
+        return Advisor(game)
+
+
+def record_score(path: str, player: str, game: Game) -> None:
+    """Stores the finished game and shows where it ranks among the player's games."""
+    import sqlite3
+
+    from yahtzee.highscores import HighScores, HighScoreError
+
+    try:
+        with HighScores(path) as scores:
+            game_id = scores.record(player, game)
+            best = [result.id for result in scores.leaderboard(10, player)]
+    except (HighScoreError, sqlite3.Error) as e:
+        print(f"The score wasn't recorded: {e}")
+        return
+    if game_id in best:
+        print(f"#{best.index(game_id) + 1} of {player}'s best games!")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="A CLI game of Yahtzee.")
+    parser.add_argument("--advisor", action="store_true",
+                        help="show the expected final score of each choice")
+    parser.add_argument("--strategy", default="strategy.bin",
+                        help="solved strategy file used by the advisor (see yahtzee.strategy_file)")
+    parser.add_argument("--journal", help="append every roll, hold and lock of the game to this journal file")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="record per-state timings and counters, written on exit as JSON "
+                             "(or Prometheus text if FILE ends in .prom)")
+    parser.add_argument("--plain", action="store_true",
+                        help="use plain numbered menus instead of tabulate and inquirer2 (the default if they're missing)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep the dice and scorecard in a pane at the top and redraw only what changed "
+                             "(needs an ANSI terminal)")
+    parser.add_argument("--script", nargs="?", const="-", metavar="FILE",
+                        help="play without prompts: read JSONL commands from FILE (or stdin) and write JSONL events "
+                             "to stdout (see yahtzee.script)")
+    parser.add_argument("--scores", metavar="FILE",
+                        help="record the finished game in this high-score database (see yahtzee.highscores)")
+    parser.add_argument("--player", default="player", help="name to record the game under with --scores")
+    args = parser.parse_args()
+
+    from yahtzee.rules import standard_rules
+
     game = Game()
 
-    for rule in rules:
+    for rule in standard_rules():
         game.register_rule(rule)
 
-    game_runner = StateMachine(game)
-    game_runner.run()
+    journal = None
+    if args.journal:
+        from yahtzee.journal import Journal
+
+        journal = Journal(args.journal)
+
+    if args.script:
+        from yahtzee.script import run_script
+
+        try:
+            run_script(game, args.script, journal=journal)
+        finally:
+            if journal:
+                journal.close()
+        return
+
+    advisor = load_advisor(game, args.strategy) if args.advisor else None
+    if journal:
+        journal.record(game)
+
+    metrics = None
+    if args.metrics:
+        from yahtzee.metrics import Metrics
+
+        metrics = Metrics()
+
+    renderer = None
+    if args.incremental:
+        from yahtzee.render import TerminalRenderer
+
+        renderer = TerminalRenderer()
+
+    try:
+        game_runner = StateMachine(game, advisor, PlainBackend() if args.plain else None, renderer)
+        game_runner.run(metrics=metrics)
+        if args.scores and game.game_over:
+            record_score(args.scores, args.player, game)
+    finally:
+        if renderer:
+            renderer.close()
+        if journal:
+            journal.close()
+        if metrics:
+            metrics.write(args.metrics)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,58 @@
+import unittest
+
+from yahtzee import rules
+from yahtzee.advisor import Advisor
+from yahtzee.game import Game
+from yahtzee.rules import standard_rules
+from yahtzee.solver import solve
+
+
+def new_game(rule_list):
+    game = Game()
+    for rule in rule_list:
+        game.register_rule(rule)
+    for die, value in zip(game.dice, [6, 6, 6, 2, 3]):
+        die.value = value
+    game.roll_count = 1
+    return game
+
+
+class TestAdvisor(unittest.TestCase):
+    def test_solved_rule_values(self):
+        """
+        Rule values are the score now plus the solved value of the resulting scorecard
+        """
+        game = new_game([rules.Sixes(), rules.Chance()])
+        strategy = solve(game.score_table)
+        values = Advisor(game, strategy).rule_values()
+
+        self.assertAlmostEqual(18 + strategy.value(0b01), values[game.rule_controllers[0]])
+        self.assertAlmostEqual(23 + strategy.value(0b10), values[game.rule_controllers[1]])
+
+    def test_solved_hold_values(self):
+        """
+        The best of holding or re-rolling any die is the solved value of the position
+        """
+        game = new_game([rules.Sixes(), rules.Chance()])
+        strategy = solve(game.score_table)
+        values = Advisor(game, strategy).hold_values()
+
+        for held, rerolled in values:
+            self.assertAlmostEqual(game.expected_final_score(strategy), max(held, rerolled))
+        self.assertGreater(values[0][0], values[0][1])
+
+    def test_heuristic_fallback_is_fast(self):
+        """
+        Without a strategy, advice still comes back well within the prompt budget
+        """
+        advisor = Advisor(new_game(standard_rules()))
+        advisor.hold_values()
+        advisor.rule_values()
+
+        self.assertFalse(advisor.exact)
+        self.assertEqual(2, len(advisor.latencies))
+        self.assertLess(max(advisor.latencies), 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
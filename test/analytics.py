@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from yahtzee import analytics
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.journal import ROLL, Journal, iter_records
+from yahtzee.rules import Chance, standard_rules
+from yahtzee.simulation import ChaseYahtzeePolicy, new_game, play_game
+from yahtzee.snapshot import SnapshotError, save_all
+
+
+@unittest.skipIf(analytics.np is None, 'NumPy is not installed')
+class TestAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.template = new_game(standard_rules())
+        self.table = self.template.score_table
+        self.games = []
+        for part in range(2):
+            with Journal(self.path(part)) as journal:
+                for seed in range(part * 40, part * 40 + 40):
+                    game = self.template.fresh(DiceRNG(seed))
+                    journal.record(game)
+                    self.games.append(play_game(game, ChaseYahtzeePolicy()))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def path(self, part):
+        return os.path.join(self.dir.name, f'part-{part}.journal')
+
+    def assertMatchesGames(self, stats, games):
+        self.assertEqual(len(games), stats.games)
+        self.assertAlmostEqual(sum(g.score for g in games) / len(games), stats.mean_score)
+        self.assertEqual(sum(g.scorecard.upper_bonus > 0 for g in games), stats.upper_bonus_games)
+        self.assertEqual(sum(g.scorecard.yahtzee_bonuses for g in games), stats.yahtzee_bonuses)
+        for column, (name, rate) in enumerate(stats.zero_rates.items()):
+            self.assertEqual(self.table.rules[column].name, name)
+            self.assertAlmostEqual(sum(g.state.values[column] == 0 for g in games) / len(games), rate)
+
+    def test_journal_in_small_chunks(self):
+        """
+        Journal statistics match the games, however the records are chunked
+        """
+        for chunk_records in [7, 1000]:
+            stats = analytics.analyze_journal(self.path(0), self.table, chunk_records)
+            self.assertMatchesGames(stats, self.games[:40])
+            rolls = sum(kind == ROLL for _, kind, *_ in iter_records(self.path(0)))
+            self.assertAlmostEqual(rolls / (40 * 13), stats.rolls_per_turn)
+            self.assertGreater(stats.records_per_second, 0)
+
+    def test_merged_files(self):
+        """
+        Aggregating files separately and merging matches the games across both
+        """
+        stats = list(analytics.analyze([self.path(0), self.path(1)], self.table, workers=1, chunk_records=100))[-1]
+        self.assertMatchesGames(stats, self.games)
+        self.assertEqual(sum(os.path.getsize(self.path(p)) for p in range(2)) // 16, stats.records)
+
+    def test_snapshots(self):
+        """
+        Finished games in a snapshot file give the same statistics, without rolls
+        """
+        path = os.path.join(self.dir.name, 'games.snap')
+        unfinished = self.template.fresh(DiceRNG(1))
+        unfinished.roll()
+        save_all(path, self.games + [unfinished])
+
+        stats = analytics.analyze_file(path, self.table, chunk_records=9)
+        self.assertMatchesGames(stats, self.games)
+        self.assertEqual(len(self.games) + 1, stats.records)
+        self.assertIsNone(stats.rolls_per_turn)
+        self.assertEqual(sorted(g.score for g in self.games)[len(self.games) // 2 - 1],
+                         stats.score_percentile(0.5))
+
+        with self.assertRaises(SnapshotError):
+            analytics.analyze_snapshots(path, new_game([Chance()]).score_table)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
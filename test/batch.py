@@ -0,0 +1,44 @@
+import unittest
+from itertools import product
+
+from yahtzee import batch
+from yahtzee.rules import standard_rules
+
+ALL_ROLLS = [list(roll) for roll in product(range(1, 7), repeat=5)]
+
+
+def reference_scores(hands):
+    rules = standard_rules()
+    return [[rule.score(hand) for rule in rules] for hand in hands]
+
+
+class TestBatchScoring(unittest.TestCase):
+    def test_python_matches_reference(self):
+        """
+        Pure-Python batch scores match the rules for every ordered roll
+        """
+        self.assertEqual(reference_scores(ALL_ROLLS), batch.score_batch(ALL_ROLLS, use_numpy=False))
+
+    @unittest.skipIf(batch.np is None, 'NumPy is not installed')
+    def test_numpy_matches_reference(self):
+        """
+        NumPy batch scores match the rules for every ordered roll
+        """
+        hands = batch.np.array(ALL_ROLLS, dtype=batch.np.int8)
+        scores = batch.score_batch(hands, use_numpy=True)
+
+        self.assertEqual((7776, 13), scores.shape)
+        self.assertEqual(reference_scores(ALL_ROLLS), scores.tolist())
+
+    def test_rejects_invalid_hands(self):
+        """
+        Hands with the wrong size or out-of-range values are rejected
+        """
+        self.assertRaises(ValueError, batch.score_batch, [[1, 2, 3, 4]], use_numpy=False)
+        self.assertRaises(ValueError, batch.score_batch, [[0, 2, 3, 4, 5]], use_numpy=False)
+        if batch.np is not None:
+            self.assertRaises(ValueError, batch.score_batch, batch.np.array([[7, 1, 1, 1, 1]]), use_numpy=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
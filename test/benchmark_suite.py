@@ -0,0 +1,57 @@
+import contextlib
+import io
+import unittest
+
+from benchmarks.suite import DEFAULT_THRESHOLD, compare, parse_thresholds
+
+
+def result(seconds):
+    return {'seconds_per_op': seconds, 'ops_per_sec': 1 / seconds}
+
+
+class TestCompare(unittest.TestCase):
+    def compare(self, results, baseline, thresholds=None):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            regressions = compare(results, baseline, DEFAULT_THRESHOLD, thresholds or {})
+        return regressions, out.getvalue()
+
+    def test_regression(self):
+        """
+        A benchmark slower than its baseline by more than its threshold regresses, and no more than that doesn't
+        """
+        baseline = {'a': result(1.0), 'b': result(1.0)}
+        regressions, out = self.compare({'a': result(1.2), 'b': result(1.1)}, baseline)
+        self.assertEqual(['a'], regressions)
+        self.assertIn('REGRESSED', out)
+        self.assertEqual([], self.compare({'a': result(1.2)}, baseline, {'a': 0.25})[0])
+
+    def test_improvement(self):
+        """
+        A faster benchmark passes, however much faster it got
+        """
+        regressions, out = self.compare({'a': result(0.5)}, {'a': result(1.0)})
+        self.assertEqual([], regressions)
+        self.assertIn('-50.0%', out)
+
+    def test_missing_baseline(self):
+        """
+        Benchmarks the baseline doesn't have are skipped rather than failed
+        """
+        regressions, out = self.compare({'new': result(9.0), 'a': result(1.0)}, {'a': result(1.0)})
+        self.assertEqual([], regressions)
+        self.assertNotIn('new', out)
+
+    def test_parse_thresholds(self):
+        """
+        Thresholds set the default or one benchmark's, and anything but a fraction of 0 or more is rejected
+        """
+        self.assertEqual((DEFAULT_THRESHOLD, {}), parse_thresholds([]))
+        self.assertEqual((0.3, {'game.roll': 0.5, 'rules.A=B': 0.1}),
+                         parse_thresholds(['game.roll=0.5', '0.3', 'rules.A=B=0.1']))
+        for bad in ['fast', 'game.roll=', 'game.roll=x', '-0.1', 'nan']:
+            with self.assertRaises(ValueError):
+                parse_thresholds([bad])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,80 @@
+import unittest
+
+from yahtzee.dice_rng import DiceRNG, load_numpy
+from yahtzee.rules import standard_rules
+from yahtzee.simulation import GreedyPolicy, new_game, play_game
+
+
+class TestDiceRNG(unittest.TestCase):
+    def test_same_seed_same_faces(self):
+        """
+        Streams with the same seed hand out the same faces, whatever the block size
+        """
+        first = [DiceRNG(42, block_size=7).face() for _ in range(3)]
+        self.assertEqual(first, [DiceRNG(42, block_size=7).face()] * 3)
+        self.assertEqual(DiceRNG(42, block_size=7).roll(50), DiceRNG(42, block_size=7).roll(50))
+        self.assertTrue(all(1 <= f <= 6 for f in DiceRNG(1).roll(1000)))
+
+    def test_position_resumes_stream(self):
+        """
+        A stream started at a position continues where another left off
+        """
+        rng = DiceRNG(3, block_size=16)
+        rng.roll(37)
+        self.assertEqual(37, rng.position)
+        self.assertEqual(rng.copy().roll(40), rng.roll(40))
+
+    def test_copy_of_started_stream(self):
+        """
+        A copy of a stream that has rolled carries on from its generator state, independently of the original
+        """
+        for backend in ['python'] + (['numpy'] if load_numpy() is not None else []):
+            rng = DiceRNG(4, block_size=32, backend=backend)
+            rng.roll(1000)
+            copy = rng.copy()
+            self.assertIsNotNone(copy._generator)
+            self.assertEqual(rng.position, copy.position)
+            ahead = copy.roll(100)
+            self.assertEqual(ahead, rng.roll(100))
+            self.assertEqual(DiceRNG(4, block_size=32, backend=backend, position=1100).roll(50), copy.roll(50))
+
+    def test_spawned_streams_differ(self):
+        """
+        Substreams are reproducible but not copies of each other
+        """
+        children = DiceRNG(5).spawn(3)
+        self.assertEqual([c.seed for c in children], [c.seed for c in DiceRNG(5).spawn(3)])
+        self.assertEqual(3, len({tuple(c.roll(20)) for c in children}))
+
+    def test_copy_continues_spawning(self):
+        """
+        A copy spawns the substreams its original would next, not the ones it already handed out
+        """
+        original = DiceRNG(5)
+        handed_out = {c.seed for c in original.spawn(2)}
+        copy = original.copy()
+        self.assertEqual(2, copy.spawned)
+        self.assertEqual([c.seed for c in original.spawn(2)], [c.seed for c in copy.spawn(2)])
+        self.assertFalse(handed_out & {c.seed for c in copy.spawn(2)})
+
+    @unittest.skipIf(load_numpy() is None, 'NumPy is not installed')
+    def test_numpy_backend(self):
+        """
+        The numpy backend is reproducible too
+        """
+        self.assertEqual(DiceRNG(9, backend='numpy').roll(300), DiceRNG(9, backend='numpy').roll(300))
+
+    def test_seed_replays_game(self):
+        """
+        The same seed always replays the same game
+        """
+        template = new_game(standard_rules())
+        first = play_game(template.fresh(DiceRNG(11)), GreedyPolicy())
+        second = play_game(template.fresh(DiceRNG(11)), GreedyPolicy())
+
+        self.assertEqual(first.state.values, second.state.values)
+        self.assertEqual(first.dice_values, second.dice_values)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
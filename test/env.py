@@ -0,0 +1,105 @@
+import unittest
+
+from yahtzee import env as vector_env
+from yahtzee.env import N_HOLD_ACTIONS, IllegalActionError, VectorEnv
+from yahtzee.hands import hand_index
+from yahtzee.scorecard import UPPER_BONUS, YAHTZEE_BONUS, Scorecard
+
+np = vector_env.np
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestVectorEnv(unittest.TestCase):
+    def setUp(self):
+        self.env = VectorEnv(64, seed=3)
+        self.table = self.env.table
+
+    def set_dice(self, dice):
+        self.env.dice = np.array([dice] * self.env.num_envs, dtype=np.int8)
+
+    def lock(self, name):
+        column = next(c for c, rule in enumerate(self.table.rules) if rule.name == name)
+        return self.env.step(np.full(self.env.num_envs, VectorEnv.lock_action(column)))
+
+    def test_random_play_matches_scorecards(self):
+        """
+        Masks, rewards and final scores agree with the rules and Scorecard over random legal play
+        """
+        rng = np.random.default_rng(0)
+        cards = [Scorecard() for _ in range(self.env.num_envs)]
+        locked = [0] * self.env.num_envs
+        finished = 0
+        observations, _ = self.env.reset()
+        while finished < 3 * self.env.num_envs:
+            masks = self.env.action_masks()
+            for i, card in enumerate(cards):
+                rolls_left = int(observations['rolls_left'][i])
+                self.assertEqual([rolls_left > 0] * N_HOLD_ACTIONS, masks[i, :N_HOLD_ACTIONS].tolist())
+                self.assertEqual([not locked[i] >> c & 1 for c in range(13)], masks[i, N_HOLD_ACTIONS:].tolist())
+            actions = (rng.random(masks.shape) * masks).argmax(axis=1)
+
+            dice = observations['dice'].tolist()
+            observations, rewards, terminated, truncated, info = self.env.step(actions)
+            self.assertFalse(truncated.any())
+            for i, card in enumerate(cards):
+                if actions[i] < N_HOLD_ACTIONS:
+                    self.assertEqual(0, rewards[i])
+                    continue
+                column = int(actions[i]) - N_HOLD_ACTIONS
+                before = card.score
+                card.record(self.table, column, self.table.rules[column].score(dice[i]), hand_index(dice[i]))
+                locked[i] |= 1 << column
+                self.assertEqual(card.score - before, rewards[i])
+                self.assertEqual(card.filled == 13, terminated[i])
+                if terminated[i]:
+                    self.assertEqual(card.score, info['final_score'][i])
+                    cards[i] = Scorecard()
+                    locked[i] = 0
+                    finished += 1
+                self.assertEqual(locked[i], observations['locked'][i])
+
+    def test_bonuses(self):
+        """
+        Locks that reach 63 in the upper section or add a Yahtzee to a scored one earn their bonuses
+        """
+        self.set_dice([6, 6, 6, 6, 6])
+        self.assertTrue((self.lock('Yahtzee (5 of a Kind)')[1] == 50).all())
+        self.set_dice([6, 6, 6, 6, 6])
+        self.assertTrue((self.lock('Sixes')[1] == 30 + YAHTZEE_BONUS).all())
+        for value, name in [(5, 'Fives'), (3, 'Threes'), (4, 'Fours')]:
+            self.set_dice([value] * 3 + [1, 2])
+            rewards = self.lock(name)[1]
+        self.assertTrue((rewards == 12 + UPPER_BONUS).all())
+
+    def test_illegal_actions(self):
+        """
+        Rolling with no rolls left or locking a locked rule raises and changes nothing
+        """
+        self.lock('Chance')
+        dice = self.env.dice
+        with self.assertRaises(IllegalActionError):
+            self.lock('Chance')
+        self.assertIs(dice, self.env.dice)
+        self.env.step(np.zeros(self.env.num_envs))
+        self.env.step(np.zeros(self.env.num_envs))
+        with self.assertRaises(IllegalActionError):
+            self.env.step(np.zeros(self.env.num_envs))
+        self.assertFalse(self.env.rolls_left.any())
+        with self.assertRaises(IllegalActionError):
+            self.env.step(np.full(self.env.num_envs, self.env.n_actions))
+
+    def test_holds_keep_dice_and_seeds_repeat(self):
+        """
+        Held dice stay put, and reseeding plays out the same dice again
+        """
+        first, _ = self.env.reset(seed=7)
+        after, *_ = self.env.step(np.full(self.env.num_envs, 0b10110))
+        self.assertTrue((first['dice'][:, [1, 2, 4]] == after['dice'][:, [1, 2, 4]]).all())
+        self.assertEqual(1, after['rolls_left'][0])
+
+        again, _ = self.env.reset(seed=7)
+        self.assertTrue((first['dice'] == again['dice']).all())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
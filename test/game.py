@@ -0,0 +1,96 @@
+import unittest
+
+from yahtzee import rules
+from yahtzee.game import Game, IncompleteTurnError
+
+
+def new_game():
+    game = Game()
+    for rule in [rules.Sixes(), rules.Yahtzee(), rules.Chance()]:
+        game.register_rule(rule)
+    return game
+
+
+class TestGameState(unittest.TestCase):
+    def test_views_share_state(self):
+        """
+        Dice and controllers read and write the game's compact state
+        """
+        game = new_game()
+        for die, value in zip(game.dice, [6, 6, 1, 2, 6]):
+            die.value = value
+        game.die_controllers[1].holding = True
+
+        self.assertEqual((6, 6, 1, 2, 6), game.dice_values)
+        self.assertEqual(0b00010, game.hold_mask)
+        self.assertEqual(6, game.die_controllers[4].value)
+        self.assertEqual(18, game.rule_controllers[0].calculate_value())
+
+    def test_die_values_are_validated(self):
+        """
+        A die can't be set outside of its faces
+        """
+        game = new_game()
+        with self.assertRaises(ValueError):
+            game.dice[0].value = 7
+        with self.assertRaises(ValueError):
+            game.dice[0].value = 0
+
+    def test_held_dice_keep_their_values(self):
+        """
+        Rolling only changes the dice that aren't held
+        """
+        game = new_game()
+        for die, value in zip(game.dice, [3, 4, 5, 6, 2]):
+            die.value = value
+        game.hold_mask = 0b10101
+
+        for _ in range(3):
+            game.roll()
+            self.assertEqual((3, 5, 2), game.dice_values[::2])
+        self.assertRaises(IncompleteTurnError, game.roll)
+
+    def test_lock_in_rule(self):
+        """
+        Locking in a rule records its value and starts the next turn
+        """
+        game = new_game()
+        for die in game.dice:
+            die.value = 4
+        game.lock_in_rule(game.rule_controllers[1])
+
+        self.assertTrue(game.rule_controllers[1].locked_in)
+        self.assertEqual(50, game.rule_controllers[1].locked_value)
+        self.assertEqual(50, game.score)
+        self.assertEqual(1, game.roll_count)
+        self.assertEqual(0b010, game.locked_mask)
+        self.assertEqual(1, game.locked_rules_count)
+        self.assertFalse(game.game_over)
+
+    def test_copies_are_independent(self):
+        """
+        A copied game shares the rules but none of the state
+        """
+        game = new_game()
+        game.roll()
+        copy = game.copy()
+        copy.lock_in_rule(copy.rule_controllers[2])
+
+        self.assertIs(game.score_table, copy.score_table)
+        self.assertEqual(0, game.locked_mask)
+        self.assertEqual(0b100, copy.locked_mask)
+
+    def test_register_rule_does_not_affect_other_games(self):
+        """
+        Registering a rule on one game leaves games sharing its table alone
+        """
+        game = new_game()
+        other = game.fresh()
+        other.register_rule(rules.Aces())
+
+        self.assertEqual(3, len(game.rule_controllers))
+        self.assertEqual(4, len(other.rule_controllers))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
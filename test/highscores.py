@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.highscores import DAY, HighScoreError, HighScores
+from yahtzee.rules import Chance, standard_rules
+from yahtzee.simulation import GreedyPolicy, new_game, play_game, run_shard
+
+
+class TestHighScores(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'scores.db')
+        self.template = new_game(standard_rules())
+        self.scores = HighScores(self.path)
+
+    def tearDown(self):
+        self.scores.close()
+        self.dir.cleanup()
+
+    def play(self, seed):
+        return play_game(self.template.fresh(DiceRNG(seed)), GreedyPolicy())
+
+    def test_round_trip(self):
+        """
+        Stored games come back with their score, bonus, seed and every locked value
+        """
+        game = self.play(1 << 63 | 5)
+        game_id = self.scores.record('ann', game, played_at=1000.5)
+        self.assertEqual(2, self.scores.record_many([('bob', self.play(s)) for s in (1, 2)], batch_size=1))
+
+        result, = [r for r in self.scores.top(3) if r.id == game_id]
+        self.assertEqual(('ann', game.score, game.scorecard.bonus, 1 << 63 | 5, 1000.5),
+                         (result.player, result.score, result.bonus, result.seed, result.played_at))
+        self.assertEqual({rc.rule_name: rc.locked_value for rc in game.rule_controllers}, result.values)
+        self.assertEqual(3, self.scores.count())
+        self.assertEqual(2, self.scores.count('bob'))
+
+    def test_top_queries(self):
+        """
+        Top-K overall, per player and over a date range agree with sorting every game
+        """
+        games = [(['ann', 'bob', 'cy'][seed % 3], self.play(seed), seed * DAY / 3) for seed in range(30)]
+        for player, game, played_at in games:
+            self.scores.record(player, game, played_at)
+
+        def expected(k, player=None, since=float('-inf'), until=float('inf')):
+            rows = sorted((-g.score, i) for i, (p, g, at) in enumerate(games)
+                          if player in (None, p) and since <= at < until)
+            return [-score for score, _ in rows[:k]]
+
+        self.assertEqual(expected(5), [r.score for r in self.scores.top(5)])
+        self.assertEqual(expected(4, 'bob'), [r.score for r in self.scores.top(4, 'bob')])
+        for since, until in [(DAY, 4 * DAY), (1.5 * DAY, 2.5 * DAY), (9 * DAY, 20 * DAY), (-DAY, 0)]:
+            self.assertEqual(expected(6, None, since, until),
+                             [r.score for r in self.scores.top(6, since=since, until=until)])
+        self.assertEqual(expected(3, 'cy', since=2 * DAY),
+                         [r.score for r in self.scores.top(3, 'cy', since=2 * DAY)])
+        self.assertEqual(list(range(3, 9)), [r.seed for r in self.scores.games_between(DAY, 3 * DAY)])
+
+    def test_leaderboard_cache(self):
+        """
+        The leaderboard is served from the cache until this or another connection writes
+        """
+        self.scores.record('ann', self.play(1))
+        first = self.scores.leaderboard(5)
+        self.assertIs(first, self.scores.leaderboard(5))
+
+        self.scores.record('ann', self.play(2))
+        self.assertEqual(2, len(self.scores.leaderboard(5)))
+
+        second = self.scores.leaderboard(5)
+        with HighScores(self.path) as other:
+            other.record('bob', self.play(3))
+        third = self.scores.leaderboard(5)
+        self.assertIsNot(second, third)
+        self.assertEqual(3, len(third))
+
+    def test_rejected_games(self):
+        """
+        Unfinished games and games with other rules than the store's aren't recorded
+        """
+        with self.assertRaises(HighScoreError):
+            self.scores.record('ann', self.template.fresh(DiceRNG(1)))
+        self.scores.record('ann', self.play(1))
+        other = play_game(new_game([Chance()]).fresh(DiceRNG(1)), GreedyPolicy())
+        with self.assertRaises(HighScoreError):
+            self.scores.record_many([('bob', self.play(2)), ('bob', other)])
+        self.assertEqual(1, self.scores.count())
+
+    def test_simulated_games_are_recorded(self):
+        """
+        A simulation shard records every game it plays under the policy's name
+        """
+        stats = run_shard(GreedyPolicy(), standard_rules(), 20, 7, scores_path=self.path)
+        results = self.scores.top(20)
+        self.assertEqual({'GreedyPolicy'}, {r.player for r in results})
+        self.assertEqual(20, len(results))
+        self.assertAlmostEqual(stats.mean, sum(r.score for r in results) / 20)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
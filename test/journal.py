@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.journal import END, LOCK, NEW, RECORD, Journal, JournalError, iter_records, replay_games, replay_scores
+from yahtzee.rules import standard_rules, variant_rules
+from yahtzee.simulation import GreedyPolicy, new_game, play_game
+from yahtzee.variant import Variant
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'games.journal')
+        self.template = new_game(standard_rules())
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def play(self, seeds):
+        games = []
+        with Journal(self.path, buffer_records=16) as journal:
+            for seed in seeds:
+                game = self.template.fresh(DiceRNG(seed))
+                journal.record(game)
+                games.append(play_game(game, GreedyPolicy()))
+        return games
+
+    def test_replay_scores(self):
+        """
+        Journaled games re-score to their recorded results
+        """
+        games = self.play([1, 2, 3])
+        results = list(replay_scores(self.path, self.template.score_table))
+
+        self.assertEqual([g.score for g in games], [r.score for r in results])
+        self.assertEqual([0, 0, 0], [r.mismatches for r in results])
+
+    def test_replay_games(self):
+        """
+        Replaying through Game reproduces every roll and locked value
+        """
+        games = self.play([4, 5])
+        replayed = list(replay_games(self.path, self.template))
+
+        for original, (game, result) in zip(games, replayed):
+            self.assertEqual(0, result.mismatches)
+            self.assertEqual(original.state.values, game.state.values)
+
+    def test_detects_tampering(self):
+        """
+        A locked value that doesn't match its dice is reported
+        """
+        self.play([6])
+        records = list(iter_records(self.path))
+        i = next(i for i, r in enumerate(records) if r[1] == LOCK)
+        game_id, kind, a, b, payload = records[i]
+        with open(self.path, 'r+b') as f:
+            f.seek(i * RECORD.size)
+            f.write(RECORD.pack(game_id, kind, a, b + 1, payload))
+
+        self.assertEqual(2, next(replay_scores(self.path, self.template.score_table)).mismatches)
+
+    def test_game_ids_unique_across_appends(self):
+        """
+        Appending to an existing journal keeps game ids unique
+        """
+        self.play([7])
+        self.play([8])
+        ids = [r[0] for r in iter_records(self.path) if r[1] == NEW]
+        self.assertEqual(2, len(set(ids)))
+
+    def test_partial_record_closes_the_file(self):
+        """
+        Opening a journal that ends with a partial record raises without leaking the file
+        """
+        with mock.patch('builtins.open', mock.mock_open()) as opened:
+            opened.return_value.tell.return_value = RECORD.size + 3
+            self.assertRaises(JournalError, Journal, self.path)
+        opened.return_value.close.assert_called_once_with()
+
+    def test_nothing_after_end(self):
+        """
+        Each game's END is its last record, even though finishing releases the held dice
+        """
+        self.play([9, 10])
+        records = list(iter_records(self.path))
+        for game_id in {r[0] for r in records}:
+            self.assertEqual(END, [r[1] for r in records if r[0] == game_id][-1])
+
+    def test_rejects_streams_replay_cant_recreate(self):
+        """
+        Games rolling from another block size or an rng that has already rolled aren't journaled
+        """
+        used = DiceRNG(1)
+        used.roll(3)
+        with Journal(self.path) as journal:
+            for rng in [DiceRNG(1, block_size=64), used]:
+                self.assertRaises(JournalError, journal.record, self.template.fresh(rng))
+
+    def test_rejects_too_many_dice(self):
+        """
+        Variants whose hold masks don't fit a record can't be journaled
+        """
+        game = new_game(variant_rules(9, 2), Variant(9, 2)).fresh(DiceRNG(1, faces=2))
+        with Journal(self.path) as journal:
+            self.assertRaises(JournalError, journal.record, game)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,100 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from main import State, StateMachine
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.metrics import Metrics
+from yahtzee.rules import standard_rules
+from yahtzee.simulation import new_game
+from yahtzee.ui import Backend
+
+
+class LockFirstBackend(Backend):
+    """Rolls once per turn, then locks the first open rule."""
+
+    def table(self, rows):
+        return ''
+
+    def separator(self):
+        return None
+
+    def prompt(self, questions):
+        choices = [c for c in questions[0]['choices'] if c and not c.get('disabled')]
+        if questions[0]['name'] == 'selection':
+            return {'selection': choices[0]['value']}
+        return {'next': State("PROMPTING_RULES", {})}
+
+
+def play(metrics=None):
+    machine = StateMachine(new_game(standard_rules()).fresh(DiceRNG(1)), ui=LockFirstBackend())
+    machine.current_state = State("STARTING_GAME", {})
+    with contextlib.redirect_stdout(io.StringIO()):
+        machine.run(metrics=metrics)
+    return machine
+
+
+class TestMetrics(unittest.TestCase):
+    def test_counts_states_and_game_events(self):
+        """
+        An instrumented run counts every handler call, roll and rule calculation
+        """
+        metrics = Metrics()
+        machine = play(metrics)
+
+        self.assertEqual(1, metrics.state_calls["STARTING_GAME"])
+        self.assertEqual(13, metrics.state_calls["PROMPTING_RULES"])
+        self.assertEqual(13, metrics.state_calls["PROMPTING_GAME_MAIN"])
+        self.assertEqual(13, metrics.rolls)
+        # Every prompt calculates each open rule, and each locked rule that scored zero.
+        self.assertGreaterEqual(metrics.calculate_value_calls, sum(range(1, 14)))
+        self.assertLessEqual(metrics.calculate_value_calls, 13 * 13)
+        self.assertEqual(1, metrics.games)
+        self.assertIsNone(machine.game.metrics)
+        for state, seconds in metrics.state_seconds.items():
+            self.assertGreaterEqual(seconds, metrics.input_seconds[state])
+
+    def test_uninstrumented_run_plays_the_same(self):
+        """
+        Instrumentation doesn't change how the game is played
+        """
+        self.assertEqual(play().game.state.values, play(Metrics()).game.state.values)
+
+    def test_handler_errors_are_not_missing_states(self):
+        """
+        A KeyError raised inside a handler propagates, with or without metrics, instead of reading as a missing state
+        """
+        def broken():
+            raise KeyError("selections")
+
+        for metrics in (None, Metrics()):
+            machine = StateMachine(new_game(standard_rules()).fresh(DiceRNG(1)), ui=LockFirstBackend())
+            machine.state_map["PROMPTING_MAIN_MENU"] = broken
+            with contextlib.redirect_stdout(io.StringIO()), self.assertRaises(KeyError):
+                machine.run(metrics=metrics)
+
+    def test_exports(self):
+        """
+        Metrics are written as JSON or Prometheus text depending on the file name
+        """
+        metrics = Metrics()
+        play(metrics)
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "metrics.json")
+            prom_path = os.path.join(directory, "metrics.prom")
+            metrics.write(json_path)
+            metrics.write(prom_path)
+
+            with open(json_path) as f:
+                self.assertEqual(13, json.load(f)["rolls_per_game"])
+            with open(prom_path) as f:
+                text = f.read()
+        self.assertIn('yahtzee_state_calls_total{state="PROMPTING_RULES"} 13', text)
+        self.assertIn("yahtzee_rolls_total 13", text)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
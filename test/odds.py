@@ -0,0 +1,89 @@
+import unittest
+from collections import Counter
+from itertools import product
+
+from yahtzee import rules
+from yahtzee.hands import HAND_INDEX
+from yahtzee.odds import OutcomeEngine, expected, keep_of, strategy_policy, transitions
+from yahtzee.rules import standard_rules
+from yahtzee.scoring import ScoreTable
+from yahtzee.simulation import new_game
+from yahtzee.solver import solve
+
+
+class TestOutcomeEngine(unittest.TestCase):
+    def setUp(self):
+        self.table = ScoreTable(standard_rules())
+        self.engine = OutcomeEngine(self.table)
+
+    def brute_force(self, dice, hold_mask):
+        """Final hand counts over every way the unheld dice can land."""
+        held = [v for i, v in enumerate(dice) if hold_mask >> i & 1]
+        counts = Counter(HAND_INDEX[tuple(sorted(held + list(roll)))]
+                         for roll in product(range(1, 7), repeat=len(dice) - len(held)))
+        return {hand: n / 6 ** (len(dice) - len(held)) for hand, n in counts.items()}
+
+    def test_transitions_are_distributions(self):
+        """
+        Every keep's transition sums to one, and keeping nothing reaches every hand
+        """
+        for hands, probs in transitions():
+            self.assertAlmostEqual(1.0, sum(probs))
+        self.assertEqual(252, len(transitions()[keep_of([1, 2, 3, 4, 5], 0)][0]))
+
+    def test_matches_brute_force(self):
+        """
+        Hand distributions match enumerating every roll of the unheld dice
+        """
+        for dice, mask in [([1, 2, 3, 4, 5], 0), ([6, 6, 2, 6, 1], 0b01011), ([3, 3, 3, 3, 4], 0b01111)]:
+            dist = self.engine.hand_distribution(dice, mask, 1)
+            expected_dist = self.brute_force(dice, mask)
+            self.assertEqual(set(expected_dist), set(dist))
+            for hand, p in expected_dist.items():
+                self.assertAlmostEqual(p, dist[hand])
+
+    def test_score_distributions(self):
+        """
+        Rule scores follow from the hands: holding four 6s, Yahtzee scores a sixth of the time
+        """
+        scores = self.engine.score_distributions([6, 6, 6, 6, 2], 0b01111, 2)
+        yahtzee = scores[11]
+        self.assertAlmostEqual(1 / 6, yahtzee[50])
+        self.assertAlmostEqual(24 + 3.5, expected(scores[12]))
+
+        self.assertEqual([{v: 1.0} for v in self.table.row(HAND_INDEX[(2, 6, 6, 6, 6)])],
+                         self.engine.score_distributions([6, 6, 6, 6, 2], 0b01111, 0))
+
+    def test_fixed_hold_only_next_roll_counts(self):
+        """
+        Without a policy, more rolls left doesn't change the odds, and repeats are memoized
+        """
+        one = self.engine.hand_distribution([1, 1, 4, 5, 6], 0b00011, 1)
+        self.assertEqual(one, self.engine.hand_distribution([1, 1, 4, 5, 6], 0b00011, 3))
+        self.assertIs(self.engine.score_distributions([1, 1, 2, 2, 2], 0b00011, 2),
+                      self.engine.score_distributions([1, 1, 5, 6, 6], 0b00011, 2))
+
+    def test_strategy_policy(self):
+        """
+        Following the solved Chance strategy from an empty keep averages 70/3
+        """
+        table = ScoreTable([rules.Chance()])
+        engine = OutcomeEngine(table, strategy_policy(solve(table), 0))
+        scores = engine.score_distributions([1, 1, 1, 1, 1], 0, 3)
+        self.assertAlmostEqual(70 / 3, expected(scores[0]))
+        self.assertAlmostEqual(1.0, sum(scores[0].values()))
+
+    def test_game_odds(self):
+        """
+        A game's odds use its dice, holds and rolls left
+        """
+        game = new_game(standard_rules())
+        for die, value in zip(game.dice, [5, 5, 5, 2, 3]):
+            die.value = value
+        game.hold_mask = 0b00111
+        game.roll_count = 1
+        self.assertEqual(self.engine.score_distributions([5, 5, 5, 2, 3], 0b00111, 2), self.engine.game_odds(game))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
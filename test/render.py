@@ -0,0 +1,100 @@
+import io
+import re
+import unittest
+
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.render import TerminalRenderer
+from yahtzee.rules import standard_rules
+from yahtzee.simulation import GreedyPolicy, new_game
+
+ESCAPE = re.compile(r'\x1b\[(\d+);(\d+)H|\x1b\[K|\x1b\[\d*J|\x1b\[(?:\d+;\d+)?r|\x1b[78]')
+
+
+def apply(screen, output):
+    """Plays the renderer's output onto a dict of row -> text, like a terminal would."""
+    row = column = 1
+    position = 0
+    for match in ESCAPE.finditer(output):
+        text = output[position:match.start()]
+        line = screen.get(row, '').ljust(column - 1)
+        screen[row] = line[:column - 1] + text + line[column - 1 + len(text):]
+        column += len(text)
+        if match.group(1):
+            row, column = int(match.group(1)), int(match.group(2))
+        elif match.group(0) == '\x1b[K':
+            screen[row] = screen.get(row, '')[:column - 1]
+        position = match.end()
+    assert position == len(output), repr(output[position:])
+    return screen
+
+
+class TestTerminalRenderer(unittest.TestCase):
+    def setUp(self):
+        self.out = io.StringIO()
+        self.renderer = TerminalRenderer(self.out, rows=40)
+        self.game = new_game(standard_rules()).fresh(DiceRNG(4))
+        self.game.roll()
+
+    def take(self):
+        output = self.out.getvalue()
+        self.out.seek(0)
+        self.out.truncate()
+        return output
+
+    def test_redraws_match_full_frames(self):
+        """
+        Applying every incremental update to a screen leaves exactly the current frame on it
+        """
+        screen = {}
+        policy = GreedyPolicy()
+        while not self.game.game_over:
+            self.renderer.draw(self.game)
+            apply(screen, self.take())
+            expected = self.renderer.frame(self.game)
+            self.assertEqual(expected, [screen.get(i + 1, '') for i in range(len(expected))])
+
+            if self.game.roll_count < 3:
+                self.game.hold_mask = sum(1 << i for i, h in enumerate(policy.choose_holds(self.game)) if h)
+                self.game.roll()
+            else:
+                self.game.lock_in_rule(policy.choose_rule(self.game))
+
+    def test_unchanged_frame_writes_nothing(self):
+        """
+        Drawing the same game twice only writes the first time
+        """
+        self.renderer.draw(self.game)
+        self.assertIn('\x1b[2J', self.take())
+        self.renderer.draw(self.game)
+        self.assertEqual('', self.take())
+
+    def test_updates_are_smaller_than_redraws(self):
+        """
+        A roll rewrites a fraction of the frame, and bytes are counted per turn
+        """
+        self.renderer.draw(self.game)
+        first = len(self.take())
+        self.game.roll()
+        self.renderer.draw(self.game)
+        self.assertLess(len(self.take()), first)
+
+        self.game.lock_in_rule(self.game.rule_controllers[0])
+        self.renderer.draw(self.game)
+        self.assertEqual(1, len(self.renderer.turn_bytes))
+        self.assertLess(self.renderer.bytes_written, self.renderer.full_bytes)
+        self.assertIn('bytes/turn', self.renderer.summary())
+
+    def test_close_resets_scroll_region(self):
+        """
+        Closing gives the terminal back, once
+        """
+        self.renderer.draw(self.game)
+        self.take()
+        self.renderer.close()
+        self.assertIn('\x1b[r', self.take())
+        self.renderer.close()
+        self.assertEqual('', self.take())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
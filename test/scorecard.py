@@ -0,0 +1,70 @@
+import unittest
+
+from yahtzee.rules import standard_rules
+from yahtzee.scorecard import UPPER_BONUS, YAHTZEE_BONUS
+from yahtzee.simulation import GreedyPolicy, new_game, play_game
+
+
+class TestScorecard(unittest.TestCase):
+    def setUp(self):
+        self.game = new_game(standard_rules())
+
+    def lock(self, name, dice):
+        for die, value in zip(self.game.dice, dice):
+            die.value = value
+        rc = next(rc for rc in self.game.rule_controllers if rc.rule_name == name)
+        self.game.lock_in_rule(rc)
+        return rc.locked_value
+
+    def test_upper_bonus(self):
+        """
+        Three of each upper value reaches 63 and earns the 35 point bonus
+        """
+        names = ['Aces', 'Twos', 'Threes', 'Fours', 'Fives']
+        for value, name in enumerate(names, 1):
+            self.lock(name, [value] * 3 + [1, 2] if value > 2 else [value] * 3 + [5, 6])
+        self.assertEqual(45, self.game.scorecard.upper_total)
+        self.assertEqual(0, self.game.scorecard.bonus)
+
+        self.lock('Sixes', [6, 6, 6, 1, 2])
+        self.assertEqual(63, self.game.scorecard.upper_total)
+        self.assertEqual(UPPER_BONUS, self.game.scorecard.upper_bonus)
+        self.assertEqual(63 + UPPER_BONUS, self.game.score)
+
+    def test_yahtzee_bonus(self):
+        """
+        Each Yahtzee after Yahtzee scored 50 is worth 100 more, wherever it's locked
+        """
+        self.assertEqual(50, self.lock('Yahtzee (5 of a Kind)', [4] * 5))
+        self.assertEqual(20, self.lock('Fours', [4] * 5))
+        self.lock('Chance', [2] * 5)
+        self.assertEqual(2 * YAHTZEE_BONUS, self.game.scorecard.bonus)
+        self.assertEqual(50 + 20 + 10 + 2 * YAHTZEE_BONUS, self.game.score)
+
+    def test_no_yahtzee_bonus_after_zero(self):
+        """
+        A Yahtzee scratched for 0 earns no bonuses later
+        """
+        self.assertEqual(0, self.lock('Yahtzee (5 of a Kind)', [1, 2, 3, 4, 6]))
+        self.lock('Fours', [4] * 5)
+        self.assertEqual(0, self.game.scorecard.bonus)
+
+    def test_totals_follow_locks(self):
+        """
+        The running totals match the locked values, and copies keep their own
+        """
+        game = play_game(self.game.fresh(), GreedyPolicy())
+        card = game.scorecard
+        self.assertEqual(13, card.filled)
+        self.assertEqual(sum(game.state.values), card.total)
+        self.assertEqual(sum(game.state.values[:6]), card.upper_total)
+        self.assertTrue(game.game_over)
+
+        copy = self.game.copy()
+        self.lock('Chance', [6] * 5)
+        self.assertEqual(0, copy.score)
+        self.assertEqual(1, self.game.locked_rules_count)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
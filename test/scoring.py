@@ -0,0 +1,68 @@
+import unittest
+from itertools import product
+
+from yahtzee import rules
+from yahtzee.game import Game
+from yahtzee.hands import HANDS, hand_index
+from yahtzee.scoring import ScoreTable
+
+ALL_RULES = [
+    rules.Aces(), rules.Twos(), rules.Threes(), rules.Fours(), rules.Fives(), rules.Sixes(),
+    rules.ThreeOfAKind(), rules.FourOfAKind(), rules.FullHouse(), rules.SmallStraight(),
+    rules.LargeStraight(), rules.Yahtzee(), rules.Chance()
+]
+
+
+class TestHands(unittest.TestCase):
+    def test_hand_count(self):
+        """
+        Five six-sided dice can only show 252 distinct hands
+        """
+        self.assertEqual(252, len(HANDS))
+        self.assertEqual(252, len(set(HANDS)))
+
+    def test_hand_index_ignores_order(self):
+        """
+        Every ordering of a roll maps to the same hand
+        """
+        self.assertEqual(hand_index([1, 2, 3, 4, 5]), hand_index([5, 4, 3, 2, 1]))
+        self.assertEqual(HANDS[hand_index([6, 1, 6, 1, 6])], (1, 1, 6, 6, 6))
+
+
+class TestScoreTable(unittest.TestCase):
+    def test_table_matches_reference(self):
+        """
+        Every table entry matches Rule.calculate_value for every ordered roll
+        """
+        table = ScoreTable(ALL_RULES)
+        for roll in product(range(1, 7), repeat=5):
+            row = table.row(hand_index(roll))
+            for column, rule in enumerate(ALL_RULES):
+                try:
+                    expected = rule.calculate_value(list(roll))
+                except rules.RuleNotMetError:
+                    expected = 0
+                self.assertEqual(expected, row[column], f'{rule.name} on {roll}')
+
+    def test_score_never_raises(self):
+        """
+        Unmet rules score zero instead of raising
+        """
+        table = ScoreTable([rules.Yahtzee()])
+        self.assertEqual(0, table.score([1, 2, 3, 4, 5], 0))
+        self.assertEqual(50, table.score([3, 3, 3, 3, 3], 0))
+
+    def test_rule_controller_uses_table(self):
+        """
+        RuleController.calculate_value reflects the game's current dice
+        """
+        game = Game()
+        game.register_rule(rules.FullHouse())
+        for die, value in zip(game.dice, [2, 5, 2, 5, 5]):
+            die.value = value
+
+        self.assertEqual(25, game.rule_controllers[-1].calculate_value())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
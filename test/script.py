@@ -0,0 +1,146 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.journal import NEW, Journal, iter_records
+from yahtzee.rules import standard_rules
+from yahtzee.script import ScriptRunner
+from yahtzee.simulation import GreedyPolicy, new_game, play_game
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CountingOutput(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def greedy_commands(template, game_id, seed):
+    """The commands that play the same game the greedy policy would from the seed."""
+    game = template.fresh(DiceRNG(seed))
+    commands = [{"game": game_id, "cmd": "new", "seed": seed}]
+    policy = GreedyPolicy()
+    game.roll()
+    while not game.game_over:
+        while game.roll_count < 3:
+            holds = policy.choose_holds(game)
+            if all(holds):
+                break
+            game.hold_mask = sum(1 << i for i, hold in enumerate(holds) if hold)
+            commands.append({"game": game_id, "cmd": "hold", "mask": game.hold_mask})
+            commands.append({"game": game_id, "cmd": "roll"})
+            game.roll()
+        rc = policy.choose_rule(game)
+        commands.append({"game": game_id, "cmd": "lock", "rule": rc.rule_name})
+        game.lock_in_rule(rc)
+    return commands
+
+
+class TestScript(unittest.TestCase):
+    def setUp(self):
+        self.template = new_game(standard_rules())
+
+    def run_lines(self, lines, flush_lines=4096):
+        out = CountingOutput()
+        runner = ScriptRunner(self.template, out, flush_lines)
+        runner.run(lines)
+        return runner, out, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_interleaved_games_score_like_direct_play(self):
+        """
+        Games played through interleaved commands end with the same scores as playing them directly
+        """
+        scripts = [greedy_commands(self.template, game_id, seed) for game_id, seed in [("a", 3), (7, 4)]]
+        lines = []
+        for pair in zip(*scripts):
+            lines += [json.dumps(command) for command in pair]
+        longer = max(scripts, key=len)
+        lines += [json.dumps(command) for command in longer[len(min(scripts, key=len)):]]
+
+        runner, _, events = self.run_lines(lines)
+        self.assertEqual(0, runner.errors)
+        ends = {e["game"]: e["score"] for e in events if e["event"] == "end"}
+        self.assertEqual({"a": play_game(self.template.fresh(DiceRNG(3)), GreedyPolicy()).score,
+                          7: play_game(self.template.fresh(DiceRNG(4)), GreedyPolicy()).score}, ends)
+        scores = [e for e in events if e["game"] == "a" and e["event"] == "score"]
+        self.assertEqual(13, len(scores))
+        self.assertEqual(ends["a"], scores[-1]["score"])
+
+    def test_errors_are_reported_and_play_goes_on(self):
+        """
+        Bad commands answer an error event with their line number and leave the games as they were
+        """
+        runner, _, events = self.run_lines([
+            '{"game": 1, "cmd": "new", "seed": 1}',
+            'not json',
+            '{"game": 2, "cmd": "roll"}',
+            '{"game": 1, "cmd": "hold", "dice": [9]}',
+            '{"game": 1, "cmd": "lock", "rule": "Nope"}',
+            '{"game": 1, "cmd": "roll"}',
+            '{"game": 1, "cmd": "roll"}',
+            '{"game": 1, "cmd": "roll"}',
+            '',
+            '{"game": 1, "cmd": "state"}',
+        ])
+        errors = [e for e in events if e["event"] == "error"]
+        self.assertEqual([2, 3, 4, 5, 8], [e["line"] for e in errors])
+        self.assertEqual(5, runner.errors)
+        self.assertEqual(9, runner.commands)
+        state = events[-1]
+        self.assertEqual(("state", 3, [False] * 5), (state["event"], state["roll_count"], state["holding"]))
+
+    def test_bad_values_with_a_journal(self):
+        """
+        Seeds and masks a journal record can't hold are error events, and nothing is journaled for them
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.journal")
+            with Journal(path) as journal:
+                out = io.StringIO()
+                runner = ScriptRunner(self.template, out, journal=journal)
+                runner.run([
+                    '{"game": 1, "cmd": "new", "seed": -1}',
+                    '{"game": 1, "cmd": "new", "seed": 18446744073709551616}',
+                    '{"game": 1, "cmd": "new", "seed": 2.5}',
+                    '{"game": 1, "cmd": "new", "seed": 3}',
+                    '{"game": 1, "cmd": "hold", "mask": 256}',
+                    '{"game": 1, "cmd": "hold", "mask": -1}',
+                    '{"game": 1, "cmd": "hold", "mask": 3}',
+                ])
+            events = [json.loads(line) for line in out.getvalue().splitlines()]
+            self.assertEqual([1, 2, 3, 5, 6], [e["line"] for e in events if e["event"] == "error"])
+            self.assertEqual(3, events[-1]["mask"])
+            self.assertEqual([3], [r[4] for r in iter_records(path) if r[1] == NEW])
+
+    def test_output_is_batched(self):
+        """
+        Events are written in batches of flush_lines, plus whatever's left at the end
+        """
+        lines = [json.dumps(c) for c in greedy_commands(self.template, 0, 5)]
+        _, out, events = self.run_lines(lines, flush_lines=10)
+        self.assertEqual(-(-len(events) // 10), out.writes)
+
+    def test_main_reads_stdin(self):
+        """
+        main.py --script plays commands piped to it
+        """
+        commands = '{"game": "x", "cmd": "new", "seed": 2}\n{"game": "x", "cmd": "lock", "rule": "Chance"}\n'
+        result = subprocess.run([sys.executable, "main.py", "--script"], cwd=ROOT, input=commands,
+                                capture_output=True, text=True, check=True)
+        events = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual(["new", "roll", "score", "roll"], [e["event"] for e in events])
+        self.assertEqual(sum(events[1]["dice"]), events[2]["value"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
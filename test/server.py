@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from yahtzee.rules import standard_rules
+from yahtzee.server import LINE_LIMIT, GameServer
+from yahtzee.simulation import new_game
+
+
+async def send(reader, writer, command):
+    writer.write(json.dumps(command).encode() + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def play_through(reader, writer, seed):
+    """Plays a whole game, rolling three times and locking the first open rule each turn."""
+    await send(reader, writer, {"cmd": "new", "seed": seed})
+    for turn in range(13):
+        await send(reader, writer, {"cmd": "roll"})
+        reply = await send(reader, writer, {"cmd": "roll"})
+        rule = next(r["name"] for r in reply["state"]["rules"] if not r["locked"])
+        reply = await send(reader, writer, {"cmd": "lock", "rule": rule})
+    return reply["state"]
+
+
+class TestGameServer(unittest.TestCase):
+    def setUp(self):
+        self.server = GameServer(new_game(standard_rules()))
+
+    def run_with_tcp(self, client):
+        async def run():
+            listener = await self.server.serve_tcp('127.0.0.1', 0)
+            port = listener.sockets[0].getsockname()[1]
+            async with listener:
+                return await client(lambda: asyncio.open_connection('127.0.0.1', port, limit=LINE_LIMIT * 4))
+        return asyncio.run(run())
+
+    def test_commands(self):
+        """
+        Roll, hold and lock change the connection's game, and failed commands leave it alone
+        """
+        async def client(connect):
+            reader, writer = await connect()
+            state = (await send(reader, writer, {"cmd": "state"}))["state"]
+            self.assertEqual(1, state["roll_count"])
+
+            reply = await send(reader, writer, {"cmd": "hold", "dice": [0, 2]})
+            self.assertEqual([True, False, True, False, False], reply["state"]["holding"])
+            held = reply["state"]["dice"]
+
+            odds = (await send(reader, writer, {"cmd": "odds"}))["odds"]
+            self.assertEqual(13, len(odds))
+            self.assertTrue(all(0 <= o["chance"] <= 1 + 1e-9 for o in odds))
+
+            reply = await send(reader, writer, {"cmd": "roll"})
+            self.assertEqual(2, reply["state"]["roll_count"])
+            self.assertEqual([held[0], held[2]], [reply["state"]["dice"][0], reply["state"]["dice"][2]])
+
+            await send(reader, writer, {"cmd": "roll"})
+            reply = await send(reader, writer, {"cmd": "roll"})
+            self.assertFalse(reply["ok"])
+            self.assertIn("Lock in a rule", reply["error"])
+
+            reply = await send(reader, writer, {"cmd": "lock", "rule": "Chance"})
+            self.assertTrue(reply["ok"])
+            chance = next(r for r in reply["state"]["rules"] if r["name"] == "Chance")
+            self.assertTrue(chance["locked"])
+            self.assertEqual(reply["state"]["score"], chance["value"])
+            self.assertEqual(1, reply["state"]["roll_count"])
+
+            self.assertFalse((await send(reader, writer, {"cmd": "lock", "rule": "Chance"}))["ok"])
+            self.assertFalse((await send(reader, writer, {"cmd": "hold", "dice": [7]}))["ok"])
+            for bad in [{"cmd": "hold", "mask": 1.5}, {"cmd": "hold", "mask": True}, {"cmd": "hold", "dice": [0.0]},
+                        {"cmd": "lock", "rule": True}, {"cmd": "lock", "rule": 1.0},
+                        {"cmd": "new", "seed": -1}, {"cmd": "new", "seed": 1 << 64}, {"cmd": "new", "seed": "7"}]:
+                self.assertFalse((await send(reader, writer, bad))["ok"], bad)
+            reply = await send(reader, writer, {"cmd": "state"})
+            self.assertEqual(1, reply["state"]["roll_count"])
+            self.assertTrue((await send(reader, writer, {"cmd": "roll"}))["ok"])
+            self.assertFalse((await send(reader, writer, {"cmd": "fly"}))["ok"])
+
+            writer.write(b'not json\n')
+            self.assertFalse(json.loads(await reader.readline())["ok"])
+            writer.close()
+
+        self.run_with_tcp(client)
+
+    def test_seeded_games_repeat(self):
+        """
+        Games started with the same seed play out the same
+        """
+        async def client(connect):
+            first = await play_through(*await connect(), seed=7)
+            second = await play_through(*await connect(), seed=7)
+            return first, second
+
+        first, second = self.run_with_tcp(client)
+        self.assertTrue(first["game_over"])
+        self.assertEqual(first, second)
+
+    def test_concurrent_sessions(self):
+        """
+        Many connections play at once in one loop, and the stats count them
+        """
+        sessions = 200
+
+        async def client(connect):
+            connections = [await connect() for _ in range(sessions)]
+            await asyncio.sleep(0)
+            stats = (await send(*connections[0], {"cmd": "stats"}))["stats"]
+            results = await asyncio.gather(*(play_through(r, w, seed) for seed, (r, w) in enumerate(connections)))
+            for _, writer in connections:
+                writer.close()
+            return stats, results
+
+        stats, results = self.run_with_tcp(client)
+        self.assertEqual(sessions, stats["sessions"])
+        self.assertTrue(all(r["game_over"] for r in results))
+        self.assertEqual(sessions, self.server.stats.peak_sessions)
+        self.assertEqual(sessions * (1 + 13 * 3) + 1, self.server.stats.commands)
+        self.assertIsNotNone(self.server.stats.to_dict()["p99_ms"])
+
+    def test_long_lines(self):
+        """
+        Lines over the limit end the connection instead of growing its buffer
+        """
+        async def client(connect):
+            reader, writer = await connect()
+            writer.write(b'x' * (LINE_LIMIT * 2) + b'\n')
+            reply = json.loads(await reader.readline())
+            self.assertEqual(b'', await reader.readline())
+            return reply
+
+        self.assertFalse(self.run_with_tcp(client)["ok"])
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), 'needs Unix sockets')
+    def test_unix_socket(self):
+        """
+        The same protocol works over a Unix socket
+        """
+        async def run(path):
+            listener = await self.server.serve_unix(path)
+            async with listener:
+                reader, writer = await asyncio.open_unix_connection(path)
+                reply = await send(reader, writer, {"cmd": "state"})
+                writer.close()
+                return reply
+
+        with tempfile.TemporaryDirectory() as directory:
+            reply = asyncio.run(run(os.path.join(directory, 'yahtzee.sock')))
+        self.assertTrue(reply["ok"])
+        self.assertEqual(5, len(reply["state"]["dice"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from yahtzee.rules import standard_rules
+from yahtzee.simulation import GreedyPolicy, SimulationStats, new_game, play_game, simulate
+
+
+class TestSimulation(unittest.TestCase):
+    def test_play_game_locks_every_rule(self):
+        """
+        A simulated game ends with every rule locked in
+        """
+        game = play_game(new_game(standard_rules()), GreedyPolicy())
+        self.assertTrue(game.game_over)
+        self.assertEqual(13, game.locked_rules_count)
+
+    def test_games_are_isolated(self):
+        """
+        Separate games don't share rule controllers
+        """
+        template = new_game(standard_rules())
+        self.assertEqual(13, len(template.fresh().rule_controllers))
+        self.assertEqual(13, len(new_game(standard_rules()).rule_controllers))
+
+    def test_same_seed_same_results(self):
+        """
+        Runs with the same seed produce identical aggregates
+        """
+        first = list(simulate(GreedyPolicy(), 40, workers=1, seed=7, shard_size=15))[-1]
+        second = list(simulate(GreedyPolicy(), 40, workers=1, seed=7, shard_size=15))[-1]
+        self.assertEqual(40, first.games)
+        self.assertEqual((first.mean, first.variance, first.hits), (second.mean, second.variance, second.hits))
+
+    def test_merge_matches_single_pass(self):
+        """
+        Merging partial aggregates gives the same mean and variance as one aggregate
+        """
+        names = [r.name for r in standard_rules()]
+        template = new_game(standard_rules())
+        games = [play_game(template.fresh(), GreedyPolicy()) for _ in range(10)]
+
+        whole, left, right = SimulationStats(names), SimulationStats(names), SimulationStats(names)
+        for i, game in enumerate(games):
+            whole.add(game)
+            (left if i < 4 else right).add(game)
+        left.merge(right)
+
+        self.assertAlmostEqual(whole.mean, left.mean)
+        self.assertAlmostEqual(whole.variance, left.variance)
+        self.assertEqual(whole.hits, left.hits)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from yahtzee import rules
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.rules import standard_rules
+from yahtzee.simulation import GreedyPolicy, new_game
+from yahtzee.snapshot import SnapshotError, SnapshotFile, SnapshotWriter, record_size, restore, save_all, snapshot
+
+
+def partly_played(template, seed, turns):
+    """A game with some rules locked in, held dice and a roll or two into the next turn."""
+    game = template.fresh(DiceRNG(seed))
+    policy = GreedyPolicy()
+    game.roll()
+    for _ in range(turns):
+        game.lock_in_rule(policy.choose_rule(game))
+    game.hold_mask = 0b10101
+    game.roll()
+    return game
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.template = new_game(standard_rules())
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'games.snap')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def assertSameGame(self, expected, actual):
+        for name in ['dice', 'hold_mask', 'locked_mask', 'roll_count', 'values']:
+            self.assertEqual(getattr(expected.state, name), getattr(actual.state, name), name)
+        for name in ['total', 'upper_total', 'yahtzee_scored', 'yahtzee_bonuses', 'filled']:
+            self.assertEqual(getattr(expected.scorecard, name), getattr(actual.scorecard, name), name)
+        self.assertEqual((expected.rng.seed, expected.rng.position), (actual.rng.seed, actual.rng.position))
+
+    def test_round_trip_resumes_identically(self):
+        """
+        A restored game is in the same state and plays out the same as the original
+        """
+        game = partly_played(self.template, 11, 5)
+        data = snapshot(game)
+        self.assertEqual(record_size(13), len(data))
+
+        restored = restore(data, self.template)
+        self.assertSameGame(game, restored)
+
+        for g in [game, restored]:
+            while not g.game_over:
+                g.lock_in_rule(GreedyPolicy().choose_rule(g))
+        self.assertTrue(restored.game_over)
+        self.assertSameGame(game, restored)
+
+    def test_yahtzee_bonus_survives(self):
+        """
+        Bonuses that can't be worked out from the locked values are kept
+        """
+        game = self.template.fresh(DiceRNG(1))
+        for name in ['Yahtzee (5 of a Kind)', 'Sixes']:
+            for die in game.dice:
+                die.value = 6
+            game.lock_in_rule(next(rc for rc in game.rule_controllers if rc.rule_name == name))
+        restored = restore(snapshot(game), self.template)
+        self.assertEqual(1, restored.scorecard.yahtzee_bonuses)
+        self.assertEqual(game.score, restored.score)
+
+    def test_file_random_access(self):
+        """
+        A snapshot file gives back any game by index, and appending keeps earlier ones
+        """
+        games = [partly_played(self.template, seed, seed % 13) for seed in range(50)]
+        save_all(self.path, games[:30])
+        with SnapshotWriter(self.path, self.template.score_table) as writer:
+            self.assertEqual(30, len(writer))
+            for game in games[30:]:
+                writer.write(game)
+
+        with SnapshotFile(self.path, self.template) as snapshots:
+            self.assertEqual(50, len(snapshots))
+            for index in [0, 17, 42, -1]:
+                self.assertSameGame(games[index], snapshots[index])
+            with self.assertRaises(IndexError):
+                snapshots[50]
+            self.assertEqual([g.score for g in games], [g.score for g in snapshots])
+
+    def test_rejects_other_rules(self):
+        """
+        Snapshot files only open with the rules they were written for
+        """
+        save_all(self.path, [partly_played(self.template, 1, 2)])
+        other = new_game([rules.Chance()])
+        with self.assertRaises(SnapshotError):
+            SnapshotFile(self.path, other)
+        with self.assertRaises(SnapshotError):
+            SnapshotWriter(self.path, other.score_table)
+
+    def test_large_blocks_and_unfit_rngs(self):
+        """
+        Block sizes past 16 bits round-trip, and RNG settings a record can't hold raise SnapshotError
+        """
+        game = self.template.fresh(DiceRNG(3, block_size=65536))
+        game.roll()
+        restored = restore(snapshot(game), self.template)
+        self.assertEqual(65536, restored.rng.block_size)
+        self.assertEqual(game.rng.roll(10), restored.rng.roll(10))
+
+        with self.assertRaises(SnapshotError):
+            snapshot(self.template.fresh(DiceRNG(1 << 64)))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+
+from yahtzee import rules
+from yahtzee.game import Game
+from yahtzee.hands import hand_index
+from yahtzee.scoring import ScoreTable
+from yahtzee.solver import layers, solve
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(count):
+    """A progress callback that stops a build once more than count scorecards are solved."""
+    def progress(done):
+        if done > count:
+            raise Interrupted
+    return progress
+
+
+class TestSolver(unittest.TestCase):
+    def test_chance_only(self):
+        """
+        Playing only Chance is worth 70/3: keep 5s and 6s after the first roll, 4s to 6s after the second
+        """
+        strategy = solve(ScoreTable([rules.Chance()]))
+        self.assertAlmostEqual(70 / 3, strategy.value(0))
+        self.assertEqual((5, 6, 6), strategy.best_keep(0, hand_index([1, 5, 6, 4, 6]), 2))
+        self.assertEqual((4, 5, 6, 6), strategy.best_keep(0, hand_index([1, 5, 6, 4, 6]), 1))
+
+    def test_last_rule_is_locked(self):
+        """
+        With no rolls left, the best rule is the one worth the most in the end
+        """
+        strategy = solve(ScoreTable([rules.Yahtzee(), rules.Chance()]))
+        self.assertEqual(0, strategy.best_rule(0, hand_index([4, 4, 4, 4, 4])))
+        self.assertEqual(0, strategy.best_rule(0b10, hand_index([1, 2, 3, 4, 6])))
+
+    def test_game_expected_final_score(self):
+        """
+        Game exposes the solved value of its current position
+        """
+        game = Game()
+        for rule in [rules.Sixes(), rules.Chance()]:
+            game.register_rule(rule)
+        strategy = solve(game.score_table)
+
+        self.assertAlmostEqual(strategy.value(0), game.expected_final_score(strategy))
+
+        for die, value in zip(game.dice, [6, 6, 6, 2, 3]):
+            die.value = value
+        game.roll_count = 3
+        game.rule_controllers[0].lock_in()
+        self.assertEqual(0b01, game.locked_mask)
+        self.assertAlmostEqual(18 + 23, game.expected_final_score(strategy))
+
+    def test_layers(self):
+        """
+        Layers go from the full scorecard down to the empty one, one more rule open each time
+        """
+        self.assertEqual([[0b111], [0b011, 0b101, 0b110], [0b001, 0b010, 0b100], [0]], layers(3))
+
+
+class TestParallelSolve(unittest.TestCase):
+    def setUp(self):
+        self.table = ScoreTable([rules.Aces(), rules.Sixes(), rules.ThreeOfAKind(), rules.Yahtzee(), rules.Chance()])
+        self.serial = solve(self.table)
+        self.dir = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.dir.name, 'strategy.checkpoint')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def assertSameStrategy(self, expected, actual):
+        self.assertEqual(list(expected.values), list(actual.values))
+        self.assertEqual(list(expected.lock_choices), list(actual.lock_choices))
+        self.assertEqual(list(expected.hold_choices), list(actual.hold_choices))
+
+    def test_workers_match_serial(self):
+        """
+        Solving layers over a process pool in shared memory gives exactly the serial result
+        """
+        solved = []
+        strategy = solve(self.table, solved.append, workers=2)
+        self.assertSameStrategy(self.serial, strategy)
+        self.assertEqual(32, solved[-1])
+
+    def test_resume_from_checkpoint(self):
+        """
+        An interrupted build carries on from its last finished layer, and removes the checkpoint when done
+        """
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                with self.assertRaises(Interrupted):
+                    solve(self.table, interrupt_after(16), workers, self.checkpoint)
+                self.assertTrue(os.path.exists(self.checkpoint))
+
+                solved = []
+                strategy = solve(self.table, solved.append, workers, self.checkpoint)
+                # The full card and the layers with 4 and 3 rules locked were checkpointed.
+                self.assertGreater(solved[0], 16)
+                self.assertEqual(32, solved[-1])
+                self.assertSameStrategy(self.serial, strategy)
+                self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_checkpoint_for_other_rules_is_ignored(self):
+        """
+        A checkpoint left by a build of different rules is started over rather than resumed
+        """
+        other = ScoreTable([rules.Twos(), rules.Fours(), rules.Fives(), rules.FullHouse(), rules.Chance()])
+        with self.assertRaises(Interrupted):
+            solve(other, interrupt_after(16), 1, self.checkpoint)
+
+        solved = []
+        self.assertSameStrategy(self.serial, solve(self.table, solved.append, 1, self.checkpoint))
+        self.assertEqual(6, solved[0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
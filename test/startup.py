@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from yahtzee.ui import PlainBackend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = {"tabulate", "inquirer2", "prompt_toolkit", "pygments", "numpy"}
+
+
+def import_times():
+    """Cumulative import time by module for a fresh `import main`, from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    def test_no_heavy_imports(self):
+        """
+        Importing main doesn't pull in the UI libraries or NumPy
+        """
+        imported = {name.split(".")[0] for name in import_times()}
+        self.assertEqual(set(), imported & HEAVY_MODULES)
+
+
+class TestPlainBackend(unittest.TestCase):
+    def test_list_skips_disabled_choices(self):
+        """
+        Disabled and invalid choices are re-prompted
+        """
+        ui = PlainBackend()
+        choices = [{"name": "A", "value": "a", "disabled": "LOCKED"}, ui.separator(), {"name": "B", "value": "b"}]
+        with mock.patch("builtins.input", side_effect=["1", "x", "2"]), mock.patch("builtins.print"):
+            answers = ui.prompt([{"type": "list", "name": "pick", "message": "?", "choices": choices}])
+        self.assertEqual({"pick": "b"}, answers)
+
+    def test_checkbox(self):
+        """
+        Checkboxes return the selected values, or the checked ones on a blank reply
+        """
+        ui = PlainBackend()
+        question = {"type": "checkbox", "name": "dice", "message": "?",
+                    "choices": [{"name": str(i), "value": i, "checked": i == 2} for i in range(1, 4)]}
+        with mock.patch("builtins.input", side_effect=["3 1"]), mock.patch("builtins.print"):
+            self.assertEqual({"dice": [1, 3]}, ui.prompt([question]))
+        with mock.patch("builtins.input", side_effect=[""]), mock.patch("builtins.print"):
+            self.assertEqual({"dice": [2]}, ui.prompt([question]))
+
+    def test_end_of_input_quits(self):
+        """
+        Running out of input at any prompt ends the game cleanly instead of raising
+        """
+        for keys, message in [("1\n1\n", "No dice were selected."), ("1\n3\n", "No rule was selected."),
+                              ("2\n", "Please select a valid option.")]:
+            result = subprocess.run([sys.executable, "main.py", "--plain"], cwd=ROOT, input=keys,
+                                    capture_output=True, text=True)
+            self.assertEqual(0, result.returncode, result.stderr)
+            self.assertTrue(result.stdout.endswith(message + "\n"), result.stdout[-200:])
+            self.assertNotIn("Not yet implemented", result.stdout)
+
+    def test_table(self):
+        """
+        Tables are plain text with aligned columns
+        """
+        self.assertEqual("+----+---+\n| ab | c |\n| d  | e |\n+----+---+", PlainBackend().table([["ab", "c"], ["d", "e"]]))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
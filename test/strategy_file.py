@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from yahtzee import rules
+from yahtzee.hands import hand_index
+from yahtzee.scoring import ScoreTable
+from yahtzee.solver import solve
+from yahtzee.strategy_file import HEADER, StaleStrategyError, load, load_or_solve, save
+
+
+class TestStrategyFile(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'strategy.bin')
+        self.table = ScoreTable([rules.Sixes(), rules.FullHouse(), rules.Chance()])
+        self.strategy = solve(self.table)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        """
+        A saved strategy loads back with the same values and decisions
+        """
+        save(self.strategy, self.path)
+        loaded = load(self.path, self.table, verify=True)
+        hand = hand_index([6, 6, 2, 2, 5])
+
+        for mask in range(8):
+            self.assertAlmostEqual(self.strategy.value(mask), loaded.value(mask), places=4)
+        self.assertEqual(self.strategy.best_rule(0, hand), loaded.best_rule(0, hand))
+        self.assertEqual(self.strategy.best_keep(0b100, hand, 2), loaded.best_keep(0b100, hand, 2))
+        self.assertAlmostEqual(self.strategy.position_value(0, hand, 1), loaded.position_value(0, hand, 1), places=3)
+
+    def test_rejects_other_rules(self):
+        """
+        A file built for another rule set is detected as stale
+        """
+        save(self.strategy, self.path)
+        other = ScoreTable([rules.Fives(), rules.FullHouse(), rules.Chance()])
+        self.assertRaises(StaleStrategyError, load, self.path, other)
+
+    def test_detects_corruption(self):
+        """
+        Flipped payload bytes fail the checksum
+        """
+        save(self.strategy, self.path)
+        with open(self.path, 'r+b') as f:
+            f.seek(HEADER.size + 1)
+            f.write(b'\xff\xff')
+        self.assertRaises(StaleStrategyError, load, self.path, self.table, True)
+
+    def test_empty_file_is_stale(self):
+        """
+        An empty or truncated file is stale rather than unmappable, and load_or_solve replaces it
+        """
+        open(self.path, 'wb').close()
+        self.assertRaises(StaleStrategyError, load, self.path, self.table)
+        save(self.strategy, self.path)
+        with open(self.path, 'r+b') as f:
+            f.truncate(HEADER.size + 10)
+        self.assertRaises(StaleStrategyError, load, self.path, self.table)
+
+        strategy = load_or_solve(self.path, self.table)
+        self.assertAlmostEqual(self.strategy.value(0), strategy.value(0), places=4)
+
+    def test_load_or_solve_builds_once(self):
+        """
+        A missing file is solved and saved, then reused
+        """
+        first = load_or_solve(self.path, self.table)
+        modified = os.path.getmtime(self.path)
+        second = load_or_solve(self.path, self.table)
+
+        self.assertEqual(modified, os.path.getmtime(self.path))
+        self.assertAlmostEqual(first.value(0), second.value(0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
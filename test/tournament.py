@@ -0,0 +1,89 @@
+import os
+import random
+import tempfile
+import unittest
+
+from yahtzee import rules
+from yahtzee.scoring import ScoreTable
+from yahtzee.simulation import ChaseYahtzeePolicy, GreedyPolicy, OptimalPolicy, UpperFirstPolicy, new_game, play_game
+from yahtzee.strategy_file import load_or_solve
+from yahtzee.tournament import PairedStats, play_pairs, run_tournament
+
+
+class TestTournament(unittest.TestCase):
+    def test_merge_matches_single_pass(self):
+        """
+        Merging partial paired aggregates gives the same means and variance as one aggregate
+        """
+        rng = random.Random(3)
+        pairs = [(rng.randint(100, 300), rng.randint(100, 300)) for _ in range(50)]
+        whole, left, right = PairedStats(), PairedStats(), PairedStats()
+        for i, (a, b) in enumerate(pairs):
+            whole.add(a, b)
+            (left if i < 20 else right).add(a, b)
+        left.merge(right)
+
+        for attribute in ['mean_a', 'mean_b', 'mean', 'variance']:
+            self.assertAlmostEqual(getattr(whole, attribute), getattr(left, attribute))
+        self.assertEqual((whole.wins, whole.losses), (left.wins, left.losses))
+
+    def test_same_policy_is_never_decided(self):
+        """
+        A policy paired with itself on identical dice scores the same every game
+        """
+        matchups = list(run_tournament({'a': GreedyPolicy(), 'b': GreedyPolicy()}, batch_games=50,
+                                       min_games=100, max_games=300, workers=1))[-1]
+        self.assertEqual(300, matchups[0].stats.games)
+        self.assertEqual(0, matchups[0].stats.variance)
+        self.assertFalse(matchups[0].significant(0.99))
+
+    def test_policies_finish_games(self):
+        """
+        Every built-in policy plays a full game
+        """
+        for policy in [UpperFirstPolicy(), ChaseYahtzeePolicy()]:
+            self.assertTrue(play_game(new_game(rules.standard_rules()), policy).game_over)
+
+    def test_optimal_policy_stops_early(self):
+        """
+        The optimal policy beats greedy, the matchup stops before max_games, and workers don't change results
+        """
+        rule_set = [rules.Sixes(), rules.FullHouse(), rules.Chance()]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'strategy.bin')
+            strategy = load_or_solve(path, ScoreTable(rule_set))
+            policies = {'optimal': OptimalPolicy(path), 'greedy': GreedyPolicy()}
+
+            inline = list(run_tournament(policies, rule_set, batch_games=200, min_games=400,
+                                         max_games=100_000, workers=1, seed=5))[-1][0]
+            pooled = list(run_tournament(policies, rule_set, batch_games=200, min_games=400,
+                                         max_games=100_000, workers=2, seed=5))[-1][0]
+
+            self.assertTrue(inline.decided)
+            self.assertLess(inline.stats.games, 100_000)
+            self.assertGreater(inline.stats.mean, 0)
+            self.assertAlmostEqual(strategy.value(0), inline.stats.mean_a, delta=3)
+            self.assertEqual(inline.stats.games, pooled.stats.games)
+            self.assertAlmostEqual(inline.stats.mean, pooled.stats.mean)
+
+    def test_pairs_share_dice(self):
+        """
+        Both sides of a pair see the same first roll
+        """
+        class FirstRoll(GreedyPolicy):
+            def __init__(self):
+                self.first_rolls = []
+
+            def choose_holds(self, game):
+                if game.roll_count == 1 and game.locked_rules_count == 0:
+                    self.first_rolls.append(list(game.dice_values))
+                return super().choose_holds(game)
+
+        a, b = FirstRoll(), FirstRoll()
+        play_pairs(a, b, [rules.Chance()], 10, seed=1)
+        self.assertEqual(a.first_rolls, b.first_rolls)
+        self.assertEqual(10, len(a.first_rolls))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
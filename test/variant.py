@@ -0,0 +1,103 @@
+import random
+import unittest
+from math import comb
+
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.hands import HAND_INDEX, HANDS, ROLL_TO_HAND
+from yahtzee.keeps import KEEPS
+from yahtzee.rules import standard_rules, variant_rules
+from yahtzee.scoring import ScoreTable
+from yahtzee.simulation import GreedyPolicy, new_game, play_game
+from yahtzee.solver import solve
+from yahtzee.variant import STANDARD, Variant, table_report
+
+
+class TestVariant(unittest.TestCase):
+    def test_standard_matches_hands(self):
+        """
+        Ranking hands combinatorially gives the same indices as the standard lookup tables
+        """
+        self.assertEqual(HANDS, STANDARD.hands)
+        self.assertEqual(KEEPS, STANDARD.keeps())
+        for hand in HANDS:
+            self.assertEqual(HAND_INDEX[hand], STANDARD.hand_index(list(reversed(hand))))
+        for code in range(0, len(ROLL_TO_HAND), 7):
+            self.assertEqual(ROLL_TO_HAND[code], STANDARD.hand_index(STANDARD.decode(code)))
+
+    def test_enumeration_and_ranking(self):
+        """
+        Hands and keeps are counted by binomial coefficients, and every hand ranks to its own index
+        """
+        for variant in [Variant(6, 6), Variant(5, 8), Variant(6, 8), Variant(3, 12)]:
+            with self.subTest(variant=variant):
+                self.assertEqual(comb(variant.faces + variant.dice - 1, variant.dice), len(variant.hands))
+                self.assertEqual(variant.hand_count, len(variant.hands))
+                self.assertEqual(variant.keep_count, len(variant.keeps()))
+                self.assertEqual(variant.hands, variant.keeps()[:variant.hand_count])
+                self.assertEqual(list(range(variant.hand_count)), [variant.hand_index(h) for h in variant.hands])
+
+                rng = random.Random(0)
+                for _ in range(200):
+                    roll = [rng.randint(1, variant.faces) for _ in range(variant.dice)]
+                    code = variant.roll_code(roll)
+                    self.assertEqual(tuple(roll), variant.decode(code))
+                    self.assertEqual(tuple(sorted(roll)), variant.hands[variant.hand_of_code(code)])
+
+    def test_rules_for_variants(self):
+        """
+        Variant rules are the standard ones for five six-sided dice, and score larger dice like the rules do
+        """
+        self.assertEqual([r.name for r in standard_rules()], [r.name for r in variant_rules(5, 6)])
+        rules = variant_rules(6, 8)
+        self.assertEqual(['Sevens', 'Eights'], [r.name for r in rules[6:8]])
+        self.assertIn('Yahtzee (6 of a Kind)', [r.name for r in rules])
+        self.assertNotIn('Large Straight', [r.name for r in variant_rules(4, 6)])
+
+        table = ScoreTable(rules, Variant(6, 8))
+        rng = random.Random(1)
+        for _ in range(300):
+            roll = [rng.randint(1, 8) for _ in range(6)]
+            for column, rule in enumerate(rules):
+                self.assertEqual(rule.score(roll), table.score(roll, column))
+        yahtzee = next(c for c, r in enumerate(rules) if r.name.startswith('Yahtzee'))
+        self.assertEqual(50, table.score([7] * 6, yahtzee))
+        self.assertEqual(0, table.score([7] * 5 + [1], yahtzee))
+        self.assertEqual(yahtzee, table.yahtzee_column)
+
+    def test_game_plays_a_variant(self):
+        """
+        A game of six eight-sided dice rolls six dice up to 8 and scores to the end
+        """
+        variant = Variant(6, 8)
+        template = new_game(variant_rules(6, 8), variant)
+        game = play_game(template.fresh(DiceRNG(5, faces=8)), GreedyPolicy())
+
+        self.assertTrue(game.game_over)
+        self.assertEqual(6, len(game.dice))
+        self.assertTrue(all(1 <= v <= 8 for v in game.dice_values))
+        self.assertEqual(sum(game.state.values) + game.scorecard.bonus, game.score)
+        with self.assertRaises(ValueError):
+            game.dice[0].value = 9
+        with self.assertRaises(ValueError):
+            template.fresh(DiceRNG(5))
+
+    def test_standard_only_parts_refuse_variants(self):
+        """
+        The solver is built for five six-sided dice and says so
+        """
+        with self.assertRaises(ValueError):
+            solve(ScoreTable(variant_rules(6, 6)[:2], Variant(6, 6)))
+
+    def test_table_report(self):
+        """
+        Reports count the hands, keeps and rules of the variant and what building them took
+        """
+        report = table_report(Variant(6, 8))
+        self.assertEqual((15, 1716, 3003, 8 ** 6, False), report[1:6])
+        self.assertGreater(report.build_seconds, 0)
+        self.assertGreater(report.table_bytes, 1716 * 15 * 2)
+        self.assertEqual(2 ** 15 * (4 + 1716 * 5), report.strategy_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+import unittest
+from itertools import product
+
+from yahtzee.rules import SmallStraight, standard_rules
+from yahtzee.variant import Variant
+from yahtzee.verify import SCORERS, Scorer, verify
+
+STRAIGHT = [rule.name for rule in standard_rules()].index('Small Straight')
+
+
+def naive_straight(table, cases):
+    """Scores a Small Straight only on 1-2-3-4, and everything else like the score table."""
+    rows = SCORERS['score_table'].score(table, cases)
+    for dice, row in zip(cases, rows):
+        row[STRAIGHT] = 30 if {1, 2, 3, 4} <= set(dice) else 0
+    return rows
+
+
+def short_rows(table, cases):
+    return SCORERS['score_table'].score(table, cases)[1:]
+
+
+class TestVerify(unittest.TestCase):
+    def test_every_scorer_agrees(self):
+        """
+        Every registered scorer agrees with the rules on all 7776 ordered rolls and 252 hands
+        """
+        report = verify(workers=1)
+        self.assertTrue(report.ok, report)
+        self.assertEqual(7776 + 252, report.cases)
+        self.assertEqual(set(SCORERS), set(report.scorers) | set(report.skipped))
+
+    def test_mismatches_are_counted_with_minimal_examples(self):
+        """
+        A wrong scorer is reported once per wrong rule, with its mismatch count and smallest failing hand
+        """
+        report = verify(scorers=[Scorer('naive', naive_straight)], workers=1)
+        self.assertFalse(report.ok)
+        mismatch, = report.mismatches
+        self.assertEqual(('naive', 'Small Straight', (1, 3, 4, 5, 6), 30, 0),
+                         (mismatch.scorer, mismatch.rule, mismatch.dice, mismatch.expected, mismatch.actual))
+        rolls = [roll for roll in product(range(1, 7), repeat=5)
+                 if SmallStraight().score(list(roll)) and not {1, 2, 3, 4} <= set(roll)]
+        hands = {tuple(sorted(roll)) for roll in rolls}
+        self.assertEqual(len(rolls) + len(hands), mismatch.count)
+
+    def test_parallel_run_reports_the_same(self):
+        """
+        Checking on a pool finds the same mismatches, and a scorer that breaks is reported as an error
+        """
+        scorers = [Scorer('naive', naive_straight), Scorer('short', short_rows), SCORERS['roll_table']]
+        serial = verify(scorers=scorers, workers=1)
+        parallel = verify(scorers=scorers, workers=2)
+        self.assertEqual(serial.mismatches, parallel.mismatches)
+        self.assertEqual(['short'], list(parallel.errors))
+        self.assertEqual(('naive', 'short', 'roll_table'), parallel.scorers)
+
+    def test_other_variants(self):
+        """
+        Variants are checked on all their rolls, skipping the scorers that only support standard dice
+        """
+        report = verify(variant=Variant(4, 4), workers=1)
+        self.assertTrue(report.ok, report)
+        self.assertEqual(4 ** 4 + 35, report.cases)
+        self.assertIn('batch_python', report.skipped)
+        self.assertIn('game', report.scorers)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
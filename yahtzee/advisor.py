@@ -0,0 +1,99 @@
+"""
+Move advice for a game in progress: the expected final score of each choice on offer.
+
+Advice comes from a solved Strategy when one is available. Without one, a heuristic
+strategy stands in, which values every open rule at what it would score if it were the
+only rule left to play. Either way the per-turn work is cached, and every lookup's
+latency is recorded so it can be checked against the prompt's budget.
+"""
+import time
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from yahtzee.game import Game, RuleController
+from yahtzee.keeps import KEEP_INDEX
+from yahtzee.scoring import ScoreTable
+from yahtzee.solver import MAX_ROLLS, Strategy, play_out
+
+
+class HeuristicValues:
+    """Stand-in for solved scorecard values: the sum of each open rule's value when played alone."""
+
+    def __init__(self, table: ScoreTable):
+        self.solo_values = [play_out([row[c] for row in table.rows])[2] for c in range(len(table.rules))]
+
+    def __len__(self):
+        return 1 << len(self.solo_values)
+
+    def __getitem__(self, mask: int) -> float:
+        return sum(v for c, v in enumerate(self.solo_values) if not mask >> c & 1)
+
+
+def heuristic_strategy(table: ScoreTable) -> Strategy:
+    """A Strategy with heuristic values and no decision tables, for when no solved one is available."""
+    return Strategy(table, HeuristicValues(table), lock_choices=(), hold_choices=())
+
+
+class Advisor:
+    """Annotates the choices of a game with their expected final score."""
+    game: Game
+    strategy: Strategy
+    exact: bool
+    latencies: List[float]
+
+    def __init__(self, game: Game, strategy: Optional[Strategy] = None):
+        """Falls back to the heuristic strategy if no solved strategy is given."""
+        self.game = game
+        self.exact = strategy is not None
+        self.strategy = strategy if strategy is not None else heuristic_strategy(game.score_table)
+        self.latencies = []
+
+    def rule_values(self) -> Dict[RuleController, float]:
+        """Expected final score after locking in each open rule with the current dice."""
+        start = time.perf_counter()
+        game = self.game
+        mask = game.locked_mask
+        row = game.score_table.row(game.hand)
+
+        values = {rc: game.score + row[c] + self.strategy.value(mask | 1 << c)
+                  for c, rc in enumerate(game.rule_controllers) if not rc.locked_in}
+
+        self.latencies.append(time.perf_counter() - start)
+        return values
+
+    def hold_values(self) -> List[Tuple[float, float]]:
+        """
+        For each die, the expected final score of the best play that holds it and of the
+        best play that rerolls it. Both are the current value once no rolls are left.
+        """
+        start = time.perf_counter()
+        game = self.game
+        rolls_left = MAX_ROLLS - game.roll_count
+        dice = [dc.value for dc in game.die_controllers]
+
+        if rolls_left < 1:
+            value = game.expected_final_score(self.strategy)
+            values = [(value, value)] * len(dice)
+        else:
+            keep_values = self.strategy.keep_values(game.locked_mask, rolls_left)
+            held = [float('-inf')] * len(dice)
+            rerolled = [float('-inf')] * len(dice)
+            for size in range(len(dice) + 1):
+                for positions in combinations(range(len(dice)), size):
+                    value = keep_values[KEEP_INDEX[tuple(sorted(dice[i] for i in positions))]]
+                    for i in range(len(dice)):
+                        if i in positions:
+                            held[i] = max(held[i], value)
+                        else:
+                            rerolled[i] = max(rerolled[i], value)
+            values = [(game.score + h, game.score + r) for h, r in zip(held, rerolled)]
+
+        self.latencies.append(time.perf_counter() - start)
+        return values
+
+    def latency_summary(self) -> str:
+        if not self.latencies:
+            return 'Advisor: no lookups'
+        ordered = sorted(self.latencies)
+        return (f'Advisor ({"solved" if self.exact else "heuristic"}): {len(ordered)} lookups, '
+                f'median {ordered[len(ordered) // 2] * 1000:.2f}ms, max {ordered[-1] * 1000:.2f}ms')
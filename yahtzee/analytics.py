@@ -0,0 +1,303 @@
+"""
+Statistics over game logs too large to load at once: journals and snapshot files.
+
+Files are read in fixed-size chunks of records and each chunk is aggregated with NumPy,
+so memory stays bounded by the chunk size plus the games still open at the end of a
+chunk. Results are GameStats, which merge, so files can be analyzed in parallel and
+combined. Rules are reported by Rule.name.
+
+From journals, every locked rule counts toward zero rates and rolls per turn, and bonuses
+are the difference between a game's END score and the sum of its locked values. From
+snapshot files, only finished games are counted, and rolls aren't known.
+
+Usage: python -m yahtzee.analytics FILE... [--workers W] [--chunk-records N]
+"""
+import argparse
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from yahtzee.journal import END, LOCK, RECORD, ROLL, JournalError
+from yahtzee.scorecard import UPPER_BONUS, UPPER_BONUS_THRESHOLD, YAHTZEE_BONUS
+from yahtzee.scoring import ScoreTable
+from yahtzee.snapshot import HEADER as SNAPSHOT_HEADER
+from yahtzee.snapshot import MAGIC as SNAPSHOT_MAGIC
+from yahtzee.snapshot import RECORD as SNAPSHOT_RECORD
+from yahtzee.snapshot import SnapshotError, file_header, record_size
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy isn't installed
+    np = None
+
+CHUNK_RECORDS = 1 << 20
+
+
+class GameStats:
+    """Mergeable aggregate of finished games and locked rules."""
+    rule_names: List[str]
+    records: int
+    games: int
+    score_counts: 'np.ndarray'
+    locks: 'np.ndarray'
+    zeros: 'np.ndarray'
+    upper_bonus_games: int
+    yahtzee_bonus_games: int
+    yahtzee_bonuses: int
+    rolls: int
+    turns: int
+    elapsed: float
+
+    def __init__(self, rule_names: Sequence[str]):
+        if np is None:
+            raise RuntimeError('NumPy is not installed.')
+        self.rule_names = list(rule_names)
+        self.records = 0
+        self.games = 0
+        self.score_counts = np.zeros(0, dtype=np.int64)
+        self.locks = np.zeros(len(rule_names), dtype=np.int64)
+        self.zeros = np.zeros(len(rule_names), dtype=np.int64)
+        self.upper_bonus_games = 0
+        self.yahtzee_bonus_games = 0
+        self.yahtzee_bonuses = 0
+        self.rolls = 0
+        self.turns = 0
+        self.elapsed = 0.0
+
+    def _add_counts(self, counts: 'np.ndarray') -> None:
+        if len(counts) > len(self.score_counts):
+            counts = counts.copy()
+            counts[:len(self.score_counts)] += self.score_counts
+            self.score_counts = counts
+        else:
+            self.score_counts[:len(counts)] += counts
+
+    def add_scores(self, scores: 'np.ndarray') -> None:
+        """Counts the final scores of finished games."""
+        if len(scores):
+            self._add_counts(np.bincount(scores))
+            self.games += len(scores)
+
+    def merge(self, other: 'GameStats') -> None:
+        """Folds another aggregate into this one. Elapsed times add up, so this measures CPU time."""
+        self.records += other.records
+        self.games += other.games
+        self._add_counts(other.score_counts)
+        self.locks += other.locks
+        self.zeros += other.zeros
+        self.upper_bonus_games += other.upper_bonus_games
+        self.yahtzee_bonus_games += other.yahtzee_bonus_games
+        self.yahtzee_bonuses += other.yahtzee_bonuses
+        self.rolls += other.rolls
+        self.turns += other.turns
+        self.elapsed += other.elapsed
+
+    @property
+    def mean_score(self) -> float:
+        if not self.games:
+            return 0.0
+        return float(np.arange(len(self.score_counts)) @ self.score_counts) / self.games
+
+    def score_percentile(self, fraction: float) -> int:
+        """Lowest score that at least this fraction of games are at or below."""
+        if not self.games:
+            return 0
+        return int(np.searchsorted(np.cumsum(self.score_counts), fraction * self.games))
+
+    @property
+    def zero_rates(self) -> Dict[str, float]:
+        """Fraction of times each rule was locked in for zero."""
+        return {name: int(z) / int(n) if n else 0.0 for name, z, n in zip(self.rule_names, self.zeros, self.locks)}
+
+    @property
+    def upper_bonus_rate(self) -> float:
+        return self.upper_bonus_games / self.games if self.games else 0.0
+
+    @property
+    def yahtzee_bonus_rate(self) -> float:
+        """Fraction of games with at least one Yahtzee bonus."""
+        return self.yahtzee_bonus_games / self.games if self.games else 0.0
+
+    @property
+    def rolls_per_turn(self) -> Optional[float]:
+        """Average rolls per turn, or None if the logs don't record rolls."""
+        return self.rolls / self.turns if self.rolls and self.turns else None
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+
+def _journal_dtype():
+    dtype = np.dtype([('game', '<u4'), ('kind', 'u1'), ('a', 'u1'), ('b', '<u2'), ('payload', '<u8')])
+    assert dtype.itemsize == RECORD.size
+    return dtype
+
+
+def _snapshot_dtype(rule_count: int):
+    names = ['seed', 'position', 'spawned', 'block_size', 'dice', 'locked_mask', 'hold_mask', 'roll_count',
+             'faces', 'backend', 'yahtzee_bonuses', 'values']
+    formats = ['<u8', '<u8', '<u4', '<u4', '<u2', '<u2', 'u1', 'u1', 'u1', 'u1', 'u1', ('<u2', (rule_count,))]
+    offsets = [0, 8, 16, 20, 24, 26, 28, 29, 30, 31, 32, SNAPSHOT_RECORD.size]
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': record_size(rule_count)})
+
+
+def _bonus_counts(stats: GameStats, bonuses: 'np.ndarray', upper_totals: 'np.ndarray') -> None:
+    upper = upper_totals >= UPPER_BONUS_THRESHOLD
+    yahtzees = (bonuses - np.where(upper, UPPER_BONUS, 0)) // YAHTZEE_BONUS
+    stats.upper_bonus_games += int(np.count_nonzero(upper))
+    stats.yahtzee_bonus_games += int(np.count_nonzero(yahtzees > 0))
+    stats.yahtzee_bonuses += int(yahtzees.clip(0).sum())
+
+
+def analyze_journal(path: str, table: ScoreTable, chunk_records: int = CHUNK_RECORDS) -> GameStats:
+    """Aggregates every record of a journal, a chunk at a time."""
+    start = time.perf_counter()
+    stats = GameStats([r.name for r in table.rules])
+    rule_count = len(table.rules)
+    is_upper = np.array([table.upper_mask >> c & 1 for c in range(rule_count)], dtype=np.int64)
+    dtype = _journal_dtype()
+    # game id -> [sum of locked values, sum of upper-section values], for games not ended yet
+    open_games: Dict[int, List[int]] = {}
+
+    if os.path.getsize(path) % RECORD.size:
+        raise JournalError(f'{path} ends with a partial record.')
+    with open(path, 'rb') as f:
+        while len(chunk := np.fromfile(f, dtype=dtype, count=chunk_records)):
+            stats.records += len(chunk)
+            kind = chunk['kind']
+            stats.rolls += int(np.count_nonzero(kind == ROLL))
+
+            locks = chunk[kind == LOCK]
+            columns = locks['a'].astype(np.int64)
+            values = locks['b'].astype(np.int64)
+            stats.turns += len(locks)
+            stats.locks += np.bincount(columns, minlength=rule_count)[:rule_count]
+            stats.zeros += np.bincount(columns[values == 0], minlength=rule_count)[:rule_count]
+            if len(locks):
+                ids, inverse = np.unique(locks['game'], return_inverse=True)
+                totals = np.bincount(inverse, weights=values).astype(np.int64)
+                uppers = np.bincount(inverse, weights=values * is_upper[columns]).astype(np.int64)
+                for game_id, total, upper in zip(ids.tolist(), totals.tolist(), uppers.tolist()):
+                    entry = open_games.setdefault(game_id, [0, 0])
+                    entry[0] += total
+                    entry[1] += upper
+
+            ends = chunk[kind == END]
+            if len(ends):
+                scores = ends['b'].astype(np.int64)
+                sums = np.array([open_games.pop(g, (s, 0)) for g, s in zip(ends['game'].tolist(), scores.tolist())],
+                                dtype=np.int64).reshape(-1, 2)
+                stats.add_scores(scores)
+                _bonus_counts(stats, scores - sums[:, 0], sums[:, 1])
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def analyze_snapshots(path: str, table: ScoreTable, chunk_records: int = CHUNK_RECORDS) -> GameStats:
+    """Aggregates the finished games in a snapshot file, a chunk at a time."""
+    start = time.perf_counter()
+    stats = GameStats([r.name for r in table.rules])
+    rule_count = len(table.rules)
+    upper_columns = [c for c in range(rule_count) if table.upper_mask >> c & 1]
+    dtype = _snapshot_dtype(rule_count)
+    full = (1 << rule_count) - 1
+
+    with open(path, 'rb') as f:
+        if f.read(SNAPSHOT_HEADER.size) != file_header(table):
+            raise SnapshotError(f'{path} holds snapshots of a different rule set.')
+        while len(chunk := np.fromfile(f, dtype=dtype, count=chunk_records)):
+            stats.records += len(chunk)
+            finished = chunk[chunk['locked_mask'] == full]
+            values = finished['values'].astype(np.int64)
+            upper_totals = values[:, upper_columns].sum(axis=1)
+            bonuses = (np.where(upper_totals >= UPPER_BONUS_THRESHOLD, UPPER_BONUS, 0) +
+                       YAHTZEE_BONUS * finished['yahtzee_bonuses'].astype(np.int64))
+
+            stats.add_scores(values.sum(axis=1) + bonuses)
+            stats.locks += len(finished)
+            stats.zeros += np.count_nonzero(values == 0, axis=0)
+            _bonus_counts(stats, bonuses, upper_totals)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def analyze_file(path: str, table: ScoreTable, chunk_records: int = CHUNK_RECORDS) -> GameStats:
+    """Aggregates a journal or snapshot file, told apart by the snapshot file's magic number."""
+    with open(path, 'rb') as f:
+        magic = f.read(len(SNAPSHOT_MAGIC))
+    if magic == SNAPSHOT_MAGIC:
+        return analyze_snapshots(path, table, chunk_records)
+    return analyze_journal(path, table, chunk_records)
+
+
+def _analyze_file(args) -> GameStats:
+    return analyze_file(*args)
+
+
+def analyze(paths: Sequence[str], table: Optional[ScoreTable] = None, workers: Optional[int] = None,
+            chunk_records: int = CHUNK_RECORDS) -> Iterator[GameStats]:
+    """
+    Aggregates every file and yields the running total as each one finishes.
+
+    With workers=1 files are read in this process; otherwise they are spread over a
+    process pool, one per CPU by default.
+    """
+    if table is None:
+        from yahtzee.rules import standard_rules
+
+        table = ScoreTable(standard_rules())
+    jobs = [(path, table, chunk_records) for path in paths]
+
+    total = GameStats([r.name for r in table.rules])
+    if workers == 1:
+        for job in jobs:
+            total.merge(_analyze_file(job))
+            yield total
+        return
+
+    with Pool(workers) as pool:
+        for stats in pool.imap_unordered(_analyze_file, jobs):
+            total.merge(stats)
+            yield total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Statistics over journals and snapshot files.')
+    parser.add_argument('paths', nargs='+', metavar='FILE', help='journal or snapshot files, or directories of journals')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-records', type=int, default=CHUNK_RECORDS)
+    args = parser.parse_args()
+
+    from yahtzee.journal import journal_paths
+
+    paths = []
+    for path in args.paths:
+        paths += journal_paths(path) if os.path.isdir(path) else [path]
+
+    start = time.perf_counter()
+    stats = None
+    for stats in analyze(paths, workers=args.workers, chunk_records=args.chunk_records):
+        pass
+    wall = time.perf_counter() - start
+    if stats is None:
+        return
+
+    print(f'{stats.records:,} records, {stats.games:,} finished games in {wall:.2f}s '
+          f'({stats.records / wall if wall else 0:,.0f} records/s, '
+          f'{stats.records_per_second:,.0f} records/s per process)')
+    print(f'Score: mean {stats.mean_score:.2f}, 10th/50th/90th percentile '
+          f'{stats.score_percentile(0.1)}/{stats.score_percentile(0.5)}/{stats.score_percentile(0.9)}')
+    print(f'Upper bonus in {stats.upper_bonus_rate:.1%} of games, Yahtzee bonus in {stats.yahtzee_bonus_rate:.1%}')
+    if stats.rolls_per_turn is not None:
+        print(f'Rolls per turn: {stats.rolls_per_turn:.2f}')
+    print('Zero rates:')
+    for name, rate in stats.zero_rates.items():
+        print(f'  {name:<24} {rate:6.1%}')
+
+
+if __name__ == '__main__':
+    main()
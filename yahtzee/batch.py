@@ -0,0 +1,92 @@
+"""
+Scoring of many hands at once.
+
+With NumPy installed, an (N, 5) array of die values is scored into an (N, R) array in a
+handful of vectorized operations. Without it, the same results come back as a list of
+lists. Both paths read from a ScoreTable, so they agree with Rule.calculate_value exactly.
+"""
+from typing import List, Optional, Sequence
+from weakref import WeakKeyDictionary
+
+from yahtzee.hands import DICE_COUNT, FACES, ROLL_TO_HAND, roll_code
+from yahtzee.rules import standard_rules
+from yahtzee.scoring import ScoreTable
+from yahtzee.variant import require_standard
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy isn't installed
+    np = None
+
+_standard_table: Optional[ScoreTable] = None
+_numpy_rows: 'WeakKeyDictionary[ScoreTable, object]' = WeakKeyDictionary()
+_numpy_roll_to_hand = None
+
+
+def standard_table() -> ScoreTable:
+    """ScoreTable for the standard 13 rules, built on first use."""
+    global _standard_table
+    if _standard_table is None:
+        _standard_table = ScoreTable(standard_rules())
+    return _standard_table
+
+
+def score_batch(hands, table: Optional[ScoreTable] = None, use_numpy: Optional[bool] = None):
+    """
+    Scores every hand against every rule in the table (the standard 13 rules by default).
+
+    Returns an (N, R) int16 array when NumPy is used, and a list of N lists otherwise.
+    use_numpy defaults to whether NumPy is installed.
+    """
+    if table is None:
+        table = standard_table()
+    require_standard(table.variant, 'Batch scoring')
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    if use_numpy:
+        if np is None:
+            raise RuntimeError('NumPy is not installed.')
+        return _score_batch_numpy(hands, table)
+
+    return _score_batch_python(hands, table)
+
+
+def _score_batch_python(hands: Sequence[Sequence[int]], table: ScoreTable) -> List[List[int]]:
+    rows = table.rows
+    scores = []
+    for hand in hands:
+        if len(hand) != DICE_COUNT or not all(1 <= v <= FACES for v in hand):
+            raise ValueError(f'Not a valid hand: {hand}')
+        scores.append(rows[ROLL_TO_HAND[roll_code(hand)]].tolist())
+    return scores
+
+
+def _score_batch_numpy(hands, table: ScoreTable):
+    hands = np.asarray(hands)
+    if hands.ndim != 2 or hands.shape[1] != DICE_COUNT:
+        raise ValueError(f'Expected an (N, {DICE_COUNT}) array of die values, got shape {hands.shape}.')
+    if hands.size and (hands.min() < 1 or hands.max() > FACES):
+        raise ValueError(f'Die values must be between 1 and {FACES}.')
+
+    return numpy_table(table)[hand_indices(hands)]
+
+
+def hand_indices(hands):
+    """Index into HANDS of each row of an (N, 5) array of die values, which aren't checked."""
+    global _numpy_roll_to_hand
+    if _numpy_roll_to_hand is None:
+        _numpy_roll_to_hand = np.asarray(ROLL_TO_HAND, dtype=np.int32)
+
+    weights = FACES ** np.arange(DICE_COUNT - 1, -1, -1, dtype=np.int32)
+    codes = (hands.astype(np.int32) - 1) @ weights
+    return _numpy_roll_to_hand[codes]
+
+
+def numpy_table(table: ScoreTable):
+    """The table's rows as a (252, R) array, cached until more rules are added."""
+    cached = _numpy_rows.get(table)
+    if cached is None or cached.shape[1] != len(table.rules):
+        cached = np.array([row.tolist() for row in table.rows], dtype=np.int16).reshape(len(table.rows), -1)
+        _numpy_rows[table] = cached
+    return cached
@@ -0,0 +1,147 @@
+"""
+Seedable source of die faces for games.
+
+Faces are drawn from the underlying generator in blocks and handed out from a buffer,
+which is much cheaper than a randint call per die. Every stream remembers its seed and
+how many faces it has handed out, so a game can be replayed from its seed, and
+independent substreams can be derived for parallel workers.
+"""
+import hashlib
+import secrets
+from copy import deepcopy
+from random import Random
+from typing import List, Optional
+
+from yahtzee.hands import FACES
+
+BACKENDS = ('python', 'numpy')
+BLOCK_SIZE = 256
+
+
+def load_numpy():
+    """NumPy if it's installed. Imported on first use, since only the numpy backend needs it and it's slow to import."""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - exercised when numpy isn't installed
+        return None
+    return numpy
+
+
+def derive_seed(seed: int, index: int) -> int:
+    """64-bit seed for the index-th substream of a seed. Unrelated indices give unrelated seeds."""
+    digest = hashlib.blake2b(f'{seed}/{index}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class DiceRNG:
+    """
+    Stream of die faces from an explicit seed.
+
+    The python backend (random.Random) is the default and works everywhere; the numpy
+    backend (numpy.random.Generator) draws large blocks faster. The two produce different
+    streams for the same seed. The generator isn't seeded until the first face is drawn,
+    so streams that are created or restored and never rolled cost next to nothing.
+    """
+    __slots__ = ('seed', 'faces', 'block_size', 'backend', '_generator', '_block', '_index', '_drawn', '_spawned')
+    seed: int
+    faces: int
+    block_size: int
+    backend: str
+
+    def __init__(self, seed: Optional[int] = None, faces: int = FACES, block_size: int = BLOCK_SIZE,
+                 backend: str = 'python', position: int = 0, spawned: int = 0):
+        """
+        A random seed is picked if none is given. position skips that many faces ahead, and
+        spawned that many substreams, for picking a stream up where it was left. Skipping
+        ahead regenerates every block up to the position on the first draw, so it costs
+        time in proportion to position; copy() avoids that for a stream that's still around.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown backend {backend!r}, expected one of {BACKENDS}.')
+        if backend == 'numpy' and load_numpy() is None:
+            raise RuntimeError('NumPy is not installed.')
+
+        self.seed = seed if seed is not None else secrets.randbits(64)
+        self.faces = faces
+        self.block_size = block_size
+        self.backend = backend
+        self._generator = None
+        self._block = []
+        self._index = 0
+        # Until the generator starts, this is the position it has to skip ahead to.
+        self._drawn = position
+        self._spawned = spawned
+
+    @property
+    def position(self) -> int:
+        """How many faces this stream has handed out."""
+        return self._drawn - len(self._block) + self._index
+
+    @property
+    def spawned(self) -> int:
+        """How many substreams spawn has handed out."""
+        return self._spawned
+
+    def _next_block(self) -> List[int]:
+        if self.backend == 'numpy':
+            block = self._generator.integers(1, self.faces + 1, size=self.block_size, dtype='int8').tolist()
+        else:
+            block = self._generator.choices(range(1, self.faces + 1), k=self.block_size)
+        self._drawn += self.block_size
+        return block
+
+    def _start(self) -> None:
+        """Seeds the generator and skips ahead to the position the stream was created at."""
+        position = self._drawn
+        self._generator = load_numpy().random.default_rng(self.seed) if self.backend == 'numpy' else Random(self.seed)
+        self._drawn = 0
+        while self._drawn + self.block_size <= position:
+            self._next_block()
+        self._block = self._next_block()
+        self._index = position - (self._drawn - self.block_size)
+
+    def _refill(self) -> None:
+        if self._generator is None:
+            self._start()
+            return
+        self._block = self._next_block()
+        self._index = 0
+
+    def face(self) -> int:
+        """The next die face."""
+        if self._index >= len(self._block):
+            self._refill()
+        value = self._block[self._index]
+        self._index += 1
+        return value
+
+    def roll(self, count: int) -> List[int]:
+        """The next count die faces."""
+        end = self._index + count
+        if end <= len(self._block):
+            values = self._block[self._index:end]
+            self._index = end
+            return values
+        return [self.face() for _ in range(count)]
+
+    def copy(self) -> 'DiceRNG':
+        """
+        A stream that hands out the same faces, and spawns the same substreams, as this one
+        from here on. A started stream's generator state and block are copied, so the copy
+        carries on at once instead of regenerating every face drawn so far.
+        """
+        rng = DiceRNG(self.seed, self.faces, self.block_size, self.backend, self.position, self._spawned)
+        if self._generator is not None:
+            rng._generator = deepcopy(self._generator)
+            # Blocks are replaced, never changed in place, so the current one can be shared.
+            rng._block = self._block
+            rng._index = self._index
+            rng._drawn = self._drawn
+        return rng
+
+    def spawn(self, count: int = 1) -> List['DiceRNG']:
+        """Independent streams derived from this one's seed. Each call returns new streams."""
+        children = [DiceRNG(derive_seed(self.seed, self._spawned + i), self.faces, self.block_size, self.backend)
+                    for i in range(count)]
+        self._spawned += count
+        return children
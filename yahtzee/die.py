@@ -1,17 +1,24 @@
-from dataclasses import dataclass
+from yahtzee.state import GameState
 
 
-@dataclass
 class Die:
-    _value: int = 1
+    """A single die, viewed through the game state that holds its value."""
+    __slots__ = ('state', 'index')
+    state: GameState
+    index: int
+
+    def __init__(self, state: GameState, index: int):
+        self.state = state
+        self.index = index
 
     @property
     def value(self) -> int:
-        return self._value
+        return self.state.die_value(self.index)
 
     @value.setter
     def value(self, val):
-        if 1 > val > 6:
-            raise ValueError('Cannot land on a value less than one or greater than 6.')
+        faces = self.state.variant.faces
+        if not 1 <= val <= faces:
+            raise ValueError(f'Cannot land on a value less than one or greater than {faces}.')
 
-        self._value = val
+        self.state.set_die_value(self.index, val)
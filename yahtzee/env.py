@@ -0,0 +1,155 @@
+"""
+A vectorized environment that plays many solo games in lockstep, for self-play and training.
+
+Every game's state is a row of a few NumPy arrays, and step() advances all of them with
+a fixed number of array operations, however many games there are. The interface follows
+Gymnasium's vector environments without depending on it:
+
+    env = VectorEnv(4096, seed=0)
+    observations, info = env.reset()
+    observations, rewards, terminated, truncated, info = env.step(actions)
+
+Actions are integers. 0 to 31 roll again, holding the dice whose bits are set (bit i is
+die i); N_HOLD_ACTIONS + c locks in the rule in column c of the score table. Each turn
+starts with its first roll already made, so a turn has at most two hold actions. Rewards
+are the points a lock earns: the rule's value from the score table plus any bonus it
+brings (see yahtzee.scorecard), so a game's rewards add up to what Game.score would be.
+
+A game that ends is reset in the same step. Its terminated flag is set, the observation
+returned is of the new game, and info['final_score'] holds the score it finished with.
+"""
+from typing import Dict, Optional, Tuple
+
+from yahtzee.batch import hand_indices, numpy_table, standard_table
+from yahtzee.hands import DICE_COUNT, FACES
+from yahtzee.scorecard import UPPER_BONUS, UPPER_BONUS_THRESHOLD, YAHTZEE_BONUS
+from yahtzee.scoring import ScoreTable
+from yahtzee.variant import require_standard
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy isn't installed
+    np = None
+
+N_HOLD_ACTIONS = 1 << DICE_COUNT
+ROLLS_PER_TURN = 3
+
+
+class IllegalActionError(ValueError):
+    """Applies to actions that roll with no rolls left, or lock a rule that's already locked."""
+
+
+class VectorEnv:
+    """
+    N games of one rule set, stepped together.
+
+    Observations are a dict of arrays: 'dice' (N, 5) int8, 'rolls_left' (N,) int8 and
+    'locked' (N,) int32, the bitmask of locked columns. Arrays handed out are never
+    written to afterwards, so they can be kept across steps.
+    """
+    num_envs: int
+    table: ScoreTable
+    n_actions: int
+
+    def __init__(self, num_envs: int, table: Optional[ScoreTable] = None, seed: Optional[int] = None):
+        if np is None:
+            raise RuntimeError('NumPy is not installed.')
+        self.num_envs = num_envs
+        self.table = table if table is not None else standard_table()
+        require_standard(self.table.variant, 'VectorEnv')
+        rule_count = len(self.table.rules)
+        self.n_actions = N_HOLD_ACTIONS + rule_count
+        self._full = (1 << rule_count) - 1
+
+        self._scores = numpy_table(self.table).astype(np.int32)
+        self._bits = np.arange(DICE_COUNT, dtype=np.int32)
+        # Which columns are still open, for every locked mask.
+        self._open = (np.arange(1 << rule_count, dtype=np.int32)[:, None] >> np.arange(rule_count) & 1) == 0
+        self._upper = np.array([self.table.upper_mask >> c & 1 for c in range(rule_count)], dtype=bool)
+        self._yahtzee = self.table.yahtzee_column
+        self.reset(seed)
+
+    @staticmethod
+    def lock_action(column: int) -> int:
+        """The action that locks in the rule in the given column."""
+        return N_HOLD_ACTIONS + column
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[Dict[str, 'np.ndarray'], dict]:
+        """Starts every game over, reseeding the dice if a seed is given."""
+        if seed is not None or not hasattr(self, '_rng'):
+            self._rng = np.random.default_rng(seed)
+        n = self.num_envs
+        self.dice = self._roll(n)
+        self.rolls_left = np.full(n, ROLLS_PER_TURN - 1, dtype=np.int8)
+        self.locked = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int32)
+        self.upper_total = np.zeros(n, dtype=np.int32)
+        self.yahtzee_scored = np.zeros(n, dtype=bool)
+        return self.observations(), {}
+
+    def _roll(self, n: int) -> 'np.ndarray':
+        return self._rng.integers(1, FACES + 1, size=(n, DICE_COUNT), dtype=np.int8)
+
+    def observations(self) -> Dict[str, 'np.ndarray']:
+        return {'dice': self.dice, 'rolls_left': self.rolls_left, 'locked': self.locked}
+
+    def action_masks(self) -> 'np.ndarray':
+        """(N, n_actions) bool array of which actions each game can take."""
+        masks = np.empty((self.num_envs, self.n_actions), dtype=bool)
+        masks[:, :N_HOLD_ACTIONS] = (self.rolls_left > 0)[:, None]
+        masks[:, N_HOLD_ACTIONS:] = self._open[self.locked]
+        return masks
+
+    def step(self, actions) -> Tuple[Dict[str, 'np.ndarray'], 'np.ndarray', 'np.ndarray', 'np.ndarray', dict]:
+        """
+        Takes one action in every game.
+
+        Returns observations, int32 rewards, terminated and truncated flags (games never
+        truncate), and info with 'final_score'. Raises IllegalActionError, changing
+        nothing, if any game is given an action it can't take.
+        """
+        actions = np.asarray(actions, dtype=np.int32)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f'Expected {self.num_envs} actions, got shape {actions.shape}.')
+        if actions.min() < 0 or actions.max() >= self.n_actions:
+            raise IllegalActionError(f'Actions must be between 0 and {self.n_actions - 1}.')
+
+        holding = actions < N_HOLD_ACTIONS
+        column = np.maximum(actions - N_HOLD_ACTIONS, 0)
+        illegal = np.where(holding, self.rolls_left == 0, self.locked >> column & 1)
+        if illegal.any():
+            index = int(np.flatnonzero(illegal)[0])
+            raise IllegalActionError(f'Game {index} cannot take action {int(actions[index])}.')
+        locking = ~holding
+
+        # Scoring uses the dice as they were before this step's roll.
+        hands = hand_indices(self.dice)
+        value = np.where(locking, self._scores[hands, column], 0)
+        upper = locking & self._upper[column]
+        upper_total = self.upper_total + np.where(upper, value, 0)
+        rewards = value + UPPER_BONUS * (
+            (self.upper_total < UPPER_BONUS_THRESHOLD) & (upper_total >= UPPER_BONUS_THRESHOLD))
+        yahtzee_scored = self.yahtzee_scored
+        if self._yahtzee is not None:
+            is_yahtzee = column == self._yahtzee
+            rolled_yahtzee = self._scores[hands, self._yahtzee] > 0
+            rewards = rewards + YAHTZEE_BONUS * (locking & ~is_yahtzee & yahtzee_scored & rolled_yahtzee)
+            yahtzee_scored = np.where(locking & is_yahtzee, value > 0, yahtzee_scored)
+
+        # Holding rerolls the dice that aren't held; locking rolls all of them for the next turn.
+        held = (actions[:, None] >> self._bits & 1).astype(bool)
+        reroll = locking[:, None] | ~held
+        self.dice = np.where(reroll, self._roll(self.num_envs), self.dice)
+        self.rolls_left = np.where(locking, ROLLS_PER_TURN - 1, self.rolls_left - holding).astype(np.int8)
+        locked = self.locked | np.where(locking, 1 << column, 0)
+        score = self.score + rewards
+
+        terminated = locked == self._full
+        final_score = np.where(terminated, score, 0)
+        self.locked = np.where(terminated, 0, locked)
+        self.score = np.where(terminated, 0, score)
+        self.upper_total = np.where(terminated, 0, upper_total)
+        self.yahtzee_scored = yahtzee_scored & ~terminated
+
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        return self.observations(), rewards, terminated, truncated, {'final_score': final_score}
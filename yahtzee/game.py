@@ -1,8 +1,17 @@
-from random import randint
-from typing import List
+from typing import TYPE_CHECKING, List, Optional, Sequence
 
+from yahtzee.dice_rng import DiceRNG
 from yahtzee.die import Die
-from yahtzee.rules import Rule, RuleNotMetError
+from yahtzee.rules import Rule
+from yahtzee.scoring import ScoreTable
+from yahtzee.scorecard import Scorecard
+from yahtzee.state import GameState
+from yahtzee.variant import Variant
+
+if TYPE_CHECKING:
+    from yahtzee.journal import GameRecorder
+    from yahtzee.metrics import Metrics
+    from yahtzee.solver import Strategy
 
 
 class IncompleteTurnError(Exception):
@@ -11,110 +20,271 @@ class IncompleteTurnError(Exception):
 
 class DieController:
     """Controls the behavior of the die passed to it."""
+    __slots__ = ('die', '_game')
     die: Die
-    holding: bool = False
+    _game: 'Game'
 
-    def __init__(self, die: Die):
+    def __init__(self, die: Die, game: 'Game'):
         self.die = die
+        self._game = game
 
     @property
     def value(self) -> int:
         """Value that the die is currently on."""
         return self.die.value
 
+    @property
+    def holding(self) -> bool:
+        """Whether the die is held back from the next roll."""
+        return bool(self.die.state.hold_mask >> self.die.index & 1)
+
+    @holding.setter
+    def holding(self, hold: bool):
+        if hold:
+            self._game.hold_mask |= 1 << self.die.index
+        else:
+            self._game.hold_mask &= ~(1 << self.die.index)
+
     def roll(self) -> None:
         """Rolls the die only if it's not being held."""
         if not self.holding:
-            self.die.value = randint(1, 6)
+            self.die.value = self._game.rng.face()
 
 
 class RuleController:
     """
     Tracks the status of each rule and provides some logic to help facilitate the game.
 
-    NOTE: I'm not sure that I like the fact that this class knows about the dice.
+    This is a view over one column of the game's state and score table.
     """
-    _rule: Rule
-    _locked_in: bool = False
-    _locked_value: int = 0
-    _dice_ref: List[Die]
+    __slots__ = ('_game', '_column')
+    _game: 'Game'
+    _column: int
 
-    def __init__(self, rule: Rule, dice_ref: List[Die]):
-        self._rule = rule
-        self._dice_ref = dice_ref
+    def __init__(self, game: 'Game', column: int):
+        self._game = game
+        self._column = column
+
+    @property
+    def rule(self) -> Rule:
+        """The rule this controller tracks."""
+        return self._game.score_table.rules[self._column]
 
     @property
     def rule_name(self):
         """Just a pass-through for the rule's friendly name."""
-        return self._rule.name
+        return self.rule.name
+
+    @property
+    def column(self) -> int:
+        """Position of the rule in the game's score table and locked mask."""
+        return self._column
 
     @property
     def locked_in(self):
         """Represents whether the rule has been locked-in or not."""
-        return self._locked_in
+        return bool(self._game.state.locked_mask >> self._column & 1)
 
     @property
     def locked_value(self):
         """The value that the object was locked-in with."""
-        return self._locked_value
+        return self._game.state.values[self._column]
 
     def calculate_value(self):
         """Calculates the value of the rule with the given dice and return 0 if the rule is not met."""
-        die_values = [d.value for d in self._dice_ref]
-        try:
-            return self._rule.calculate_value(dice_values=die_values)
-        except RuleNotMetError:
-            return 0
+        game = self._game
+        if game.metrics is not None:
+            game.metrics.calculate_value_calls += 1
+        return game.score_table.lookup(game.state.hand, self._column)
 
     def lock_in(self):
         """Locks in the rule's current value and changes the controller's status."""
-        if not self.locked_in:
-            self._locked_in = True
-            self._locked_value = self.calculate_value()
+        self._game.lock_in_column(self._column)
 
 
 class Game:
     """
     Class to control the dice, rules, and scoring.
+
+    All of a game's state lives in a compact GameState; the dice and controllers are views
+    over it, created on first use. Games made with fresh() or copy() share the score table.
+    Dice are rolled from the injected DiceRNG, so a game replays exactly from its seed.
+    If a recorder is attached (see yahtzee.journal), every roll, hold and lock is reported to it,
+    and if metrics are attached (see yahtzee.metrics), rolls and rule calculations are counted.
+    Totals and bonuses are kept by the state's Scorecard as rules are locked in.
     """
-    dice: List[Die]
-    die_controllers: List[DieController]
-    rule_controllers: List[RuleController] = []
-    roll_count = 0
+    __slots__ = ('state', 'score_table', 'rng', 'recorder', 'metrics', '_dice', '_die_controllers',
+                 '_rule_controllers')
+    state: GameState
+    score_table: ScoreTable
+    rng: DiceRNG
+    recorder: Optional['GameRecorder']
+    metrics: Optional['Metrics']
 
-    def __init__(self):
-        self.dice = [Die() for _ in range(5)]
-        self.die_controllers = [DieController(d) for d in self.dice]
+    def __init__(self, score_table: Optional[ScoreTable] = None, rng: Optional[DiceRNG] = None):
+        """
+        The dice are the score table's variant. A randomly seeded DiceRNG is used if none
+        is given; one that's given must roll the variant's number of faces.
+        """
+        self.score_table = score_table if score_table is not None else ScoreTable()
+        variant = self.score_table.variant
+        self.rng = rng if rng is not None else DiceRNG(faces=variant.faces)
+        if self.rng.faces != variant.faces:
+            raise ValueError(f'The dice have {variant.faces} faces, but the DiceRNG rolls {self.rng.faces}.')
+        self.state = GameState(len(self.score_table.rules), variant)
+        self.recorder = None
+        self.metrics = None
+        self._dice = None
+        self._die_controllers = None
+        self._rule_controllers = None
 
     def register_rule(self, rule: Rule):
-        self.rule_controllers.append(RuleController(rule, self.dice))
+        """Adds a rule to this game. The score table is copied first, since other games may share it."""
+        self.score_table = self.score_table.copy()
+        self.score_table.add_rule(rule)
+        self.state.values.append(0)
+        self._rule_controllers = None
+
+    def fresh(self, rng: Optional[DiceRNG] = None) -> 'Game':
+        """A new game with the same rules registered, sharing this game's score table."""
+        return Game(self.score_table, rng)
+
+    def copy(self, rng: Optional[DiceRNG] = None) -> 'Game':
+        """
+        An independent copy of this game in its current state, sharing the score table.
+        Without an rng, the copy rolls the same dice this game would from here on.
+        """
+        game = Game.__new__(Game)
+        game.score_table = self.score_table
+        game.rng = rng if rng is not None else self.rng.copy()
+        game.state = self.state.copy()
+        game.recorder = game.metrics = None
+        game._dice = game._die_controllers = game._rule_controllers = None
+        return game
+
+    @property
+    def variant(self) -> Variant:
+        """How many dice the game has and how many faces they have."""
+        return self.state.variant
+
+    @property
+    def dice(self) -> List[Die]:
+        if self._dice is None:
+            self._dice = [Die(self.state, i) for i in range(self.state.variant.dice)]
+        return self._dice
+
+    @property
+    def die_controllers(self) -> List[DieController]:
+        if self._die_controllers is None:
+            self._die_controllers = [DieController(d, self) for d in self.dice]
+        return self._die_controllers
+
+    @property
+    def rule_controllers(self) -> List[RuleController]:
+        if self._rule_controllers is None:
+            self._rule_controllers = [RuleController(self, c) for c in range(len(self.state.values))]
+        return self._rule_controllers
+
+    @property
+    def dice_values(self) -> Sequence[int]:
+        return self.state.dice_values
+
+    @property
+    def hold_mask(self) -> int:
+        """Bitmask of the held dice, where bit i is the i-th die."""
+        return self.state.hold_mask
+
+    @hold_mask.setter
+    def hold_mask(self, mask: int):
+        if self.recorder is not None and mask != self.state.hold_mask and not self.game_over:
+            self.recorder.hold(mask)
+        self.state.hold_mask = mask
+
+    @property
+    def roll_count(self) -> int:
+        return self.state.roll_count
+
+    @roll_count.setter
+    def roll_count(self, count: int):
+        self.state.roll_count = count
 
     def lock_in_rule(self, rule_controller: RuleController):
         rule_controller.lock_in()
 
-        for dc in self.die_controllers:
-            dc.holding = False
+        self.hold_mask = 0
+        self.state.roll_count = 0
+        if not self.game_over:
+            self.roll()
 
-        self.roll_count = 0
-        self.roll()
+    def lock_in_column(self, column: int):
+        """Locks in the rule in the given column with its current value, if it isn't already."""
+        state = self.state
+        if not state.locked_mask >> column & 1:
+            state.locked_mask |= 1 << column
+            hand = state.hand
+            state.values[column] = value = self.score_table.lookup(hand, column)
+            state.scorecard.record(self.score_table, column, value, hand)
+
+            if self.recorder is not None:
+                self.recorder.lock(column, state.values[column])
+                if self.game_over:
+                    self.recorder.end(self.score)
+
+    @property
+    def score(self) -> int:
+        """Locked-in values plus any upper-section and Yahtzee bonuses earned."""
+        return self.state.scorecard.score
 
     @property
-    def score(self):
-        return sum([r.locked_value for r in self.rule_controllers])
+    def scorecard(self) -> Scorecard:
+        return self.state.scorecard
 
     def roll(self):
-        if self.roll_count >= 3:
+        state = self.state
+        if state.roll_count >= 3:
             raise IncompleteTurnError("You must lock in a rule before rolling again.")
 
-        for slot in self.die_controllers:
-            slot.roll()
+        held = state.hold_mask
+        variant = state.variant
+        dice, face_count = state.dice, variant.faces
+        faces = iter(self.rng.roll(variant.dice - bin(held).count('1')))
+        code = 0
+        for i, place in enumerate(variant.places):
+            if held >> i & 1:
+                code += dice // place % face_count * place
+            else:
+                code += (next(faces) - 1) * place
+        state.dice = code
+
+        state.roll_count += 1
+        if self.recorder is not None:
+            self.recorder.roll(state.roll_count, code)
+        if self.metrics is not None:
+            self.metrics.rolls += 1
 
-        self.roll_count += 1
+    @property
+    def game_over(self) -> bool:
+        return self.state.scorecard.filled == len(self.state.values)
+
+    @property
+    def locked_mask(self) -> int:
+        """Bitmask of the locked rules, where bit i is the i-th registered rule."""
+        return self.state.locked_mask
 
     @property
-    def game_over(self):
-        return all([rc.locked_in for rc in self.rule_controllers])
+    def hand(self) -> int:
+        """Index of the current dice in yahtzee.hands.HANDS."""
+        return self.state.hand
+
+    def expected_final_score(self, strategy: 'Strategy') -> float:
+        """
+        Expected final score if the rest of the game is played by the given solved strategy.
+        Bonuses already earned are included; ones still to come aren't, as the solver ignores them.
+        """
+        if strategy.rule_count != len(self.state.values):
+            raise ValueError('The strategy was solved for a different set of rules.')
+        return self.score + strategy.position_value(self.locked_mask, self.hand, 3 - self.roll_count)
 
     @property
-    def locked_rules_count(self):
-        return len([rc for rc in self.rule_controllers if rc.locked_in])
+    def locked_rules_count(self) -> int:
+        return self.state.scorecard.filled
@@ -0,0 +1,32 @@
+"""
+Enumeration of every distinct hand that five six-sided dice can show.
+
+Order doesn't matter when scoring, so a hand is just the sorted tuple of die values.
+There are only 252 of them, which makes it cheap to precompute anything that depends
+on the dice alone.
+"""
+from itertools import combinations_with_replacement, product
+from typing import Dict, Iterable, Tuple
+
+DICE_COUNT = 5
+FACES = 6
+
+HANDS: Tuple[Tuple[int, ...], ...] = tuple(combinations_with_replacement(range(1, FACES + 1), DICE_COUNT))
+HAND_INDEX: Dict[Tuple[int, ...], int] = {hand: i for i, hand in enumerate(HANDS)}
+
+# Hand index for every ordered roll, keyed by its roll code (see roll_code).
+ROLL_TO_HAND: Tuple[int, ...] = tuple(HAND_INDEX[tuple(sorted(roll))]
+                                      for roll in product(range(1, FACES + 1), repeat=DICE_COUNT))
+
+
+def hand_index(dice_values: Iterable[int]) -> int:
+    """Index into HANDS of the hand shown by the given dice, in any order."""
+    return HAND_INDEX[tuple(sorted(dice_values))]
+
+
+def roll_code(dice_values: Iterable[int]) -> int:
+    """Packs an ordered roll into a single int in range(FACES ** DICE_COUNT), first die most significant."""
+    code = 0
+    for value in dice_values:
+        code = code * FACES + value - 1
+    return code
@@ -0,0 +1,274 @@
+"""
+Persistent store of finished games and their scores, in a local SQLite database.
+
+Every finished game is one row: the player, final score and bonus, the DiceRNG seed
+(so the game can be replayed), when it was played, and the locked value of every rule
+packed into a blob of uint16s, in the order of the store's rule names. Indexes on
+(score) and (player, score) keep top-K overall and top-K for a player to an index walk
+however many games there are. A date range can hold most of the games, so top-K over
+one isn't a walk of (played_at): each game also has its UTC day, and (played_day, score)
+gives the top K of every day in the range, which are merged. (played_at) serves listing
+games in date order.
+
+Writes are batched into transactions: record() is one, and record_many() commits every
+batch_size games, which is what simulations should use. leaderboard() is served from an
+in-process LRU cache that's dropped whenever the database changes, from this store or
+any other connection to it.
+
+Usage: python -m yahtzee.highscores FILE [--player NAME] [--top K] [--since DATE] [--until DATE]
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from yahtzee.game import Game
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rules (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    bonus INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    played_day INTEGER NOT NULL,
+    locked_values BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_by_player ON games (player, score DESC);
+CREATE INDEX IF NOT EXISTS games_by_time ON games (played_at);
+CREATE INDEX IF NOT EXISTS games_by_day ON games (played_day, score DESC);
+"""
+COLUMNS = 'id, player, score, bonus, seed, played_at, locked_values'
+INSERT = ('INSERT INTO games (player, score, bonus, seed, played_at, played_day, locked_values) '
+          'VALUES (?, ?, ?, ?, ?, ?, ?)')
+BATCH_SIZE = 10_000
+DAY = 86400
+# Seeds are unsigned 64-bit; SQLite integers are signed.
+SEED_OFFSET = 1 << 64
+
+
+class HighScoreError(Exception):
+    """Applies to games that can't be stored, such as ones with other rules than the store's."""
+
+
+@dataclass(frozen=True)
+class GameResult:
+    """One stored game."""
+    id: int
+    player: str
+    score: int
+    bonus: int
+    seed: int
+    played_at: float
+    values: Dict[str, int]
+
+
+class HighScores:
+    """A high-score database. Use as a context manager, or call close() when done."""
+    path: str
+    rule_names: Optional[List[str]]
+
+    def __init__(self, path: str, cache_size: int = 128):
+        self.path = path
+        # Waits out other writers, such as simulation workers recording their shards.
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+        names = [name for name, in self._db.execute('SELECT name FROM rules ORDER BY position')]
+        self.rule_names = names or None
+        self._data_version = None
+        self._leaderboard = lru_cache(maxsize=cache_size)(self._top)
+
+    def __enter__(self) -> 'HighScores':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.execute('PRAGMA optimize')
+            self._db.close()
+            self._db = None
+
+    def _check_rules(self, game: Game) -> None:
+        names = [rule.name for rule in game.score_table.rules]
+        if self.rule_names is None:
+            self._db.executemany('INSERT INTO rules (position, name) VALUES (?, ?)', enumerate(names))
+            self.rule_names = names
+        elif names != self.rule_names:
+            raise HighScoreError(f'{self.path} holds games with other rules.')
+
+    def _row(self, player: str, game: Game, played_at: Optional[float]) -> tuple:
+        if not game.game_over:
+            raise HighScoreError('Only finished games can be recorded.')
+        values = game.state.values
+        if sys.byteorder != 'little':
+            values = values[:]
+            values.byteswap()
+        seed = game.rng.seed
+        if played_at is None:
+            played_at = time.time()
+        return (player, game.score, game.scorecard.bonus, seed - SEED_OFFSET if seed >= 1 << 63 else seed,
+                played_at, int(played_at // DAY), values.tobytes())
+
+    def record(self, player: str, game: Game, played_at: Optional[float] = None) -> int:
+        """Stores a finished game, played now unless played_at (Unix time) says otherwise, and returns its id."""
+        with self._transaction():
+            self._check_rules(game)
+            cursor = self._db.execute(INSERT, self._row(player, game, played_at))
+        return cursor.lastrowid
+
+    def record_many(self, results: Iterable[Tuple[str, Game]], batch_size: int = BATCH_SIZE) -> int:
+        """
+        Stores (player, game) pairs, committing every batch_size of them, and returns how many
+        were stored. The pairs are consumed as they come, so they can be played on the way.
+        """
+        results = iter(results)
+        stored = 0
+        while True:
+            batch = list(islice(results, batch_size))
+            if not batch:
+                return stored
+            rows = [self._row(player, game, None) for player, game in batch]
+            with self._transaction():
+                for game in {id(game.score_table): game for _, game in batch}.values():
+                    self._check_rules(game)
+                self._db.executemany(INSERT, rows)
+            stored += len(batch)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._leaderboard.cache_clear()
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+
+    def _result(self, row: tuple) -> GameResult:
+        game_id, player, score, bonus, seed, played_at, blob = row
+        values = array('H', blob)
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return GameResult(game_id, player, score, bonus, seed + SEED_OFFSET if seed < 0 else seed, played_at,
+                          dict(zip(self.rule_names or (), values)))
+
+    def _top(self, k: int, player: Optional[str], since: Optional[float], until: Optional[float]
+             ) -> Tuple[GameResult, ...]:
+        where, params = [], []
+        if player is not None:
+            where.append('player = ?')
+            params.append(player)
+        if since is not None:
+            where.append('played_at >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('played_at < ?')
+            params.append(until)
+        if player is None and where:
+            rows = self._top_by_day(k, since, until, ' AND '.join(where), params)
+        else:
+            sql = f'SELECT {COLUMNS} FROM games'
+            if where:
+                sql += ' WHERE ' + ' AND '.join(where)
+            rows = self._db.execute(sql + ' ORDER BY score DESC, id LIMIT ?', (*params, k))
+        return tuple(self._result(row) for row in rows)
+
+    def _top_by_day(self, k: int, since: Optional[float], until: Optional[float], where: str,
+                    params: List[float]) -> List[tuple]:
+        first, last = self._db.execute('SELECT (SELECT MIN(played_day) FROM games), (SELECT MAX(played_day) FROM games)').fetchone()
+        if first is None or k <= 0:
+            return []
+        if since is not None:
+            first = max(first, int(since // DAY))
+        if until is not None:
+            last = min(last, int(until // DAY))
+        sql = (f'SELECT {COLUMNS} FROM games INDEXED BY games_by_day WHERE played_day = ? AND {where} '
+               'AND score >= ? ORDER BY score DESC, id LIMIT ?')
+        best: List[tuple] = []
+        threshold = 0
+        for day in range(first, last + 1):
+            rows = self._db.execute(sql, (day, *params, threshold, k)).fetchall()
+            if rows:
+                best += rows
+                best.sort(key=lambda row: (-row[2], row[0]))
+                del best[k:]
+                if len(best) == k:
+                    threshold = best[-1][2]
+        return best
+
+    def top(self, k: int = 10, player: Optional[str] = None, since: Optional[float] = None,
+            until: Optional[float] = None) -> List[GameResult]:
+        """The k best games, optionally of one player and played in [since, until) (Unix times)."""
+        return list(self._top(k, player, since, until))
+
+    def leaderboard(self, k: int = 10, player: Optional[str] = None) -> Tuple[GameResult, ...]:
+        """The k best games, overall or of one player, from the cache when nothing has changed since."""
+        version = self._db.execute('PRAGMA data_version').fetchone()[0]
+        if version != self._data_version:
+            self._leaderboard.cache_clear()
+            self._data_version = version
+        return self._leaderboard(k, player, None, None)
+
+    def games_between(self, since: float, until: float, limit: int = 1000) -> List[GameResult]:
+        """Games played in [since, until), oldest first."""
+        rows = self._db.execute(f'SELECT {COLUMNS} FROM games WHERE played_at >= ? AND played_at < ? '
+                                'ORDER BY played_at, id LIMIT ?', (since, until, limit))
+        return [self._result(row) for row in rows]
+
+    def count(self, player: Optional[str] = None) -> int:
+        if player is None:
+            return self._db.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+        return self._db.execute('SELECT COUNT(*) FROM games WHERE player = ?', (player,)).fetchone()[0]
+
+    def players(self) -> List[Tuple[str, int, int]]:
+        """Every player with their number of games and best score, best first."""
+        return self._db.execute('SELECT player, COUNT(*), MAX(score) FROM games GROUP BY player '
+                                'ORDER BY MAX(score) DESC').fetchall()
+
+
+def format_results(results: Sequence[GameResult]) -> str:
+    lines = [f'{"#":>4}  {"score":>5}  {"player":<20} {"played":<19}  seed']
+    for rank, result in enumerate(results, 1):
+        played = datetime.fromtimestamp(result.played_at).strftime('%Y-%m-%d %H:%M:%S')
+        lines.append(f'{rank:>4}  {result.score:>5}  {result.player:<20} {played}  {result.seed}')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the best games in a high-score database.')
+    parser.add_argument('path')
+    parser.add_argument('--player')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--since', type=datetime.fromisoformat, help='ISO date or time, inclusive')
+    parser.add_argument('--until', type=datetime.fromisoformat, help='ISO date or time, exclusive')
+    args = parser.parse_args()
+
+    with HighScores(args.path) as scores:
+        start = time.perf_counter()
+        results = scores.top(args.top, args.player, args.since and args.since.timestamp(),
+                             args.until and args.until.timestamp())
+        elapsed = time.perf_counter() - start
+        print(format_results(results))
+        print(f'{scores.count():,} games stored; query took {elapsed * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Append-only binary journal of everything that happens in a game, and replay of it.
+
+Every event is one fixed-width RECORD: game id, kind, two small arguments and a 64-bit
+payload. A game's id is the position of its NEW record in the file, so ids stay unique
+across any number of appends without reading the file back. Records are packed into a
+buffer and written out in large chunks.
+
+    NEW    a = rule count                      payload = DiceRNG seed (default backend and block size)
+    ROLL   a = roll count after the roll       b = roll code of the dice
+    HOLD   a = hold mask (never written after END)
+    LOCK   a = rule column                     b = locked value
+    END                                        b = final score
+"""
+import os
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from yahtzee.dice_rng import BACKENDS, BLOCK_SIZE, DiceRNG
+from yahtzee.scorecard import Scorecard
+from yahtzee.scoring import ScoreTable
+
+if TYPE_CHECKING:
+    from yahtzee.game import Game
+
+RECORD = struct.Struct('<IBBHQ')
+NEW, ROLL, HOLD, LOCK, END = range(1, 6)
+
+
+class JournalError(Exception):
+    """Applies to journals that can't be written or read back."""
+
+
+class Journal:
+    """Buffered writer for a journal file. Use as a context manager, or call close() when done."""
+
+    def __init__(self, path: str, buffer_records: int = 8192):
+        self.path = path
+        self._file = open(path, 'ab')
+        size = self._file.tell()
+        if size % RECORD.size:
+            self._file.close()
+            raise JournalError(f'{path} ends with a partial record.')
+        self._records = size // RECORD.size
+        self._buffer = bytearray()
+        self._buffer_limit = buffer_records * RECORD.size
+
+    def __enter__(self) -> 'Journal':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, game_id: int, kind: int, a: int = 0, b: int = 0, payload: int = 0) -> None:
+        self._buffer += RECORD.pack(game_id, kind, a, b, payload)
+        self._records += 1
+        if len(self._buffer) >= self._buffer_limit:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(self._buffer)
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def record(self, game: 'Game') -> 'GameRecorder':
+        """Starts journaling a new game, which must not have rolled yet."""
+        if game.variant.ordered_roll_count > 1 << 16:
+            raise JournalError(f'Roll codes of {game.variant} are too large for journal records.')
+        if game.variant.dice > 8:
+            raise JournalError(f'Hold masks of {game.variant} are too large for journal records.')
+        rng = game.rng
+        if rng.backend != BACKENDS[0] or rng.block_size != BLOCK_SIZE or rng.position:
+            # Only the seed is recorded, so replay_games can only recreate a stream from its defaults.
+            raise JournalError(f'Only games rolling from a fresh {BACKENDS[0]} DiceRNG with block size '
+                               f'{BLOCK_SIZE} can be journaled.')
+        recorder = GameRecorder(self, self._records)
+        self.write(recorder.game_id, NEW, len(game.state.values), 0, game.rng.seed)
+        game.recorder = recorder
+        return recorder
+
+
+class GameRecorder:
+    """Writes one game's events to a journal. Game calls these as things happen."""
+    __slots__ = ('journal', 'game_id')
+
+    def __init__(self, journal: Journal, game_id: int):
+        self.journal = journal
+        self.game_id = game_id
+
+    def roll(self, roll_count: int, dice: int) -> None:
+        self.journal.write(self.game_id, ROLL, roll_count, dice)
+
+    def hold(self, hold_mask: int) -> None:
+        self.journal.write(self.game_id, HOLD, hold_mask)
+
+    def lock(self, column: int, value: int) -> None:
+        self.journal.write(self.game_id, LOCK, column, value)
+
+    def end(self, score: int) -> None:
+        self.journal.write(self.game_id, END, 0, score)
+
+
+def iter_records(path: str, chunk_records: int = 65536) -> Iterator[Tuple[int, int, int, int, int]]:
+    """Every record in the journal as (game id, kind, a, b, payload), read in large chunks."""
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_records * RECORD.size):
+            if len(chunk) % RECORD.size:
+                raise JournalError(f'{path} ends with a partial record.')
+            yield from RECORD.iter_unpack(chunk)
+
+
+@dataclass
+class ReplayResult:
+    game_id: int
+    score: int
+    mismatches: int
+
+
+def replay_scores(path: str, table: ScoreTable) -> Iterator[ReplayResult]:
+    """
+    Re-scores every finished game in the journal against the table, without building games.
+
+    A mismatch is a locked value that the table scores differently for the dice rolled
+    just before it, or a final score that isn't the sum of the locked values and bonuses.
+    """
+    dice: Dict[int, int] = {}
+    cards: Dict[int, Scorecard] = {}
+    mismatches: Dict[int, int] = {}
+    rows = table.rows
+    hand_of_code = table.variant.hand_of_code
+
+    for game_id, kind, a, b, _ in iter_records(path):
+        if kind != NEW and game_id not in dice:
+            continue
+        if kind == ROLL:
+            dice[game_id] = b
+        elif kind == LOCK:
+            hand = hand_of_code(dice[game_id])
+            cards[game_id].record(table, a, b, hand)
+            if rows[hand][a] != b:
+                mismatches[game_id] += 1
+        elif kind == NEW:
+            dice[game_id] = 0
+            cards[game_id] = Scorecard()
+            mismatches[game_id] = 0
+        elif kind == END:
+            count = mismatches.pop(game_id) + (cards.pop(game_id).score != b)
+            del dice[game_id]
+            yield ReplayResult(game_id, b, count)
+
+
+def replay_games(path: str, template: 'Game') -> Iterator[Tuple['Game', ReplayResult]]:
+    """
+    Plays every finished game in the journal back through a fresh copy of the template.
+
+    Dice are re-rolled from each game's recorded seed, so a mismatch also flags a roll
+    that came out differently; the recorded dice are used from then on.
+    """
+    games: Dict[int, 'Game'] = {}
+    mismatches: Dict[int, int] = {}
+
+    for game_id, kind, a, b, payload in iter_records(path):
+        if kind == NEW:
+            games[game_id] = template.fresh(DiceRNG(payload, template.variant.faces))
+            mismatches[game_id] = 0
+            continue
+
+        game = games.get(game_id)
+        if game is None:
+            continue
+        if kind == ROLL:
+            game.state.roll_count = a - 1
+            game.roll()
+            if game.state.dice != b:
+                game.state.dice = b
+                mismatches[game_id] += 1
+        elif kind == HOLD:
+            game.state.hold_mask = a
+        elif kind == LOCK:
+            game.lock_in_column(a)
+            if game.state.values[a] != b:
+                game.state.values[a] = b
+                mismatches[game_id] += 1
+        elif kind == END:
+            del games[game_id]
+            count = mismatches.pop(game_id) + (game.score != b)
+            yield game, ReplayResult(game_id, b, count)
+
+
+def journal_paths(directory: str) -> List[str]:
+    """Every journal file in a directory, in name order."""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.journal'))
+
+
+def main(paths: Optional[List[str]] = None):
+    import sys
+    import time
+
+    from yahtzee.rules import standard_rules
+
+    table = ScoreTable(standard_rules())
+    games = records = bad = 0
+    start = time.perf_counter()
+    for path in paths or sys.argv[1:]:
+        records += os.path.getsize(path) // RECORD.size
+        for result in replay_scores(path, table):
+            games += 1
+            bad += bool(result.mismatches)
+    elapsed = time.perf_counter() - start
+
+    print(f'Replayed {games:,} games ({records:,} records) in {elapsed:.2f}s, '
+          f'{games / elapsed if elapsed else 0:,.0f} games/s, {bad:,} with mismatches')
+
+
+if __name__ == '__main__':
+    main()
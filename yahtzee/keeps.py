@@ -0,0 +1,31 @@
+"""
+Every group of dice a player can keep between rolls, and how they relate to each other.
+
+A keep is a sorted tuple of 0 to 5 die values. KEEPS lists them largest first, so the
+first 252 keeps are exactly HANDS (keeping everything) and every keep's children, the
+keeps one die larger, come before it. That ordering lets the expected value of any keep
+be computed in one pass: it's the average over the six faces of the next die.
+"""
+from itertools import combinations, combinations_with_replacement
+from typing import Dict, Tuple
+
+from yahtzee.hands import DICE_COUNT, FACES, HANDS
+
+KEEPS: Tuple[Tuple[int, ...], ...] = tuple(
+    keep for size in range(DICE_COUNT, -1, -1)
+    for keep in combinations_with_replacement(range(1, FACES + 1), size))
+KEEP_INDEX: Dict[Tuple[int, ...], int] = {keep: i for i, keep in enumerate(KEEPS)}
+
+# Index of the keep holding no dice at all.
+EMPTY_KEEP = KEEP_INDEX[()]
+
+# For every keep smaller than a full hand (offset by len(HANDS)), the index of each keep
+# made by adding one die showing 1 through FACES.
+KEEP_CHILDREN: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(KEEP_INDEX[tuple(sorted(keep + (face,)))] for face in range(1, FACES + 1))
+    for keep in KEEPS[len(HANDS):])
+
+# For every hand, the indices of the distinct keeps that can be held from it.
+HAND_KEEPS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(sorted({KEEP_INDEX[sub] for size in range(DICE_COUNT + 1) for sub in combinations(hand, size)}))
+    for hand in HANDS)
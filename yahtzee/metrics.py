@@ -0,0 +1,115 @@
+"""
+Counters and timers for the interactive game loop.
+
+A Metrics object is only created when instrumentation is asked for. Game and
+RuleController check a single attribute for None before counting anything, and
+StateMachine.run uses a separate loop when instrumented, so leaving it off costs
+next to nothing.
+"""
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from yahtzee.ui import Backend
+
+
+class Metrics:
+    """Per-state call counts and time, split into time blocked on input and everything else."""
+    state_calls: Dict[str, int]
+    state_seconds: Dict[str, float]
+    input_seconds: Dict[str, float]
+    rolls: int
+    calculate_value_calls: int
+    games: int
+    blocked_seconds: float
+
+    def __init__(self):
+        self.state_calls = defaultdict(int)
+        self.state_seconds = defaultdict(float)
+        self.input_seconds = defaultdict(float)
+        self.rolls = 0
+        self.calculate_value_calls = 0
+        self.games = 0
+        self.blocked_seconds = 0.0
+
+    def record_state(self, state: str, seconds: float, blocked: float) -> None:
+        self.state_calls[state] += 1
+        self.state_seconds[state] += seconds
+        self.input_seconds[state] += blocked
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "states": {
+                state: {
+                    "calls": calls,
+                    "seconds": self.state_seconds[state],
+                    "input_seconds": self.input_seconds[state],
+                    "compute_seconds": self.state_seconds[state] - self.input_seconds[state],
+                } for state, calls in self.state_calls.items()
+            },
+            "rolls": self.rolls,
+            "calculate_value_calls": self.calculate_value_calls,
+            "games": self.games,
+            "rolls_per_game": self.rolls / self.games if self.games else None,
+        }
+
+    def to_prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines: List[str] = [
+            "# HELP yahtzee_state_calls_total Calls of each state handler.",
+            "# TYPE yahtzee_state_calls_total counter",
+        ]
+        lines += [f'yahtzee_state_calls_total{{state="{s}"}} {c}' for s, c in self.state_calls.items()]
+        lines += [
+            "# HELP yahtzee_state_seconds_total Time spent in each state handler, blocked on input or not.",
+            "# TYPE yahtzee_state_seconds_total counter",
+        ]
+        for state, seconds in self.state_seconds.items():
+            blocked = self.input_seconds[state]
+            lines.append(f'yahtzee_state_seconds_total{{state="{state}",phase="input"}} {blocked}')
+            lines.append(f'yahtzee_state_seconds_total{{state="{state}",phase="compute"}} {seconds - blocked}')
+        for name, value, help_text in [
+            ("rolls", self.rolls, "Dice rolls."),
+            ("calculate_value_calls", self.calculate_value_calls, "Calls of RuleController.calculate_value."),
+            ("games", self.games, "Games played to the end."),
+        ]:
+            lines += [f"# HELP yahtzee_{name}_total {help_text}", f"# TYPE yahtzee_{name}_total counter",
+                      f"yahtzee_{name}_total {value}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Writes the metrics as Prometheus text if the path ends in .prom or .txt, otherwise as JSON."""
+        with open(path, "w") as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, indent=2)
+
+
+class TimedBackend(Backend):
+    """Wraps a backend to add the time spent waiting on every prompt to the metrics."""
+
+    def __init__(self, backend: Backend, metrics: Metrics):
+        self.backend = backend
+        self.metrics = metrics
+
+    def table(self, rows: List[List[str]]) -> str:
+        return self.backend.table(rows)
+
+    def separator(self) -> Any:
+        return self.backend.separator()
+
+    def prompt(self, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return self.backend.prompt(questions)
+        finally:
+            self.metrics.blocked_seconds += time.perf_counter() - start
+
+    def pause(self, message: str) -> None:
+        start = time.perf_counter()
+        try:
+            self.backend.pause(message)
+        finally:
+            self.metrics.blocked_seconds += time.perf_counter() - start
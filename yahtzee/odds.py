@@ -0,0 +1,127 @@
+"""
+Exact odds of how the rest of a turn can end, for a given hold and number of rolls left.
+
+Rolling the dice that aren't kept is a sparse transition from a keep (see yahtzee.keeps)
+to the hands it can become: the empty keep reaches all 252 hands, a keep of four dice
+only six. Every keep's transition is built once per process from its children's and
+shared by all engines. Distributions are then memoized by (keep, rolls left), so
+asking again about the same kept dice is a dict lookup.
+
+Holding the same dice for every remaining roll ends the same way as rolling once, so with
+no policy only the next roll counts. Given a policy choosing what to keep after each
+roll, the distribution follows that policy to the end of the turn instead.
+"""
+from collections import defaultdict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from yahtzee.hands import HAND_INDEX, HANDS
+from yahtzee.keeps import KEEP_CHILDREN, KEEP_INDEX, KEEPS
+from yahtzee.scoring import ScoreTable
+from yahtzee.solver import MAX_ROLLS
+from yahtzee.variant import require_standard
+
+if TYPE_CHECKING:
+    from yahtzee.game import Game
+    from yahtzee.solver import Strategy
+
+# (hand, rolls left) -> keep index; keeping the whole hand means stop rolling.
+KeepPolicy = Callable[[int, int], int]
+Distribution = Dict[int, float]
+
+HAND_COUNT = len(HANDS)
+
+
+@lru_cache(maxsize=1)
+def transitions() -> Tuple[Tuple[Tuple[int, ...], Tuple[float, ...]], ...]:
+    """For every keep, the hands one roll can turn it into and their probabilities."""
+    sparse: List[Tuple[Tuple[int, ...], Tuple[float, ...]]] = [((h,), (1.0,)) for h in range(HAND_COUNT)]
+    sparse += [((), ())] * (len(KEEPS) - HAND_COUNT)
+    # Children come before their parents in KEEPS, so they're always built first.
+    for k in range(HAND_COUNT, len(KEEPS)):
+        merged: Dict[int, float] = defaultdict(float)
+        for child in KEEP_CHILDREN[k - HAND_COUNT]:
+            for hand, p in zip(*sparse[child]):
+                merged[hand] += p / 6
+        hands = tuple(sorted(merged))
+        sparse[k] = (hands, tuple(merged[h] for h in hands))
+    return tuple(sparse)
+
+
+def keep_of(dice_values: Sequence[int], hold_mask: int) -> int:
+    """Keep index of the held dice."""
+    return KEEP_INDEX[tuple(sorted(v for i, v in enumerate(dice_values) if hold_mask >> i & 1))]
+
+
+def strategy_policy(strategy: 'Strategy', mask: int) -> KeepPolicy:
+    """The keeps a solved strategy makes with the given scorecard."""
+    return lambda hand, rolls_left: KEEP_INDEX[strategy.best_keep(mask, hand, rolls_left)]
+
+
+class OutcomeEngine:
+    """Distributions over final hands and rule scores, memoized per engine."""
+    table: ScoreTable
+    policy: Optional[KeepPolicy]
+
+    def __init__(self, table: ScoreTable, policy: Optional[KeepPolicy] = None):
+        require_standard(table.variant, 'OutcomeEngine')
+        self.table = table
+        self.policy = policy
+        self._transitions = transitions()
+        self._hands: Dict[Tuple[int, int], Distribution] = {}
+        self._scores: Dict[Tuple[int, int], List[Distribution]] = {}
+
+    def _keep_hands(self, keep: int, rolls: int) -> Distribution:
+        key = (keep, rolls)
+        dist = self._hands.get(key)
+        if dist is not None:
+            return dist
+
+        hands, probs = self._transitions[keep]
+        if rolls <= 1 or self.policy is None:
+            dist = dict(zip(hands, probs))
+        else:
+            merged: Dict[int, float] = defaultdict(float)
+            for hand, p in zip(hands, probs):
+                for final, q in self._finish(hand, rolls - 1).items():
+                    merged[final] += p * q
+            dist = dict(merged)
+        self._hands[key] = dist
+        return dist
+
+    def _finish(self, hand: int, rolls_left: int) -> Distribution:
+        keep = self.policy(hand, rolls_left)
+        # The first keeps are the whole hands, in hand order.
+        return {hand: 1.0} if keep == hand else self._keep_hands(keep, rolls_left)
+
+    def hand_distribution(self, dice_values: Sequence[int], hold_mask: int, rolls_left: int) -> Distribution:
+        """Probability of each final hand index, rolling the unheld dice next if any rolls are left."""
+        if rolls_left < 1:
+            return {HAND_INDEX[tuple(sorted(dice_values))]: 1.0}
+        return self._keep_hands(keep_of(dice_values, hold_mask), rolls_left)
+
+    def score_distributions(self, dice_values: Sequence[int], hold_mask: int, rolls_left: int) -> List[Distribution]:
+        """For every rule column, the probability of each score it could lock in at the end of the turn."""
+        if rolls_left < 1:
+            row = self.table.row(HAND_INDEX[tuple(sorted(dice_values))])
+            return [{score: 1.0} for score in row]
+
+        key = (keep_of(dice_values, hold_mask), rolls_left)
+        scores = self._scores.get(key)
+        if scores is None:
+            scores = [defaultdict(float) for _ in self.table.rules]
+            rows = self.table.rows
+            for hand, p in self._keep_hands(*key).items():
+                for column, score in enumerate(rows[hand]):
+                    scores[column][score] += p
+            scores = self._scores[key] = [dict(s) for s in scores]
+        return scores
+
+    def game_odds(self, game: 'Game') -> List[Distribution]:
+        """Score distributions for the game's current dice, holds and rolls left."""
+        return self.score_distributions(game.dice_values, game.hold_mask, MAX_ROLLS - game.roll_count)
+
+
+def expected(dist: Distribution) -> float:
+    """Mean of a score distribution."""
+    return sum(value * p for value, p in dist.items())
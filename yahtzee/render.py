@@ -0,0 +1,146 @@
+"""
+Incremental drawing of the dice and scorecard in a fixed pane at the top of the terminal.
+
+The pane is kept out of the way of prompts with a scroll region: prompts and messages
+scroll in the lines below it, and the pane is only touched through cursor-addressed
+writes. Each draw compares the new frame with the previous one line by line and writes
+just the changed span of each changed line, so a roll usually costs a few dozen bytes
+instead of a full redraw. Formatted rows are cached by what they show, which covers
+unchanged dice and every locked rule.
+
+Needs a terminal that understands ANSI/VT100 escapes; it's opt-in for that reason.
+"""
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from yahtzee.game import Game
+from yahtzee.scorecard import UPPER_BONUS_THRESHOLD
+
+CSI = '\x1b['
+SAVE_CURSOR, RESTORE_CURSOR = '\x1b7', '\x1b8'
+CLEAR_LINE_END = CSI + 'K'
+NAME_WIDTH = 24
+
+
+class TerminalRenderer:
+    """Draws a game's dice, turn and scorecard, writing only what changed since the last draw."""
+    out: TextIO
+    renders: int
+    render_seconds: float
+    bytes_written: int
+    full_bytes: int
+    turn_bytes: List[int]
+
+    def __init__(self, out: Optional[TextIO] = None, rows: Optional[int] = None):
+        self.out = out if out is not None else sys.stdout
+        self.rows = rows
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.bytes_written = 0
+        self.full_bytes = 0
+        self.turn_bytes = []
+        self._frame: List[str] = []
+        self._turn: Optional[int] = None
+        self._turn_start = 0
+        self._dice_rows: Dict[Tuple[int, int], List[str]] = {}
+        self._rule_rows: Dict[Tuple[int, bool, int], str] = {}
+
+    def dice_rows(self, game: Game) -> List[str]:
+        key = (game.state.dice, game.hold_mask)
+        rows = self._dice_rows.get(key)
+        if rows is None:
+            in_play = ''.join(f'{" " if game.hold_mask >> i & 1 else v:>3}' for i, v in enumerate(game.dice_values))
+            holding = ''.join(f'{v if game.hold_mask >> i & 1 else " ":>3}' for i, v in enumerate(game.dice_values))
+            rows = self._dice_rows[key] = [f'{"In-Play":<9}{in_play}', f'{"Holding":<9}{holding}']
+        return rows
+
+    def rule_row(self, game: Game, column: int) -> str:
+        rc = game.rule_controllers[column]
+        locked = rc.locked_in
+        value = rc.locked_value if locked else rc.calculate_value()
+        key = (column, locked, value)
+        row = self._rule_rows.get(key)
+        if row is None:
+            row = self._rule_rows[key] = f'{rc.rule_name:<{NAME_WIDTH}}{value:>4}{"  LOCKED" if locked else ""}'
+        return row
+
+    def frame(self, game: Game) -> List[str]:
+        """The lines of the pane for the game as it is now."""
+        return [
+            'Dice:',
+            *self.dice_rows(game),
+            f'Turn: {game.locked_rules_count + 1:<3} Roll: {game.roll_count}  Score: {game.score}  '
+            f'Upper: {game.scorecard.upper_total}/{UPPER_BONUS_THRESHOLD}  Bonus: {game.scorecard.bonus}',
+            '---',
+            *(self.rule_row(game, c) for c in range(len(game.rule_controllers))),
+            '---',
+        ]
+
+    def _start(self, height: int) -> str:
+        """Clears the screen and keeps everything below the pane scrolling on its own."""
+        rows = self.rows or shutil.get_terminal_size().lines
+        return f'{CSI}2J{CSI}{height + 1};{rows}r{CSI}{height + 1};1H'
+
+    def diff(self, frame: List[str]) -> str:
+        """Escape sequences turning the previous frame into this one."""
+        parts = []
+        for row, line in enumerate(frame):
+            old = self._frame[row] if row < len(self._frame) else ''
+            if line == old:
+                continue
+            column = 0
+            for column, (a, b) in enumerate(zip(line, old)):
+                if a != b:
+                    break
+            else:
+                column = min(len(line), len(old))
+            parts.append(f'{CSI}{row + 1};{column + 1}H{line[column:]}')
+            if len(line) < len(old):
+                parts.append(CLEAR_LINE_END)
+        for row in range(len(frame), len(self._frame)):
+            parts.append(f'{CSI}{row + 1};1H{CLEAR_LINE_END}')
+        return ''.join(parts)
+
+    def draw(self, game: Game) -> None:
+        start = time.perf_counter()
+        frame = self.frame(game)
+
+        turn = game.locked_rules_count
+        if turn != self._turn:
+            if self._turn is not None:
+                self.turn_bytes.append(self.bytes_written - self._turn_start)
+            self._turn = turn
+            self._turn_start = self.bytes_written
+
+        changes = self.diff(frame)
+        if not self._frame:
+            output = self._start(len(frame)) + SAVE_CURSOR + changes + RESTORE_CURSOR
+        elif changes:
+            output = SAVE_CURSOR + changes + RESTORE_CURSOR
+        else:
+            output = ''
+        self._frame = frame
+
+        if output:
+            self.out.write(output)
+            self.out.flush()
+        self.render_seconds += time.perf_counter() - start
+        self.renders += 1
+        self.bytes_written += len(output.encode())
+        self.full_bytes += sum(len(line.encode()) + 1 for line in frame)
+
+    def close(self) -> None:
+        """Gives the whole terminal back to scrolling."""
+        if self._frame:
+            self.out.write(f'{CSI}r{CSI}{self.rows or shutil.get_terminal_size().lines};1H\n')
+            self.out.flush()
+            self._frame = []
+
+    def summary(self) -> str:
+        turns = self.turn_bytes + [self.bytes_written - self._turn_start] if self._turn is not None else []
+        return (f'Rendering: {self.renders} draws, {self.bytes_written:,} bytes '
+                f'({self.full_bytes:,} for full redraws), '
+                f'{self.bytes_written / len(turns) if turns else 0:,.0f} bytes/turn, '
+                f'{self.render_seconds / self.renders * 1e6 if self.renders else 0:.0f}µs/draw')
@@ -24,6 +24,13 @@ class Rule(ABC):
         """Used to calculate the value based on die values"""
         pass
 
+    def score(self, dice_values: List[int]) -> int:
+        """Same as calculate_value, but returns 0 instead of raising if the rule is not met."""
+        try:
+            return self.calculate_value(dice_values)
+        except RuleNotMetError:
+            return 0
+
 
 class UpperSectionRule(Rule):
     def __init__(self, name: str, die_value: int):
@@ -72,6 +79,19 @@ class Sixes(UpperSectionRule):
         super(Sixes, self).__init__('Sixes', 6)
 
 
+UPPER_SECTION_RULES = (Aces, Twos, Threes, Fours, Fives, Sixes)
+NUMBER_NAMES = ('Sevens', 'Eights', 'Nines', 'Tens', 'Elevens', 'Twelves')
+
+
+def upper_section_rule(die_value: int) -> UpperSectionRule:
+    """The upper-section rule for a die value, including values past six on dice with more faces."""
+    if die_value <= len(UPPER_SECTION_RULES):
+        return UPPER_SECTION_RULES[die_value - 1]()
+    index = die_value - len(UPPER_SECTION_RULES) - 1
+    name = NUMBER_NAMES[index] if index < len(NUMBER_NAMES) else f'{die_value}s'
+    return UpperSectionRule(name, die_value)
+
+
 class XOfAKindRule(Rule):
     """Base class for X of a Kind rules."""
 
@@ -117,38 +137,43 @@ class FullHouse(Rule):
         raise RuleNotMetError('You must have 3 of one value and 2 of another for a Full House.')
 
 
-class SmallStraight(Rule):
-    def __init__(self):
-        super(SmallStraight, self).__init__('Small Straight')
+class StraightRule(Rule):
+    """Base class for straights: a fixed score for a run of consecutive values, whatever the faces."""
+
+    def __init__(self, name: str, length: int, points: int):
+        super(StraightRule, self).__init__(name)
+        self.length = length
+        self.points = points
 
     def calculate_value(self, dice_values: List[int]) -> int:
-        if not any({i + 1, i + 2, i + 3} < set(dice_values) for i in dice_values):
-            raise RuleNotMetError('You must have at least 4 consecutive dice values for a small straight.')
+        values = set(dice_values)
+        if not any(all(i + k in values for k in range(1, self.length)) for i in values):
+            raise RuleNotMetError(f'You must have at least {self.length} consecutive dice values for a {self.name}.')
 
-        return 30
+        return self.points
 
 
-class LargeStraight(Rule):
+class SmallStraight(StraightRule):
     def __init__(self):
-        super(LargeStraight, self).__init__('Large Straight')
+        super(SmallStraight, self).__init__('Small Straight', 4, 30)
 
-    def calculate_value(self, dice_values: List[int]) -> int:
-        if not any({i + 1, i + 2, i + 3, i + 4} < set(dice_values) for i in dice_values):
-            raise RuleNotMetError('You must have at least 5 consecutive dice values for a small straight.')
 
-        return 40
+class LargeStraight(StraightRule):
+    def __init__(self):
+        super(LargeStraight, self).__init__('Large Straight', 5, 40)
 
 
 class Yahtzee(XOfAKindRule):
-    def __init__(self):
-        super(Yahtzee, self).__init__('Yahtzee (5 of a Kind)', 5)
+    def __init__(self, dice_count: int = 5):
+        """Every die showing the same value, however many dice there are."""
+        super(Yahtzee, self).__init__(f'Yahtzee ({dice_count} of a Kind)', dice_count)
 
     def calculate_value(self, dice_values: List[int]) -> int:
         """
         Overridden since this is calc'd differently, but the same validation still applies.
         """
         if not self.validate(dice_values):
-            raise RuleNotMetError('You must have at least 5 of a kind in order to Yahtzee')
+            raise RuleNotMetError(f'You must have at least {self.count_needed} of a kind in order to Yahtzee')
         return 50
 
 
@@ -158,3 +183,35 @@ class Chance(Rule):
 
     def calculate_value(self, dice_values: List[int]) -> int:
         return sum(dice_values)
+
+
+def standard_rules() -> List[Rule]:
+    """The 13 scoring categories of a standard game, in scorecard order."""
+    return [
+        Aces(),
+        Twos(),
+        Threes(),
+        Fours(),
+        Fives(),
+        Sixes(),
+        ThreeOfAKind(),
+        FourOfAKind(),
+        FullHouse(),
+        SmallStraight(),
+        LargeStraight(),
+        Yahtzee(),
+        Chance()
+    ]
+
+
+def variant_rules(dice_count: int, faces: int) -> List[Rule]:
+    """
+    The standard categories adapted to other dice: one upper-section rule per face, and a
+    Yahtzee of every die. Straights that can't fit on the faces or the dice are left out.
+    Five six-sided dice give exactly standard_rules().
+    """
+    rules = [upper_section_rule(value) for value in range(1, faces + 1)]
+    rules += [ThreeOfAKind(), FourOfAKind(), FullHouse()]
+    rules += [rule for rule in (SmallStraight(), LargeStraight()) if rule.length <= min(dice_count, faces)]
+    rules += [Yahtzee(dice_count), Chance()]
+    return rules
@@ -0,0 +1,72 @@
+"""
+Running totals of a game's scorecard, kept up to date as rules are locked in.
+
+Every query is a field read: nothing is summed or rescanned after the fact. Bonuses
+follow the standard rules:
+
+- 35 points once the upper-section rules add up to 63 or more.
+- 100 points for every further Yahtzee rolled after Yahtzee was locked in for 50,
+  whichever rule it's locked into. Joker scoring of the lower section isn't applied.
+
+Which columns are upper-section rules and which one is Yahtzee comes from the score
+table, so games without those rules never earn the bonuses.
+"""
+from yahtzee.scoring import ScoreTable
+
+UPPER_BONUS_THRESHOLD = 63
+UPPER_BONUS = 35
+YAHTZEE_BONUS = 100
+
+
+class Scorecard:
+    """Total, upper subtotal, bonuses and filled count of one game."""
+    __slots__ = ('total', 'upper_total', 'yahtzee_scored', 'yahtzee_bonuses', 'filled')
+    total: int
+    upper_total: int
+    yahtzee_scored: bool
+    yahtzee_bonuses: int
+    filled: int
+
+    def __init__(self):
+        self.total = 0
+        self.upper_total = 0
+        self.yahtzee_scored = False
+        self.yahtzee_bonuses = 0
+        self.filled = 0
+
+    def copy(self) -> 'Scorecard':
+        card = Scorecard.__new__(Scorecard)
+        card.total = self.total
+        card.upper_total = self.upper_total
+        card.yahtzee_scored = self.yahtzee_scored
+        card.yahtzee_bonuses = self.yahtzee_bonuses
+        card.filled = self.filled
+        return card
+
+    def record(self, table: ScoreTable, column: int, value: int, hand: int) -> None:
+        """Adds a rule locked in with the given value, scored from the hand at the given index."""
+        yahtzee = table.yahtzee_column
+        if yahtzee is not None:
+            if column == yahtzee:
+                self.yahtzee_scored = value > 0
+            elif self.yahtzee_scored and table.rows[hand][yahtzee]:
+                self.yahtzee_bonuses += 1
+
+        if table.upper_mask >> column & 1:
+            self.upper_total += value
+        self.total += value
+        self.filled += 1
+
+    @property
+    def upper_bonus(self) -> int:
+        return UPPER_BONUS if self.upper_total >= UPPER_BONUS_THRESHOLD else 0
+
+    @property
+    def bonus(self) -> int:
+        """All bonus points earned so far."""
+        return self.upper_bonus + YAHTZEE_BONUS * self.yahtzee_bonuses
+
+    @property
+    def score(self) -> int:
+        """Locked-in values plus bonuses."""
+        return self.total + self.bonus
@@ -0,0 +1,67 @@
+from array import array
+from typing import Iterable, List, Optional
+
+from yahtzee.rules import Rule, UpperSectionRule, Yahtzee
+from yahtzee.variant import STANDARD, Variant
+
+
+class ScoreTable:
+    """
+    Precomputed score of every rule for every possible hand.
+
+    Each of the variant's hands (252 for five six-sided dice) gets a packed row with one
+    value per rule, in the order the rules were added, so scoring a hand is a lookup
+    instead of a call into the rule.
+    Rule.calculate_value is still the reference; the table is just built from it.
+    The table also notes which columns count toward the upper-section bonus and which
+    one is Yahtzee, for the bonuses kept by yahtzee.scorecard.Scorecard.
+    """
+    rules: List[Rule]
+    rows: List[array]
+    variant: Variant
+    upper_mask: int
+    yahtzee_column: Optional[int]
+
+    def __init__(self, rules: Iterable[Rule] = (), variant: Variant = STANDARD):
+        self.rules = []
+        self.variant = variant
+        self.rows = [array('H') for _ in variant.hands]
+        self.upper_mask = 0
+        self.yahtzee_column = None
+
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: Rule) -> int:
+        """Scores the rule against every hand and returns the column it was stored in."""
+        for row, hand in zip(self.rows, self.variant.hands):
+            row.append(rule.score(list(hand)))
+
+        self.rules.append(rule)
+        column = len(self.rules) - 1
+        if isinstance(rule, UpperSectionRule):
+            self.upper_mask |= 1 << column
+        elif isinstance(rule, Yahtzee) and self.yahtzee_column is None:
+            self.yahtzee_column = column
+        return column
+
+    def copy(self) -> 'ScoreTable':
+        """A table with the same rules that can be added to without affecting this one."""
+        table = ScoreTable(variant=self.variant)
+        table.rules = self.rules[:]
+        table.rows = [row[:] for row in self.rows]
+        table.upper_mask = self.upper_mask
+        table.yahtzee_column = self.yahtzee_column
+        return table
+
+    def row(self, hand: int) -> array:
+        """Scores of every rule for the hand at the given index."""
+        return self.rows[hand]
+
+    def lookup(self, hand: int, column: int) -> int:
+        """Score of a single rule for the hand at the given index."""
+        return self.rows[hand][column]
+
+    def score(self, dice_values: Iterable[int], column: int) -> int:
+        """Score of a single rule for the given dice, in any order. Never raises RuleNotMetError."""
+        return self.rows[self.variant.hand_index(dice_values)][column]
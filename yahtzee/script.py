@@ -0,0 +1,154 @@
+"""
+Scripted play: games driven by a stream of JSONL commands instead of prompts.
+
+Each input line is one command for one game, named by any JSON string or number in
+"game", so a stream can interleave as many games as it likes. The commands are the
+ones the socket server takes, and go through a Session the same way:
+
+    {"game": 1, "cmd": "new", "seed": 42}     start (or restart) game 1, optionally seeded
+    {"game": 1, "cmd": "roll"}
+    {"game": 1, "cmd": "hold", "mask": 5}     hold dice by bitmask, or {"dice": [0, 2]}
+    {"game": 1, "cmd": "lock", "rule": "Chance"}
+    {"game": 1, "cmd": "state"}
+    {"game": 1, "cmd": "close"}               forget the game
+
+Every command answers with one or more events, each a JSON line with the game and an
+"event" kind:
+
+    new     seed                         roll    dice, roll_count
+    hold    mask                         score   rule, value, score, bonus
+    end     score                        state   everything Session.view() shows
+    closed                               error   error, line (the input line number)
+
+Starting a game and locking a rule both roll the next turn, so they're followed by a
+roll event unless the game just ended. Output is collected and written in batches of
+flush_lines lines, and at the end of the input.
+
+Usage: python main.py --script [FILE]     (reads stdin without FILE, or with -)
+"""
+import json
+import sys
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.game import Game
+from yahtzee.session import CommandError, Session, check_seed
+
+if TYPE_CHECKING:
+    from yahtzee.journal import Journal
+
+FLUSH_LINES = 4096
+
+
+class ScriptRunner:
+    """Plays games made from the template by the commands it's fed, writing events to out."""
+    template: Game
+    out: IO[str]
+    flush_lines: int
+    sessions: Dict[Any, Session]
+    commands: int
+    errors: int
+
+    def __init__(self, template: Game, out: IO[str], flush_lines: int = FLUSH_LINES,
+                 journal: Optional['Journal'] = None):
+        self.template = template
+        self.out = out
+        self.flush_lines = flush_lines
+        self.journal = journal
+        self.sessions = {}
+        self.commands = 0
+        self.errors = 0
+        self._pending: List[str] = []
+        self._encode = json.JSONEncoder(separators=(',', ':')).encode
+        self._decode = json.JSONDecoder().decode
+
+    def run(self, lines: Iterable[str]) -> None:
+        """Carries out every command in lines, then writes out whatever output is left."""
+        for number, line in enumerate(lines, 1):
+            if line.strip():
+                self.feed(line, number)
+        self.flush()
+
+    def feed(self, line: str, number: int = 0) -> None:
+        """Carries out one command line."""
+        self.commands += 1
+        game_id = None
+        try:
+            command = self._decode(line)
+            if not isinstance(command, dict):
+                raise CommandError("A command must be a JSON object.")
+            game_id = command.get("game")
+            if not isinstance(game_id, (str, int)) or isinstance(game_id, bool):
+                raise CommandError('A command needs a "game" id that is a string or number.')
+            self.execute(game_id, command)
+        except (CommandError, ValueError, TypeError) as e:
+            self.errors += 1
+            self.emit({"game": game_id, "event": "error", "error": str(e), "line": number})
+
+    def execute(self, game_id, command: Dict[str, Any]) -> None:
+        cmd = command.get("cmd")
+        if cmd == "new":
+            game = self.template.fresh(DiceRNG(check_seed(command.get("seed"))))
+            if self.journal is not None:
+                self.journal.record(game)
+            session = self.sessions[game_id] = Session(game)
+            self.emit({"game": game_id, "event": "new", "seed": game.rng.seed})
+            session.roll()
+            self._emit_roll(game_id, game)
+            return
+
+        session = self.sessions.get(game_id)
+        if session is None:
+            raise CommandError(f"There is no game {game_id!r}; start it with new.")
+        game = session.game
+        if cmd == "roll":
+            session.roll()
+            self._emit_roll(game_id, game)
+        elif cmd == "hold":
+            session.hold(command.get("dice"), command.get("mask"))
+            self.emit({"game": game_id, "event": "hold", "mask": game.hold_mask})
+        elif cmd == "lock":
+            rc = session.rule_controller(command.get("rule", command.get("column")))
+            value = session.lock(rc)
+            card = game.scorecard
+            self.emit({"game": game_id, "event": "score", "rule": rc.rule_name, "value": value,
+                       "score": card.score, "bonus": card.bonus})
+            if game.game_over:
+                self.emit({"game": game_id, "event": "end", "score": card.score})
+            else:
+                self._emit_roll(game_id, game)
+        elif cmd == "state":
+            self.emit({"game": game_id, "event": "state", **session.view()})
+        elif cmd == "close":
+            del self.sessions[game_id]
+            self.emit({"game": game_id, "event": "closed"})
+        else:
+            raise CommandError(f"Unknown command {cmd!r}.")
+
+    def _emit_roll(self, game_id, game: Game) -> None:
+        self.emit({"game": game_id, "event": "roll", "dice": list(game.dice_values), "roll_count": game.roll_count})
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        pending = self._pending
+        pending.append(self._encode(event))
+        if len(pending) >= self.flush_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._pending.append('')
+            self.out.write('\n'.join(self._pending))
+            self._pending.clear()
+        self.out.flush()
+
+
+def run_script(template: Game, path: Optional[str] = None, out: Optional[IO[str]] = None,
+               flush_lines: int = FLUSH_LINES, journal: Optional['Journal'] = None) -> ScriptRunner:
+    """Runs the commands in the file at path, or on stdin if path is None or -, writing events to out (stdout)."""
+    runner = ScriptRunner(template, out if out is not None else sys.stdout, flush_lines, journal)
+    if path is None or path == '-':
+        runner.run(sys.stdin)
+    else:
+        with open(path) as f:
+            runner.run(f)
+    return runner
@@ -0,0 +1,198 @@
+"""
+Asyncio server hosting one game per connection over TCP or a Unix socket.
+
+Every connection gets its own Game, made from a fresh copy of a template, and speaks
+one JSON object per line. Moves go through a Session, the same one StateMachine uses.
+
+    {"cmd": "state"}                          -> {"ok": true, "state": {...}}
+    {"cmd": "roll"}
+    {"cmd": "hold", "dice": [0, 2]}           hold dice by position, or {"mask": 5}
+    {"cmd": "lock", "rule": "Chance"}         by name, or by column number
+    {"cmd": "odds"}                           -> {"ok": true, "odds": [...]} for the current holds
+    {"cmd": "new", "seed": 42}                start over, optionally with a seed
+    {"cmd": "stats"}                          -> {"ok": true, "stats": {...}}
+
+Failed commands answer {"ok": false, "error": "..."} and leave the game as it was.
+All sessions share the event loop, and a session holds nothing besides its compact
+Game and a line buffer capped at LINE_LIMIT bytes, so thousands of them fit easily.
+
+Usage:
+    python -m yahtzee.server [--host 127.0.0.1] [--port 8765] [--unix PATH]
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from yahtzee.dice_rng import DiceRNG
+from yahtzee.game import Game
+from yahtzee.odds import OutcomeEngine
+from yahtzee.session import CommandError, Session, check_seed
+
+LINE_LIMIT = 4096
+LATENCY_SAMPLES = 10_000
+
+
+class ServerStats:
+    """Live and peak session counts, and the latency of the most recent commands."""
+    sessions: int
+    peak_sessions: int
+    total_sessions: int
+    commands: int
+    latencies: Deque[float]
+
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self.sessions = 0
+        self.peak_sessions = 0
+        self.total_sessions = 0
+        self.commands = 0
+        self.latencies = deque(maxlen=samples)
+
+    def opened(self) -> None:
+        self.sessions += 1
+        self.total_sessions += 1
+        self.peak_sessions = max(self.peak_sessions, self.sessions)
+
+    def closed(self) -> None:
+        self.sessions -= 1
+
+    def record(self, seconds: float) -> None:
+        self.commands += 1
+        self.latencies.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50, p99 = self.percentile(0.5), self.percentile(0.99)
+        return {
+            "sessions": self.sessions,
+            "peak_sessions": self.peak_sessions,
+            "total_sessions": self.total_sessions,
+            "commands": self.commands,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p99_ms": p99 * 1000 if p99 is not None else None,
+        }
+
+
+class GameServer:
+    """Serves games made from the template. Start with serve_tcp or serve_unix."""
+
+    def __init__(self, template: Game, max_sessions: int = 10_000):
+        self.template = template
+        self.max_sessions = max_sessions
+        self.stats = ServerStats()
+        self.odds = OutcomeEngine(template.score_table)
+
+    async def serve_tcp(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.handle, path, limit=LINE_LIMIT)
+
+    def execute(self, session: Session, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Carries out one command and returns the reply."""
+        cmd = command.get("cmd")
+        if cmd == "roll":
+            session.roll()
+        elif cmd == "hold":
+            session.hold(command.get("dice"), command.get("mask"))
+        elif cmd == "lock":
+            session.lock(command.get("rule", command.get("column")))
+        elif cmd == "new":
+            session.game = self.template.fresh(DiceRNG(check_seed(command.get("seed"))))
+            session.roll()
+        elif cmd == "odds":
+            return {"ok": True, "odds": session.odds(self.odds)}
+        elif cmd == "stats":
+            return {"ok": True, "stats": self.stats.to_dict()}
+        elif cmd != "state":
+            raise CommandError(f"Unknown command {cmd!r}.")
+        return {"ok": True, "state": session.view()}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.stats.sessions >= self.max_sessions:
+            writer.write(b'{"ok": false, "error": "The server is full."}\n')
+            await writer.drain()
+            writer.close()
+            return
+
+        self.stats.opened()
+        session = Session(self.template.fresh(DiceRNG()))
+        session.roll()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"ok": false, "error": "Line too long."}\n')
+                    break
+                if not line:
+                    break
+
+                start = time.perf_counter()
+                try:
+                    command = json.loads(line)
+                    if not isinstance(command, dict):
+                        raise CommandError("Commands must be JSON objects.")
+                    reply = self.execute(session, command)
+                except (CommandError, ValueError, TypeError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply).encode() + b'\n')
+                self.stats.record(time.perf_counter() - start)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.stats.closed()
+            writer.close()
+
+
+async def _serve(args) -> None:
+    from yahtzee.simulation import new_game
+    from yahtzee.rules import standard_rules
+
+    server = GameServer(new_game(standard_rules()), args.max_sessions)
+    if args.unix:
+        listener = await server.serve_unix(args.unix)
+    else:
+        listener = await server.serve_tcp(args.host, args.port)
+    print("Listening on", ", ".join(str(s.getsockname()) for s in listener.sockets))
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.report_every)
+            print(json.dumps(server.stats.to_dict()), flush=True)
+
+    reporter = asyncio.create_task(report()) if args.report_every else None
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if reporter:
+            reporter.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Host Yahtzee games over a JSON line protocol.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--max-sessions', type=int, default=10_000)
+    parser.add_argument('--report-every', type=float, default=10.0, metavar='SECONDS',
+                        help='print session and latency stats this often (0 to turn off)')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
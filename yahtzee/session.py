@@ -0,0 +1,112 @@
+"""
+Commands that drive a single game, shared by every front end.
+
+The interactive StateMachine, the socket server and the scripted JSONL mode all make
+their moves through a Session, so rolling, holding and locking behave (and fail) the
+same way everywhere. Failures raise CommandError with a message meant for the player.
+"""
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+
+from yahtzee.game import Game, IncompleteTurnError, RuleController
+
+if TYPE_CHECKING:
+    from yahtzee.odds import OutcomeEngine
+
+
+class CommandError(Exception):
+    """Applies to commands that can't be carried out in the game's current state."""
+
+
+def _is_int(value: Any) -> bool:
+    # JSON true and false arrive as bools, which are ints to Python.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_seed(seed: Any) -> Optional[int]:
+    """The seed of a command, which must be missing (None) or an unsigned 64-bit int."""
+    if seed is not None and not (_is_int(seed) and 0 <= seed < 1 << 64):
+        raise CommandError(f"{seed!r} is not a valid seed; seeds are whole numbers from 0 to 2**64 - 1.")
+    return seed
+
+
+class Session:
+    """One game, played through commands."""
+    __slots__ = ('game',)
+    game: Game
+
+    def __init__(self, game: Game):
+        self.game = game
+
+    def roll(self) -> None:
+        """Rolls the dice that aren't held."""
+        if self.game.game_over:
+            raise CommandError("The game is over.")
+        try:
+            self.game.roll()
+        except IncompleteTurnError:
+            raise CommandError("Lock in a rule before continuing to the next turn")
+
+    def hold(self, dice: Optional[Iterable[int]] = None, mask: Optional[int] = None) -> None:
+        """Holds exactly the dice at the given positions (or in the given bitmask) and releases the rest."""
+        if mask is None:
+            mask = 0
+            for position in dice or ():
+                if not _is_int(position) or not 0 <= position < len(self.game.dice_values):
+                    raise CommandError(f"There is no die at position {position!r}.")
+                mask |= 1 << position
+        elif not _is_int(mask) or not 0 <= mask < 1 << len(self.game.dice_values):
+            raise CommandError(f"{mask!r} is not a valid hold mask.")
+
+        self.game.hold_mask = mask
+
+    def rule_controller(self, rule: Union[str, int, RuleController]) -> RuleController:
+        """Finds a rule by name, column or controller."""
+        if isinstance(rule, RuleController):
+            return rule
+        if not isinstance(rule, str) and not _is_int(rule):
+            raise CommandError(f"There is no rule called {rule!r}.")
+        for rc in self.game.rule_controllers:
+            if rule == rc.rule_name or rule == rc.column:
+                return rc
+        raise CommandError(f"There is no rule called {rule!r}.")
+
+    def lock(self, rule: Union[str, int, RuleController]) -> int:
+        """Locks in a rule with the current dice and starts the next turn. Returns the locked value."""
+        rc = self.rule_controller(rule)
+        if rc.locked_in:
+            raise CommandError(f"{rc.rule_name} is already locked in.")
+
+        self.game.lock_in_rule(rc)
+        return rc.locked_value
+
+    def rules(self) -> List[Dict[str, Any]]:
+        """Every rule with its locked value, or what it would score with the current dice."""
+        return [{"name": rc.rule_name,
+                 "value": rc.locked_value if rc.locked_in else rc.calculate_value(),
+                 "locked": rc.locked_in} for rc in self.game.rule_controllers]
+
+    def odds(self, engine: 'OutcomeEngine') -> List[Dict[str, Any]]:
+        """For every open rule, the chance it scores and its expected score if the held dice are kept to the end of the turn."""
+        from yahtzee.odds import expected
+
+        distributions = engine.game_odds(self.game)
+        return [{"name": rc.rule_name,
+                 "chance": 1 - distributions[rc.column].get(0, 0.0),
+                 "expected": expected(distributions[rc.column])}
+                for rc in self.game.rule_controllers if not rc.locked_in]
+
+    def view(self) -> Dict[str, Any]:
+        """Everything a player can see about the game."""
+        game = self.game
+        return {
+            "dice": list(game.dice_values),
+            "holding": [bool(game.hold_mask >> i & 1) for i in range(len(game.dice_values))],
+            "roll_count": game.roll_count,
+            "turn": game.locked_rules_count + (0 if game.game_over else 1),
+            "score": game.score,
+            "upper_total": game.scorecard.upper_total,
+            "bonus": game.scorecard.bonus,
+            "game_over": game.game_over,
+            "seed": game.rng.seed,
+            "rules": self.rules(),
+        }
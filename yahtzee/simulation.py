@@ -0,0 +1,314 @@
+"""
+Headless simulation of complete games, driven by a pluggable Policy instead of prompts.
+
+Games are split into shards that run independently across a process pool. Each game
+rolls from its own DiceRNG substream of (seed, shard index), so a run is reproducible no
+matter how many workers it's spread over, and only a small SimulationStats comes back
+from each shard.
+
+Usage: python -m yahtzee.simulation [--games N] [--workers W] [--policy greedy] [--seed S]
+"""
+import argparse
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from yahtzee.dice_rng import DiceRNG, derive_seed
+from yahtzee.game import Game, RuleController
+from yahtzee.journal import Journal
+from yahtzee.rules import Rule, UpperSectionRule, Yahtzee, standard_rules
+from yahtzee.scoring import ScoreTable
+from yahtzee.solver import MAX_ROLLS, Strategy
+from yahtzee.variant import STANDARD, Variant
+
+
+class Policy(ABC):
+    """ABC to be implemented for every strategy that can play a game on its own."""
+
+    @abstractmethod
+    def choose_holds(self, game: Game) -> Optional[List[bool]]:
+        """Which dice to hold before the next roll, or None to stop rolling this turn."""
+        pass
+
+    @abstractmethod
+    def choose_rule(self, game: Game) -> RuleController:
+        """Which unlocked rule to lock in with the current dice."""
+        pass
+
+
+class GreedyPolicy(Policy):
+    """Chases the most common die value, then locks in whichever open rule scores the most right now."""
+
+    def choose_holds(self, game: Game) -> Optional[List[bool]]:
+        values = game.dice_values
+        target = max(Counter(values).items(), key=lambda item: (item[1], item[0]))[0]
+        return [v == target for v in values]
+
+    def choose_rule(self, game: Game) -> RuleController:
+        open_rules = [rc for rc in game.rule_controllers if not rc.locked_in]
+        return max(open_rules, key=lambda rc: rc.calculate_value())
+
+
+class UpperFirstPolicy(GreedyPolicy):
+    """Rolls like the greedy policy, but fills any upper-section rule that scores before the rest."""
+
+    def choose_rule(self, game: Game) -> RuleController:
+        open_rules = [rc for rc in game.rule_controllers if not rc.locked_in]
+        upper = [rc for rc in open_rules if isinstance(rc.rule, UpperSectionRule) and rc.calculate_value()]
+        return max(upper or open_rules, key=lambda rc: rc.calculate_value())
+
+
+class ChaseYahtzeePolicy(GreedyPolicy):
+    """Chases 5 of a kind, rerolling every die when there's no pair, and keeps Yahtzee open until it scores."""
+
+    def choose_holds(self, game: Game) -> Optional[List[bool]]:
+        holds = super().choose_holds(game)
+        return holds if sum(holds) > 1 else [False] * len(holds)
+
+    def choose_rule(self, game: Game) -> RuleController:
+        open_rules = [rc for rc in game.rule_controllers if not rc.locked_in]
+        yahtzee = [rc for rc in open_rules if isinstance(rc.rule, Yahtzee)]
+        if yahtzee and yahtzee[0].calculate_value():
+            return yahtzee[0]
+        others = [rc for rc in open_rules if rc not in yahtzee] or open_rules
+        return max(others, key=lambda rc: rc.calculate_value())
+
+
+class OptimalPolicy(Policy):
+    """
+    Plays a solved strategy file. The file is mapped on first use in each process rather
+    than pickled, so the policy is cheap to send to pool workers, which share its pages.
+    """
+
+    def __init__(self, strategy_path: str = 'strategy.bin'):
+        self.strategy_path = strategy_path
+        self._strategy: Optional[Strategy] = None
+
+    def __getstate__(self):
+        return {'strategy_path': self.strategy_path, '_strategy': None}
+
+    def strategy(self, game: Game) -> Strategy:
+        if self._strategy is None:
+            from yahtzee.strategy_file import load
+
+            self._strategy = load(self.strategy_path, game.score_table)
+        return self._strategy
+
+    def choose_holds(self, game: Game) -> Optional[List[bool]]:
+        keep = list(self.strategy(game).best_keep(game.locked_mask, game.hand, MAX_ROLLS - game.roll_count))
+        holds = []
+        for value in game.dice_values:
+            holds.append(value in keep)
+            if holds[-1]:
+                keep.remove(value)
+        return holds
+
+    def choose_rule(self, game: Game) -> RuleController:
+        return game.rule_controllers[self.strategy(game).best_rule(game.locked_mask, game.hand)]
+
+
+POLICIES: Dict[str, type] = {
+    'greedy': GreedyPolicy,
+    'upper-first': UpperFirstPolicy,
+    'chase-yahtzee': ChaseYahtzeePolicy,
+    'optimal': OptimalPolicy,
+}
+
+
+def make_policy(name: str, rules: Sequence[Rule], strategy_path: str = 'strategy.bin') -> Policy:
+    """The named policy. For the optimal one, the strategy file is solved and saved first if it's missing or stale."""
+    if name == 'optimal':
+        from yahtzee.strategy_file import load_or_solve
+
+        load_or_solve(strategy_path, ScoreTable(rules), workers=None)
+        return OptimalPolicy(strategy_path)
+    return POLICIES[name]()
+
+
+def play_game(game: Game, policy: Policy) -> Game:
+    """Plays a freshly created game to the end and returns it."""
+    game.roll()
+    while not game.game_over:
+        while game.roll_count < 3:
+            holds = policy.choose_holds(game)
+            if holds is None or all(holds):
+                break
+            game.hold_mask = sum(1 << i for i, hold in enumerate(holds) if hold)
+            game.roll()
+
+        game.lock_in_rule(policy.choose_rule(game))
+
+    return game
+
+
+class SimulationStats:
+    """Mergeable aggregate of finished games."""
+    games: int
+    mean: float
+    _m2: float
+    hits: List[int]
+    rule_names: List[str]
+    elapsed: float
+
+    def __init__(self, rule_names: Sequence[str]):
+        self.games = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.hits = [0] * len(rule_names)
+        self.rule_names = list(rule_names)
+        self.elapsed = 0.0
+
+    def add(self, game: Game) -> None:
+        """Folds one finished game into the aggregate (Welford's update)."""
+        self.games += 1
+        delta = game.score - self.mean
+        self.mean += delta / self.games
+        self._m2 += delta * (game.score - self.mean)
+
+        for i, value in enumerate(game.state.values):
+            if value:
+                self.hits[i] += 1
+
+    def merge(self, other: 'SimulationStats') -> None:
+        """Folds another aggregate into this one. Elapsed times add up, so this measures CPU time."""
+        total = self.games + other.games
+        if total:
+            delta = other.mean - self.mean
+            self._m2 += other._m2 + delta * delta * self.games * other.games / total
+            self.mean += delta * other.games / total
+        self.games = total
+        self.hits = [a + b for a, b in zip(self.hits, other.hits)]
+        self.elapsed += other.elapsed
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the final score."""
+        return self._m2 / (self.games - 1) if self.games > 1 else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def hit_rates(self) -> Dict[str, float]:
+        """Fraction of games in which each rule was locked in with a non-zero value."""
+        return {name: hits / self.games if self.games else 0.0 for name, hits in zip(self.rule_names, self.hits)}
+
+
+def new_game(rules: Sequence[Rule], variant: Variant = STANDARD) -> Game:
+    game = Game(ScoreTable(variant=variant))
+    for rule in rules:
+        game.register_rule(rule)
+    return game
+
+
+def run_shard(policy: Policy, rules: Sequence[Rule], games: int, seed: int,
+              journal_path: Optional[str] = None, scores_path: Optional[str] = None,
+              player: Optional[str] = None) -> SimulationStats:
+    """
+    Plays a number of games in this process and returns their aggregate, journaling them
+    and recording them in a high-score database (as player, the policy's class name by
+    default) if asked to.
+    """
+    start = time.perf_counter()
+
+    template = new_game(rules)
+    stats = SimulationStats([r.name for r in rules])
+    journal = Journal(journal_path) if journal_path else None
+
+    def played() -> Iterator[Game]:
+        for rng in DiceRNG(seed).spawn(games):
+            game = template.fresh(rng)
+            if journal is not None:
+                journal.record(game)
+            stats.add(play_game(game, policy))
+            yield game
+
+    try:
+        if scores_path:
+            from yahtzee.highscores import HighScores
+
+            name = player or type(policy).__name__
+            with HighScores(scores_path) as scores:
+                scores.record_many((name, game) for game in played())
+        else:
+            for _ in played():
+                pass
+    finally:
+        if journal is not None:
+            journal.close()
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _run_shard(args) -> SimulationStats:
+    return run_shard(*args)
+
+
+def simulate(policy: Policy, games: int, rules: Optional[Sequence[Rule]] = None, workers: Optional[int] = None,
+             seed: int = 0, shard_size: int = 5000, journal_dir: Optional[str] = None,
+             scores_path: Optional[str] = None, player: Optional[str] = None) -> Iterator[SimulationStats]:
+    """
+    Plays a number of games and yields the running aggregate as each shard finishes.
+
+    With workers=1 shards run in this process; otherwise they are spread over a process
+    pool, one per CPU by default. With a journal_dir, each shard journals its games to
+    its own file there; with a scores_path, every game is recorded in that high-score
+    database (see yahtzee.highscores), which the shards share.
+    """
+    rules = list(rules) if rules is not None else standard_rules()
+    shards = [(policy, rules, min(shard_size, games - start), derive_seed(seed, i),
+               os.path.join(journal_dir, f'shard-{i:06d}.journal') if journal_dir else None, scores_path, player)
+              for i, start in enumerate(range(0, games, shard_size))]
+
+    total = SimulationStats([r.name for r in rules])
+    if workers == 1:
+        for shard in shards:
+            total.merge(_run_shard(shard))
+            yield total
+        return
+
+    with Pool(workers) as pool:
+        for stats in pool.imap_unordered(_run_shard, shards):
+            total.merge(stats)
+            yield total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play games headlessly and report aggregate results.')
+    parser.add_argument('--games', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='greedy')
+    parser.add_argument('--strategy', default='strategy.bin', help='strategy file played by the optimal policy')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shard-size', type=int, default=5000)
+    parser.add_argument('--journal', metavar='DIR', help='journal every game to one file per shard in DIR')
+    parser.add_argument('--scores', metavar='FILE', help='record every game in this high-score database')
+    args = parser.parse_args()
+
+    if args.journal:
+        os.makedirs(args.journal, exist_ok=True)
+
+    policy = make_policy(args.policy, standard_rules(), args.strategy)
+    start = time.perf_counter()
+    stats = None
+    for stats in simulate(policy, args.games, workers=args.workers, seed=args.seed,
+                          shard_size=args.shard_size, journal_dir=args.journal,
+                          scores_path=args.scores, player=args.policy):
+        wall = time.perf_counter() - start
+        print(f'{stats.games:>12,} games  mean {stats.mean:7.2f}  sd {stats.std_dev:6.2f}  '
+              f'{stats.games / wall:>10,.0f} games/s')
+
+    if stats is not None:
+        print('Hit rates:')
+        for name, rate in stats.hit_rates.items():
+            print(f'  {name:<24} {rate:6.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Fixed-size binary snapshots of games in progress, and a file of them that's opened with mmap.
+
+A snapshot holds everything needed to carry on a game exactly where it left off: the
+dice, holds, roll count, locked values and Yahtzee bonuses, and where the game's DiceRNG
+is in its stream (seed and position), so a restored game rolls the same dice the original
+would have. The generator itself isn't stored, so a restored game's first roll regenerates
+the stream up to its position. The score table isn't in it; restoring takes a template game for that.
+
+Snapshot file layout (little-endian):
+    header      64 bytes, see HEADER; the same rule fingerprint as strategy files
+    records     record_size bytes each: RECORD followed by one uint16 value per rule
+
+Records are fixed-size, so the i-th one is at a known offset and any game can be read
+without touching the others.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterator, List
+
+from yahtzee.dice_rng import BACKENDS, DiceRNG
+from yahtzee.game import Game
+from yahtzee.scoring import ScoreTable
+from yahtzee.strategy_file import fingerprint
+from yahtzee.variant import STANDARD
+
+MAGIC = b'YHTZSNAP'
+VERSION = 2
+HEADER = struct.Struct('<8sHHI32s16x')
+# seed, position, spawned, block size, dice, locked mask, hold mask, roll count, faces, backend, Yahtzee bonuses
+RECORD = struct.Struct('<QQIIHHBBBBB')
+MAX_RULES = 16
+
+
+class SnapshotError(Exception):
+    """Applies to snapshots that can't be taken, or files of them that don't match the rules."""
+
+
+def record_size(rule_count: int) -> int:
+    return RECORD.size + 2 * rule_count
+
+
+def snapshot(game: Game) -> bytes:
+    """The game's state as one fixed-size record."""
+    state, rng = game.state, game.rng
+    if len(state.values) > MAX_RULES:
+        raise SnapshotError(f'Snapshots hold at most {MAX_RULES} rules.')
+    if state.variant is not STANDARD and state.variant != STANDARD:
+        raise SnapshotError(f'Snapshots only hold games of {STANDARD.dice} {STANDARD.faces}-sided dice.')
+    values = state.values
+    if sys.byteorder != 'little':
+        values = values[:]
+        values.byteswap()
+    try:
+        record = RECORD.pack(rng.seed, rng.position, rng.spawned, rng.block_size, state.dice, state.locked_mask,
+                             state.hold_mask, state.roll_count, rng.faces, BACKENDS.index(rng.backend),
+                             state.scorecard.yahtzee_bonuses)
+    except struct.error as e:
+        raise SnapshotError(f"The game's DiceRNG doesn't fit a snapshot record: {e}.") from None
+    return record + values.tobytes()
+
+
+def restore(data, template: Game, offset: int = 0) -> Game:
+    """A game in the state recorded at the offset in data, using the template's rules."""
+    (seed, position, spawned, block_size, dice, locked_mask, hold_mask, roll_count,
+     faces, backend, bonuses) = RECORD.unpack_from(data, offset)
+    rule_count = len(template.state.values)
+    values = array('H', data[offset + RECORD.size:offset + record_size(rule_count)])
+    if sys.byteorder != 'little':
+        values.byteswap()
+
+    game = template.fresh(DiceRNG(seed, faces, block_size, BACKENDS[backend], position, spawned))
+    state = game.state
+    state.dice = dice
+    state.hold_mask = hold_mask
+    state.roll_count = roll_count
+    state.locked_mask = locked_mask
+    state.values = values
+
+    # Everything on the scorecard but the Yahtzee bonuses follows from the locked values.
+    card = state.scorecard
+    table = game.score_table
+    for column in range(rule_count):
+        if locked_mask >> column & 1:
+            value = values[column]
+            card.total += value
+            card.filled += 1
+            if table.upper_mask >> column & 1:
+                card.upper_total += value
+            if column == table.yahtzee_column:
+                card.yahtzee_scored = value > 0
+    card.yahtzee_bonuses = bonuses
+    return game
+
+
+def file_header(table: ScoreTable) -> bytes:
+    """The header a snapshot file of games with the table's rules starts with."""
+    if table.variant != STANDARD:
+        raise SnapshotError(f'Snapshots only hold games of {STANDARD.dice} {STANDARD.faces}-sided dice.')
+    return HEADER.pack(MAGIC, VERSION, len(table.rules), record_size(len(table.rules)), fingerprint(table))
+
+
+class SnapshotWriter:
+    """Appends snapshots to a file, creating it if needed. Use as a context manager, or call close() when done."""
+
+    def __init__(self, path: str, table: ScoreTable, buffer_records: int = 4096):
+        self.path = path
+        self._file = open(path, 'ab')
+        self._size = record_size(len(table.rules))
+        header = file_header(table)
+        if self._file.tell() == 0:
+            self._file.write(header)
+        else:
+            with open(path, 'rb') as f:
+                if f.read(HEADER.size) != header:
+                    self._file.close()
+                    raise SnapshotError(f'{path} holds snapshots of a different rule set.')
+        self._count = (self._file.tell() - HEADER.size) // self._size
+        self._buffer = bytearray()
+        self._buffer_limit = buffer_records * self._size
+
+    def __enter__(self) -> 'SnapshotWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def write(self, game: Game) -> int:
+        """Appends a snapshot of the game and returns its index."""
+        self._buffer += snapshot(game)
+        self._count += 1
+        if len(self._buffer) >= self._buffer_limit:
+            self.flush()
+        return self._count - 1
+
+    def flush(self) -> None:
+        self._file.write(self._buffer)
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class SnapshotFile:
+    """Read-only, memory-mapped view of a snapshot file, indexed like a list of games."""
+
+    def __init__(self, path: str, template: Game):
+        self.template = template
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise SnapshotError(f'{path} is not a snapshot file.')
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:HEADER.size] != file_header(template.score_table):
+            self.close()
+            raise SnapshotError(f'{path} holds snapshots of a different rule set, or is not a snapshot file.')
+        self._size = record_size(len(template.score_table.rules))
+        self._count = (len(self._mmap) - HEADER.size) // self._size
+
+    def __enter__(self) -> 'SnapshotFile':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Game:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('snapshot index out of range')
+        return restore(self._mmap, self.template, HEADER.size + index * self._size)
+
+    def __iter__(self) -> Iterator[Game]:
+        for index in range(self._count):
+            yield restore(self._mmap, self.template, HEADER.size + index * self._size)
+
+    def close(self) -> None:
+        if not self._mmap.closed:
+            self._mmap.close()
+
+
+def save_all(path: str, games: List[Game]) -> None:
+    """Writes the games to a new snapshot file, replacing it atomically."""
+    if not games:
+        raise SnapshotError('No games to save.')
+    partial = path + '.partial'
+    if os.path.exists(partial):
+        os.remove(partial)
+    with SnapshotWriter(partial, games[0].score_table) as writer:
+        for game in games:
+            writer.write(game)
+    os.replace(partial, path)
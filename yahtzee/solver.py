@@ -0,0 +1,354 @@
+"""
+Exact solver for the expected-score-maximizing way to play a game solo.
+
+A scorecard is a bitmask of locked rules (bit i is the rule in column i of the score
+table). Turns are independent given the scorecard, so the expected future score of each
+of the 2^R scorecards is solved once, from the full card back to the empty one. Within a
+turn, the value of every hand with 0, 1 and 2 rolls left is worked out from the values of
+the scorecards one rule further along, going through every keep (see yahtzee.keeps).
+Scorecards with the same number of rules locked never lead to each other, so each such
+layer can be solved in parallel.
+
+Upper-section and Yahtzee bonuses aren't part of the state, so they are not accounted for.
+
+Usage: python -m yahtzee.solver [--workers W] [--checkpoint PATH]
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from functools import lru_cache
+from multiprocessing import Pool, shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+from yahtzee.hands import HANDS
+from yahtzee.keeps import EMPTY_KEEP, HAND_KEEPS, KEEP_CHILDREN, KEEPS
+from yahtzee.scoring import ScoreTable
+from yahtzee.variant import require_standard
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+HAND_COUNT = len(HANDS)
+MAX_ROLLS = 3
+
+
+def _expected_keep_values(hand_values: List[float]) -> List[float]:
+    """Expected hand value after rolling the missing dice, for every keep."""
+    kv = hand_values + [0.0] * (len(KEEPS) - HAND_COUNT)
+    for k, (a, b, c, d, e, f) in enumerate(KEEP_CHILDREN, HAND_COUNT):
+        kv[k] = (kv[a] + kv[b] + kv[c] + kv[d] + kv[e] + kv[f]) / 6
+    return kv
+
+
+def solve_turn(table: ScoreTable, values: Sequence[float], mask: int
+               ) -> Tuple[List[List[float]], List[int], List[List[int]], float]:
+    """
+    Solves one turn played from the given scorecard, given the values of every later scorecard.
+
+    Returns the value of each hand with 0, 1 and 2 rolls left, the best rule column to lock
+    for each hand, the best keep for each hand with 1 and 2 rolls left, and the value of the
+    scorecard before the turn's first roll.
+    """
+    open_columns = [c for c in range(len(table.rules)) if not mask >> c & 1]
+    candidates = []
+    for c in open_columns:
+        after = values[mask | 1 << c]
+        candidates.append([row[c] + after for row in table.rows])
+
+    hand_values = []
+    lock_choices = []
+    for options in zip(*candidates):
+        best = max(options)
+        hand_values.append(best)
+        lock_choices.append(open_columns[options.index(best)])
+
+    by_rolls_left, hold_choices, start_value = play_out(hand_values)
+    return by_rolls_left, lock_choices, hold_choices, start_value
+
+
+def play_out(hand_values: List[float]) -> Tuple[List[List[float]], List[List[int]], float]:
+    """
+    Works back through a turn's rolls from the value of each hand once rolling is over.
+
+    Returns the value of each hand with 0, 1 and 2 rolls left, the best keep for each hand
+    with 1 and 2 rolls left, and the expected value before the first roll.
+    """
+    by_rolls_left = [hand_values]
+    hold_choices = []
+    for _ in range(MAX_ROLLS - 1):
+        kv = _expected_keep_values(by_rolls_left[-1])
+        choices = [max(keeps, key=kv.__getitem__) for keeps in HAND_KEEPS]
+        by_rolls_left.append([kv[k] for k in choices])
+        hold_choices.append(choices)
+
+    return by_rolls_left, hold_choices, _expected_keep_values(by_rolls_left[-1])[EMPTY_KEEP]
+
+
+class Strategy:
+    """
+    Solved values and decisions for every scorecard of a rule set.
+
+    values[mask] is the expected score still to come from the start of a turn.
+    lock_choices[mask * 252 + hand] is the best column to lock with no rolls left, and
+    hold_choices[((rolls_left - 1) * 2^R + mask) * 252 + hand] is the best keep index.
+    """
+    rule_count: int
+    values: Sequence[float]
+    lock_choices: Sequence[int]
+    hold_choices: Sequence[int]
+    build_seconds: Optional[float] = None
+    peak_memory: Optional[int] = None
+    # The mmap backing the tables when loaded from a strategy file.
+    mapped = None
+
+    def __init__(self, table: ScoreTable, values: Sequence[float], lock_choices: Sequence[int],
+                 hold_choices: Sequence[int]):
+        self.table = table
+        self.rule_count = len(table.rules)
+        self.values = values
+        self.lock_choices = lock_choices
+        self.hold_choices = hold_choices
+        self._turn_values = lru_cache(maxsize=64)(self._solve_turn_values)
+        self._keep_values = lru_cache(maxsize=64)(self._solve_keep_values)
+
+    def value(self, mask: int) -> float:
+        """Expected score still to come from the start of a turn with the given rules locked."""
+        return self.values[mask]
+
+    def _solve_turn_values(self, mask: int) -> List[List[float]]:
+        return solve_turn(self.table, self.values, mask)[0]
+
+    def position_value(self, mask: int, hand: int, rolls_left: int) -> float:
+        """Expected score still to come holding the given hand with some rolls left this turn."""
+        if mask == (1 << self.rule_count) - 1:
+            return 0.0
+        if rolls_left >= MAX_ROLLS:
+            return self.values[mask]
+        return self._turn_values(mask)[rolls_left][hand]
+
+    def keep_values(self, mask: int, rolls_left: int) -> List[float]:
+        """
+        Expected score still to come for every keep, when rolling the rest of the dice
+        with the given number of rolls left (including that roll).
+        """
+        return self._keep_values(mask, rolls_left)
+
+    def _solve_keep_values(self, mask: int, rolls_left: int) -> List[float]:
+        if mask == (1 << self.rule_count) - 1:
+            return [0.0] * len(KEEPS)
+        return _expected_keep_values(self._turn_values(mask)[rolls_left - 1])
+
+    def best_rule(self, mask: int, hand: int) -> int:
+        """Column of the rule to lock in with the given hand."""
+        return self.lock_choices[mask * HAND_COUNT + hand]
+
+    def best_keep(self, mask: int, hand: int, rolls_left: int) -> Tuple[int, ...]:
+        """Die values to keep before rolling again. Keeping the whole hand means stop rolling."""
+        if rolls_left < 1:
+            return HANDS[hand]
+        offset = ((rolls_left - 1) << self.rule_count) + mask
+        return KEEPS[self.hold_choices[offset * HAND_COUNT + hand]]
+
+
+def peak_memory() -> Optional[int]:
+    """Peak resident memory of this process in bytes, where the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def layers(rule_count: int) -> List[List[int]]:
+    """
+    Scorecards grouped by how many rules are locked, from the full card down to the empty one.
+
+    Every scorecard leads only to scorecards in the layer before it, so the scorecards in
+    a layer can be solved in any order, or all at once.
+    """
+    by_locked = [[] for _ in range(rule_count + 1)]
+    for mask in range(1 << rule_count):
+        by_locked[bin(mask).count('1')].append(mask)
+    return by_locked[::-1]
+
+
+def _section_sizes(rule_count: int) -> Tuple[int, int, int]:
+    states = 1 << rule_count
+    return 8 * states, states * HAND_COUNT, 2 * (MAX_ROLLS - 1) * states * HAND_COUNT
+
+
+def _views(buffer, rule_count: int) -> Tuple[memoryview, memoryview, memoryview]:
+    """The values, lock choices and hold choices sections of a solver buffer."""
+    views = []
+    offset = 0
+    for size, typecode in zip(_section_sizes(rule_count), 'dBH'):
+        views.append(memoryview(buffer)[offset:offset + size].cast(typecode))
+        offset += size
+    return tuple(views)
+
+
+def _solve_masks(table: ScoreTable, sections, masks: Sequence[int]) -> int:
+    """Solves the scorecards and writes their results into the sections. They must all be in one layer."""
+    values, lock_choices, hold_choices = sections
+    rule_count = len(table.rules)
+    for mask in masks:
+        _, locks, holds, values[mask] = solve_turn(table, values, mask)
+
+        lock_choices[mask * HAND_COUNT:(mask + 1) * HAND_COUNT] = array('B', locks)
+        for rolls_left, choices in enumerate(holds, 1):
+            offset = (((rolls_left - 1) << rule_count) + mask) * HAND_COUNT
+            hold_choices[offset:offset + HAND_COUNT] = array('H', choices)
+    return len(masks)
+
+
+# The table and shared sections in a solver worker process, set by _attach.
+_worker = None
+
+
+def _attach(table: ScoreTable, name: str) -> None:
+    global _worker
+    memory = shared_memory.SharedMemory(name)
+    _worker = table, memory, _views(memory.buf, len(table.rules))
+
+
+def _solve_shared(masks: Sequence[int]) -> int:
+    table, _, sections = _worker
+    return _solve_masks(table, sections, masks)
+
+
+CHECKPOINT_MAGIC = b'YHTZCKPT'
+# magic, version, layers solved, rule fingerprint
+CHECKPOINT_HEADER = struct.Struct('<8sHH32s20x')
+
+
+def _read_checkpoint(path: str, fingerprint: bytes, sections) -> int:
+    """
+    Copies a checkpoint's tables into the sections and returns how many layers it has solved.
+
+    A missing checkpoint, or one from other rules, has none.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(CHECKPOINT_HEADER.size)
+            if len(header) != CHECKPOINT_HEADER.size:
+                return 0
+            magic, version, solved, stored_fingerprint = CHECKPOINT_HEADER.unpack(header)
+            if magic != CHECKPOINT_MAGIC or version != 1 or stored_fingerprint != fingerprint:
+                return 0
+            for section in sections:
+                target = memoryview(section).cast('B')
+                if f.readinto(target) != len(target):
+                    return 0
+    except FileNotFoundError:
+        return 0
+    return solved
+
+
+def _write_checkpoint(path: str, fingerprint: bytes, sections, solved: int) -> None:
+    """Saves the tables with this many layers solved, replacing the checkpoint atomically."""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, 1, solved, fingerprint))
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, path)
+
+
+def solve(table: ScoreTable, progress=None, workers: Optional[int] = 1, checkpoint: Optional[str] = None
+          ) -> Strategy:
+    """
+    Solves every scorecard of the table's rules.
+
+    Scorecards are solved a layer at a time (see layers), which guarantees each one comes
+    after every scorecard it can lead to. With workers=1 they're solved in this process;
+    otherwise each layer is split over a process pool, one per CPU by default, with the
+    tables in shared memory that every worker reads the previous layers from and writes
+    its own scorecards to.
+
+    With a checkpoint path, the tables are saved there after each layer, and a build
+    that was interrupted carries on from the last saved layer. The checkpoint is removed
+    once the build finishes. progress, if given, is called with the number of scorecards
+    solved so far.
+    """
+    require_standard(table.variant, 'The solver')
+    start = time.perf_counter()
+    rule_count = len(table.rules)
+    if checkpoint is not None:
+        from yahtzee.strategy_file import fingerprint
+        rules_fingerprint = fingerprint(table)
+
+    pool = memory = None
+    if workers == 1:
+        sections = tuple(array(typecode, bytes(size)) for size, typecode in zip(_section_sizes(rule_count), 'dBH'))
+    else:
+        memory = shared_memory.SharedMemory(create=True, size=sum(_section_sizes(rule_count)))
+        shared = sections = _views(memory.buf, rule_count)
+    try:
+        # The full scorecard is worth nothing more, so it's solved as it is.
+        solved = 1
+        if checkpoint is not None:
+            solved = max(solved, _read_checkpoint(checkpoint, rules_fingerprint, sections))
+        done = sum(len(layer) for layer in layers(rule_count)[:solved])
+
+        if memory is not None:
+            workers = workers or os.cpu_count() or 1
+            pool = Pool(workers, initializer=_attach, initargs=(table, memory.name))
+
+        for layer in layers(rule_count)[solved:]:
+            if pool is None:
+                results = [_solve_masks(table, sections, layer)]
+            else:
+                chunk = -(-len(layer) // (4 * workers))
+                results = pool.imap_unordered(_solve_shared, [layer[i:i + chunk] for i in range(0, len(layer), chunk)])
+            for count in results:
+                done += count
+                if progress is not None:
+                    progress(done)
+            solved += 1
+            if checkpoint is not None and solved <= rule_count:
+                _write_checkpoint(checkpoint, rules_fingerprint, sections, solved)
+
+        if memory is not None:
+            sections = tuple(array(view.format, view.tobytes()) for view in shared)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if memory is not None:
+            for view in shared:
+                view.release()
+            memory.close()
+            memory.unlink()
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    strategy = Strategy(table, *sections)
+    strategy.build_seconds = time.perf_counter() - start
+    strategy.peak_memory = peak_memory()
+    return strategy
+
+
+def main():
+    from yahtzee.rules import standard_rules
+
+    parser = argparse.ArgumentParser(description='Solve the standard rules and report the expected score.')
+    parser.add_argument('--workers', type=int, default=None, help='processes to solve each layer with (default: one per CPU)')
+    parser.add_argument('--checkpoint', help='save progress here after each layer, and resume from it')
+    args = parser.parse_args()
+
+    table = ScoreTable(standard_rules())
+    strategy = solve(table, workers=args.workers, checkpoint=args.checkpoint)
+
+    print(f'Expected score: {strategy.value(0):.4f}')
+    print(f'Solved {1 << len(table.rules):,} scorecards in {strategy.build_seconds:.1f}s')
+    if strategy.peak_memory is not None:
+        print(f'Peak memory: {strategy.peak_memory / 2 ** 20:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+from array import array
+
+from yahtzee.scorecard import Scorecard
+from yahtzee.variant import STANDARD, Variant
+
+
+class GameState:
+    """
+    Everything about a game that changes while it's played, packed into a few ints.
+
+    dice is the ordered roll code of the dice (see Variant.roll_code), hold_mask and
+    locked_mask have one bit per die and per rule, values holds the locked-in value of each
+    rule, and scorecard keeps their totals and bonuses. The Die, DieController and
+    RuleController classes are just views over this.
+    """
+    __slots__ = ('variant', 'dice', 'hold_mask', 'locked_mask', 'roll_count', 'values', 'scorecard')
+    variant: Variant
+    dice: int
+    hold_mask: int
+    locked_mask: int
+    roll_count: int
+    values: array
+    scorecard: Scorecard
+
+    def __init__(self, rule_count: int = 0, variant: Variant = STANDARD):
+        self.variant = variant
+        self.dice = 0
+        self.hold_mask = 0
+        self.locked_mask = 0
+        self.roll_count = 0
+        self.values = array('H', bytes(2 * rule_count))
+        self.scorecard = Scorecard()
+
+    def copy(self) -> 'GameState':
+        state = GameState.__new__(GameState)
+        state.variant = self.variant
+        state.dice = self.dice
+        state.hold_mask = self.hold_mask
+        state.locked_mask = self.locked_mask
+        state.roll_count = self.roll_count
+        state.values = self.values[:]
+        state.scorecard = self.scorecard.copy()
+        return state
+
+    @property
+    def hand(self) -> int:
+        """Index of the dice in the variant's hands (yahtzee.hands.HANDS for standard dice)."""
+        return self.variant.hand_of_code(self.dice)
+
+    @property
+    def dice_values(self) -> tuple:
+        return self.variant.decode(self.dice)
+
+    def die_value(self, index: int) -> int:
+        return self.dice // self.variant.places[index] % self.variant.faces + 1
+
+    def set_die_value(self, index: int, value: int) -> None:
+        self.dice += (value - self.die_value(index)) * self.variant.places[index]
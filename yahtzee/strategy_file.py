@@ -0,0 +1,161 @@
+"""
+On-disk format for solved strategies, opened with mmap so nothing is read up-front.
+
+Layout (little-endian):
+    header          64 bytes, see HEADER
+    values          float32 per scorecard
+    lock_choices    uint8 per scorecard and hand
+    hold_choices    uint16 per rolls left (1, 2), scorecard and hand
+
+The header carries a fingerprint of the rule set the strategy was solved for, checked on
+every load, and a CRC32 of everything after it, checked only on request since it has to
+read the whole file.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import List, Optional
+
+from yahtzee.hands import HANDS
+from yahtzee.scoring import ScoreTable
+from yahtzee.solver import MAX_ROLLS, Strategy, solve
+
+MAGIC = b'YHTZSTRT'
+VERSION = 1
+HEADER = struct.Struct('<8sHHI32sI12x')
+DEFAULT_PATH = 'strategy.bin'
+
+
+class StaleStrategyError(Exception):
+    """Applies to strategy files that are corrupt or were built for something else."""
+
+
+def fingerprint(table: ScoreTable) -> bytes:
+    """Hash of the rule names and every score in the table, so any change to the rules changes it."""
+    digest = hashlib.sha256()
+    for rule in table.rules:
+        digest.update(rule.name.encode() + b'\0')
+    for row in table.rows:
+        digest.update(row.tobytes())
+    return digest.digest()
+
+
+def _section_sizes(rule_count: int):
+    states = 1 << rule_count
+    return 4 * states, states * len(HANDS), 2 * (MAX_ROLLS - 1) * states * len(HANDS)
+
+
+def save(strategy: Strategy, path: str) -> None:
+    """Writes the strategy to a file, replacing it atomically."""
+    values = array('f', strategy.values)
+    sections = [values, array('B', strategy.lock_choices), array('H', strategy.hold_choices)]
+    if sys.byteorder != 'little':
+        for section in sections:
+            section.byteswap()
+
+    payload = [section.tobytes() for section in sections]
+    checksum = 0
+    for chunk in payload:
+        checksum = zlib.crc32(chunk, checksum)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, strategy.rule_count, len(HANDS), fingerprint(strategy.table), checksum))
+        for chunk in payload:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def _check_mapped(mapped: mmap.mmap, path: str, table: ScoreTable, verify: bool) -> List[int]:
+    """Raises StaleStrategyError unless the mapped file is a whole strategy file for the table; returns its section sizes."""
+    magic, version, rule_count, hand_count, stored_fingerprint, checksum = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION:
+        raise StaleStrategyError(f'{path} is not a version {VERSION} strategy file.')
+    if hand_count != len(HANDS) or rule_count != len(table.rules) or stored_fingerprint != fingerprint(table):
+        raise StaleStrategyError(f'{path} was built for a different set of rules.')
+
+    sizes = _section_sizes(rule_count)
+    if len(mapped) != HEADER.size + sum(sizes):
+        raise StaleStrategyError(f'{path} is truncated.')
+
+    if verify:
+        # The views are released before returning, so the mapping can be closed on failure.
+        with memoryview(mapped) as view, view[HEADER.size:] as payload:
+            if zlib.crc32(payload) != checksum:
+                raise StaleStrategyError(f'{path} failed its checksum.')
+    return sizes
+
+
+def load(path: str, table: ScoreTable, verify: bool = False) -> Strategy:
+    """
+    Maps a strategy file into memory for the given rules.
+
+    Only the header is read here; table pages are read by the OS as lookups touch them,
+    and are shared between every process that maps the same file.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise StaleStrategyError(f'{path} is too short to be a strategy file.')
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        sizes = _check_mapped(mapped, path, table, verify)
+    except BaseException:
+        mapped.close()
+        raise
+
+    view = memoryview(mapped)
+    sections = []
+    offset = HEADER.size
+    for size, typecode in zip(sizes, 'fBH'):
+        section = view[offset:offset + size]
+        if sys.byteorder == 'little':
+            sections.append(section.cast(typecode))
+        else:  # pragma: no cover - big-endian hosts pay for a copy
+            copy = array(typecode, section.tobytes())
+            copy.byteswap()
+            sections.append(copy)
+        offset += size
+
+    strategy = Strategy(table, *sections)
+    strategy.mapped = mapped
+    return strategy
+
+
+def load_or_solve(path: str, table: ScoreTable, progress=None, workers: Optional[int] = 1) -> Strategy:
+    """
+    Loads the strategy file if it matches the rules, otherwise solves them and saves the result.
+
+    A solve checkpoints next to the file after each layer, so an interrupted one resumes.
+    """
+    try:
+        return load(path, table)
+    except (FileNotFoundError, StaleStrategyError):
+        pass
+
+    save(solve(table, progress, workers, checkpoint=f'{path}.checkpoint'), path)
+    return load(path, table)
+
+
+def main(path: Optional[str] = None):
+    from yahtzee.rules import standard_rules
+
+    parser = argparse.ArgumentParser(description='Solve the standard rules and write a strategy file.')
+    parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--workers', type=int, default=None, help='processes to solve each layer with (default: one per CPU)')
+    args = parser.parse_args(None if path is None else [path])
+
+    table = ScoreTable(standard_rules())
+    strategy = solve(table, workers=args.workers, checkpoint=f'{args.path}.checkpoint')
+    save(strategy, args.path)
+
+    print(f'Solved in {strategy.build_seconds:.1f}s, wrote {os.path.getsize(args.path):,} bytes to {args.path}')
+
+
+if __name__ == '__main__':
+    main()
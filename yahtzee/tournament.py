@@ -0,0 +1,210 @@
+"""
+Head-to-head tournaments between policies, on identical dice, stopped once the result is clear.
+
+Every matchup plays its two policies on pairs of games rolled from the same DiceRNG
+seed, and every matchup uses the same seeds, so luck cancels out of the score
+differences and far fewer games are needed than with independent runs. Games are played
+in batches across a process pool, in waves of one batch per worker for each matchup still
+undecided. After each wave, a matchup whose confidence interval for the mean difference
+no longer contains zero is decided and gets no more batches.
+
+Looking at the interval after every wave makes a false call likelier than the confidence
+level alone suggests, so the default level is a strict 99% and nothing is decided before
+min_games pairs. Decisions are only made between waves, so results don't depend on the
+number of workers.
+
+Usage:
+    python -m yahtzee.tournament [--policies greedy upper-first chase-yahtzee optimal]
+                                 [--batch-games 500] [--min-games 2000] [--max-games 100000]
+                                 [--confidence 0.99] [--workers W] [--seed S]
+"""
+import argparse
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from itertools import combinations
+from multiprocessing import Pool
+from statistics import NormalDist
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from yahtzee.dice_rng import DiceRNG, derive_seed
+from yahtzee.rules import Rule, standard_rules
+from yahtzee.simulation import POLICIES, Policy, make_policy, new_game, play_game
+
+
+class PairedStats:
+    """Mergeable running means of two policies' scores over paired games, and of their difference."""
+    games: int
+    mean_a: float
+    mean_b: float
+    mean: float
+    _m2: float
+    wins: int
+    losses: int
+    elapsed: float
+
+    def __init__(self):
+        self.games = 0
+        self.mean_a = 0.0
+        self.mean_b = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.elapsed = 0.0
+
+    def add(self, score_a: int, score_b: int) -> None:
+        """Folds one pair of final scores into the aggregate (Welford's update on the difference)."""
+        self.games += 1
+        self.mean_a += (score_a - self.mean_a) / self.games
+        self.mean_b += (score_b - self.mean_b) / self.games
+        difference = score_a - score_b
+        delta = difference - self.mean
+        self.mean += delta / self.games
+        self._m2 += delta * (difference - self.mean)
+        self.wins += difference > 0
+        self.losses += difference < 0
+
+    def merge(self, other: 'PairedStats') -> None:
+        """Folds another aggregate into this one."""
+        total = self.games + other.games
+        if total:
+            delta = other.mean - self.mean
+            self._m2 += other._m2 + delta * delta * self.games * other.games / total
+            self.mean += delta * other.games / total
+            self.mean_a += (other.mean_a - self.mean_a) * other.games / total
+            self.mean_b += (other.mean_b - self.mean_b) * other.games / total
+        self.games = total
+        self.wins += other.wins
+        self.losses += other.losses
+        self.elapsed += other.elapsed
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the score difference."""
+        return self._m2 / (self.games - 1) if self.games > 1 else 0.0
+
+    def interval(self, confidence: float) -> Tuple[float, float]:
+        """Normal-approximation confidence interval for the mean score difference."""
+        if self.games < 2:
+            return float('-inf'), float('inf')
+        half_width = NormalDist().inv_cdf((1 + confidence) / 2) * math.sqrt(self.variance / self.games)
+        return self.mean - half_width, self.mean + half_width
+
+
+@dataclass
+class Matchup:
+    a: str
+    b: str
+    stats: PairedStats = field(default_factory=PairedStats)
+    batches: int = 0
+    decided: bool = False
+
+    def significant(self, confidence: float) -> bool:
+        low, high = self.stats.interval(confidence)
+        return low > 0 or high < 0
+
+
+def play_pairs(policy_a: Policy, policy_b: Policy, rules: Sequence[Rule], games: int, seed: int) -> PairedStats:
+    """Plays both policies on the same dice for a number of games in this process."""
+    start = time.perf_counter()
+
+    template = new_game(rules)
+    stats = PairedStats()
+    for rng in DiceRNG(seed).spawn(games):
+        score_a = play_game(template.fresh(rng.copy()), policy_a).score
+        score_b = play_game(template.fresh(rng), policy_b).score
+        stats.add(score_a, score_b)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _play_pairs(args) -> Tuple[int, PairedStats]:
+    index, *job = args
+    return index, play_pairs(*job)
+
+
+def run_tournament(policies: Dict[str, Policy], rules: Optional[Sequence[Rule]] = None,
+                   batch_games: int = 500, min_games: int = 2000, max_games: int = 100_000,
+                   confidence: float = 0.99, workers: Optional[int] = None, seed: int = 0) -> Iterator[List[Matchup]]:
+    """
+    Plays every pair of policies against each other and yields the matchups after each wave.
+
+    A matchup is decided once it has at least min_games pairs and its interval excludes
+    zero, or once it reaches max_games. With workers=1 batches run in this process;
+    otherwise they are spread over a process pool, one per CPU by default.
+    """
+    rules = list(rules) if rules is not None else standard_rules()
+    matchups = [Matchup(a, b) for a, b in combinations(policies, 2)]
+    per_wave = workers or os.cpu_count() or 1
+
+    def wave() -> List[tuple]:
+        jobs = []
+        for index, matchup in enumerate(matchups):
+            if matchup.decided:
+                continue
+            for _ in range(per_wave):
+                if matchup.batches * batch_games >= max_games:
+                    break
+                jobs.append((index, policies[matchup.a], policies[matchup.b], rules,
+                             min(batch_games, max_games - matchup.batches * batch_games),
+                             derive_seed(seed, matchup.batches)))
+                matchup.batches += 1
+        return jobs
+
+    def decide() -> None:
+        for matchup in matchups:
+            if not matchup.decided:
+                matchup.decided = (matchup.stats.games >= max_games or
+                                   matchup.stats.games >= min_games and matchup.significant(confidence))
+
+    pool = Pool(workers) if workers != 1 else None
+    try:
+        while jobs := wave():
+            results = pool.imap_unordered(_play_pairs, jobs) if pool else map(_play_pairs, jobs)
+            for index, stats in results:
+                matchups[index].stats.merge(stats)
+            decide()
+            yield matchups
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play policies against each other on identical dice.')
+    parser.add_argument('--policies', nargs='+', choices=sorted(POLICIES), default=list(POLICIES))
+    parser.add_argument('--strategy', default='strategy.bin', help='strategy file played by the optimal policy')
+    parser.add_argument('--batch-games', type=int, default=500)
+    parser.add_argument('--min-games', type=int, default=2000)
+    parser.add_argument('--max-games', type=int, default=100_000)
+    parser.add_argument('--confidence', type=float, default=0.99)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rules = standard_rules()
+    policies = {name: make_policy(name, rules, args.strategy) for name in args.policies}
+
+    start = time.perf_counter()
+    matchups = []
+    for matchups in run_tournament(policies, rules, args.batch_games, args.min_games, args.max_games,
+                                   args.confidence, args.workers, args.seed):
+        played = sum(m.stats.games for m in matchups)
+        undecided = sum(not m.decided for m in matchups)
+        print(f'{played:>12,} pairs played  {undecided} matchups undecided  '
+              f'{played / (time.perf_counter() - start):>8,.0f} pairs/s')
+
+    print(f'{"matchup":<32} {"pairs":>9} {"mean a":>8} {"mean b":>8} {"a - b":>8}  {args.confidence:.0%} interval')
+    for m in matchups:
+        low, high = m.stats.interval(args.confidence)
+        verdict = (m.a if low > 0 else m.b) + ' better' if m.significant(args.confidence) else 'no clear winner'
+        print(f'{m.a + " vs " + m.b:<32} {m.stats.games:>9,} {m.stats.mean_a:>8.2f} {m.stats.mean_b:>8.2f} '
+              f'{m.stats.mean:>+8.2f}  [{low:+.2f}, {high:+.2f}]  {verdict}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Rendering and prompting backends for the interactive game.
+
+Both backends take the same question dicts as inquirer2's prompt.prompt and return the
+same answers, so StateMachine doesn't care which one it talks to. The inquirer backend
+imports tabulate and inquirer2 the first time it's used, since importing them (and
+prompt_toolkit and Pygments through them) dominates startup. The plain backend only
+needs print and input.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+class Backend(ABC):
+    """ABC to be implemented for every way of showing the game and asking questions."""
+
+    @abstractmethod
+    def table(self, rows: List[List[str]]) -> str:
+        """Renders rows of cells as a table."""
+        pass
+
+    @abstractmethod
+    def prompt(self, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Asks the questions and returns the answers by question name."""
+        pass
+
+    @abstractmethod
+    def separator(self) -> Any:
+        """A non-selectable divider to put between choices."""
+        pass
+
+    def pause(self, message: str) -> None:
+        """Waits for the user to press enter."""
+        input(message)
+
+
+class InquirerBackend(Backend):
+    """The original interface: tabulate's fancy_grid and inquirer2's interactive prompts."""
+
+    def table(self, rows: List[List[str]]) -> str:
+        import tabulate
+
+        return tabulate.tabulate(rows, tablefmt="fancy_grid")
+
+    def prompt(self, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        from inquirer2 import prompt
+
+        return prompt.prompt(questions)
+
+    def separator(self) -> Any:
+        from inquirer2 import Separator
+
+        return Separator()
+
+
+class _PlainSeparator:
+    pass
+
+
+class PlainBackend(Backend):
+    """Numbered menus read with input(), for scripted runs and terminals without a full TTY."""
+
+    def table(self, rows: List[List[str]]) -> str:
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = ["| " + " | ".join(cell.ljust(w) for cell, w in zip(row, widths)) + " |" for row in rows]
+        border = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+        return "\n".join([border, *lines, border])
+
+    def prompt(self, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Like inquirer2, stops at the end of input and leaves the unanswered questions out."""
+        answers = {}
+        for question in questions:
+            try:
+                if question["type"] == "checkbox":
+                    answers[question["name"]] = self._checkbox(question)
+                else:
+                    answers[question["name"]] = self._list(question)
+            except EOFError:
+                break
+        return answers
+
+    def pause(self, message: str) -> None:
+        try:
+            input(message)
+        except EOFError:
+            pass
+
+    def separator(self) -> Any:
+        return _PlainSeparator()
+
+    @staticmethod
+    def _numbered(choices) -> Dict[int, Dict[str, Any]]:
+        numbered = {}
+        for choice in choices:
+            if isinstance(choice, _PlainSeparator):
+                print("   ---")
+                continue
+            number = len(numbered) + 1
+            numbered[number] = choice
+            print(f"{number:>2}) {choice['name']}" + (f" ({choice['disabled']})" if choice.get("disabled") else ""))
+        return numbered
+
+    def _list(self, question: Dict[str, Any]) -> Any:
+        print(question["message"])
+        numbered = self._numbered(question["choices"])
+        while True:
+            reply = input("> ").strip()
+            choice = numbered.get(int(reply)) if reply.isdigit() else None
+            if choice is not None and not choice.get("disabled"):
+                return choice["value"]
+            print("Please enter the number of an available choice.")
+
+    def _checkbox(self, question: Dict[str, Any]) -> List[Any]:
+        print(question["message"])
+        choices = [c for c in question["choices"] if not isinstance(c, _PlainSeparator)]
+        for number, choice in enumerate(choices, 1):
+            print(f"{number:>2}) [{'x' if choice.get('checked') else ' '}] {choice['name']}")
+        while True:
+            reply = input("Numbers to select, separated by spaces (blank keeps the current selection): ").split()
+            if not reply:
+                return [c["value"] for c in choices if c.get("checked")]
+            if all(n.isdigit() and 1 <= int(n) <= len(choices) for n in reply):
+                return [choices[int(n) - 1]["value"] for n in sorted(set(reply), key=int)]
+            print("Please enter numbers from the list.")
+
+
+def default_backend() -> Backend:
+    """The inquirer backend when inquirer2 and tabulate are installed, otherwise the plain one."""
+    from importlib.util import find_spec
+
+    if find_spec("inquirer2") is not None and find_spec("tabulate") is not None:
+        return InquirerBackend()
+    return PlainBackend()
@@ -0,0 +1,222 @@
+"""
+Dice variants: any number of dice with any number of faces.
+
+A Variant enumerates its distinct hands and keeps combinatorially, as sorted tuples
+from combinations_with_replacement, and ranks a hand into its index with binomial
+coefficients, so nothing is ever built by going through every ordered roll. The one
+exception is a lookup from ordered roll code to hand index, which is only precomputed
+while there are at most ROLL_TABLE_LIMIT ordered rolls; beyond that each lookup ranks
+the hand directly.
+
+STANDARD is five six-sided dice and shares the tables in yahtzee.hands and yahtzee.keeps.
+Games and score tables work with any variant. The solver, strategy and snapshot files,
+odds, batch scoring and the vectorized environment are built for STANDARD only.
+
+Usage: python -m yahtzee.variant [DICE:FACES ...]
+"""
+import sys
+import time
+import tracemalloc
+from itertools import combinations_with_replacement
+from math import comb
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Sequence, Tuple
+
+from yahtzee import hands as standard_hands
+
+if TYPE_CHECKING:
+    from yahtzee.rules import Rule
+
+ROLL_TABLE_LIMIT = 1 << 16
+
+
+class Variant:
+    """The hands that dice_count dice with the given number of faces can show, and how to index them."""
+    dice: int
+    faces: int
+    places: Tuple[int, ...]
+    hands: Tuple[Tuple[int, ...], ...]
+    roll_to_hand: Optional[Tuple[int, ...]]
+
+    def __init__(self, dice: int, faces: int):
+        if dice < 1 or faces < 2:
+            raise ValueError('A variant needs at least one die and two faces.')
+        self.dice = dice
+        self.faces = faces
+        self.places = tuple(faces ** (dice - 1 - i) for i in range(dice))
+
+        # _before[m][v]: hands of m dice, all showing at least 1 and less than v, are skipped
+        # by putting v in the next sorted position; see hand_index.
+        self._before = []
+        for m in range(dice):
+            before = [0] * (faces + 2)
+            for v in range(1, faces + 1):
+                before[v + 1] = before[v] + comb(faces - v + m, m)
+            self._before.append(before)
+
+        if (dice, faces) == (standard_hands.DICE_COUNT, standard_hands.FACES):
+            self.hands = standard_hands.HANDS
+            self.roll_to_hand = standard_hands.ROLL_TO_HAND
+        else:
+            self.hands = tuple(combinations_with_replacement(range(1, faces + 1), dice))
+            self.roll_to_hand = None
+            if self.ordered_roll_count <= ROLL_TABLE_LIMIT:
+                self.roll_to_hand = tuple(self.hand_index(self.decode(code))
+                                          for code in range(self.ordered_roll_count))
+        self._keeps = None
+
+    def __repr__(self) -> str:
+        return f'Variant({self.dice}, {self.faces})'
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Variant) and (self.dice, self.faces) == (other.dice, other.faces)
+
+    def __hash__(self) -> int:
+        return hash((self.dice, self.faces))
+
+    def __reduce__(self):
+        return Variant, (self.dice, self.faces)
+
+    @property
+    def hand_count(self) -> int:
+        """Distinct hands: multisets of dice values, C(faces + dice - 1, dice)."""
+        return comb(self.faces + self.dice - 1, self.dice)
+
+    @property
+    def keep_count(self) -> int:
+        """Distinct keeps of 0 to dice values, C(faces + dice, dice)."""
+        return comb(self.faces + self.dice, self.dice)
+
+    @property
+    def ordered_roll_count(self) -> int:
+        return self.faces ** self.dice
+
+    def hand_index(self, dice_values: Sequence[int]) -> int:
+        """
+        Index into hands of the hand shown by the given dice, in any order.
+
+        Hands are in lexicographic order, so a hand's index is how many hands come before
+        it: for each sorted position, the hands that put a smaller value there.
+        """
+        index = 0
+        low = 1
+        remaining = self.dice
+        for value in sorted(dice_values):
+            remaining -= 1
+            before = self._before[remaining]
+            index += before[value] - before[low]
+            low = value
+        return index
+
+    def decode(self, code: int) -> Tuple[int, ...]:
+        """The ordered roll packed into code, first die most significant."""
+        return tuple(code // place % self.faces + 1 for place in self.places)
+
+    def roll_code(self, dice_values: Sequence[int]) -> int:
+        code = 0
+        for value in dice_values:
+            code = code * self.faces + value - 1
+        return code
+
+    def hand_of_code(self, code: int) -> int:
+        """Index into hands of an ordered roll code."""
+        if self.roll_to_hand is not None:
+            return self.roll_to_hand[code]
+        return self.hand_index(self.decode(code))
+
+    def keeps(self) -> Tuple[Tuple[int, ...], ...]:
+        """Every keep, largest first, so the first hand_count keeps are exactly hands (see yahtzee.keeps)."""
+        if self._keeps is None:
+            if self == STANDARD:
+                from yahtzee.keeps import KEEPS
+                self._keeps = KEEPS
+            else:
+                self._keeps = tuple(keep for size in range(self.dice, -1, -1)
+                                    for keep in combinations_with_replacement(range(1, self.faces + 1), size))
+        return self._keeps
+
+
+STANDARD = Variant(standard_hands.DICE_COUNT, standard_hands.FACES)
+
+
+def require_standard(variant: Variant, what: str) -> None:
+    """Raises ValueError unless the variant is five six-sided dice."""
+    if variant != STANDARD:
+        raise ValueError(f'{what} only supports {STANDARD.dice} {STANDARD.faces}-sided dice, not {variant}.')
+
+
+class TableReport(NamedTuple):
+    """What it takes to precompute the tables of a variant and rule set."""
+    variant: Variant
+    rules: int
+    hands: int
+    keeps: int
+    ordered_rolls: int
+    roll_table: bool
+    build_seconds: float
+    table_bytes: int
+    strategy_bytes: int
+
+
+def table_report(variant: Variant, rules: Optional[List['Rule']] = None) -> TableReport:
+    """
+    Builds the variant's hands, keeps and score table for the rules (variant_rules by
+    default) from scratch, and reports how long that took and the memory the results
+    hold, along with the size a strategy file for them would be (see yahtzee.strategy_file).
+    STANDARD's hands and keeps are shared with yahtzee.hands and yahtzee.keeps, so they
+    aren't counted for it.
+    """
+    from yahtzee.rules import variant_rules
+    from yahtzee.scoring import ScoreTable
+
+    if rules is None:
+        rules = variant_rules(variant.dice, variant.faces)
+
+    def build():
+        built = Variant(variant.dice, variant.faces)
+        built.keeps()
+        return built, ScoreTable(rules, built)
+
+    start = time.perf_counter()
+    build()
+    build_seconds = time.perf_counter() - start
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    table_bytes = tracemalloc.get_traced_memory()[0] - before
+    if not tracing:
+        tracemalloc.stop()
+    del built
+
+    states = 1 << len(rules)
+    strategy_bytes = states * (4 + variant.hand_count * (1 + 2 * 2))
+    return TableReport(variant, len(rules), variant.hand_count, variant.keep_count, variant.ordered_roll_count,
+                       variant.ordered_roll_count <= ROLL_TABLE_LIMIT, build_seconds, table_bytes, strategy_bytes)
+
+
+def parse_variant(text: str) -> Variant:
+    """A variant written as DICE:FACES, e.g. 6:8."""
+    dice, _, faces = text.partition(':')
+    return Variant(int(dice), int(faces or 6))
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    variants = [parse_variant(arg) for arg in argv] or [
+        STANDARD, Variant(6, 6), Variant(5, 8), Variant(6, 8), Variant(5, 10), Variant(7, 12)]
+
+    print(f'{"variant":>8} {"rules":>5} {"hands":>8} {"keeps":>8} {"ordered rolls":>14} '
+          f'{"build":>10} {"memory":>12} {"strategy file":>14}')
+    for variant in variants:
+        report = table_report(variant)
+        print(f'{variant.dice:>5}d{variant.faces:<2} {report.rules:>5} {report.hands:>8,} {report.keeps:>8,} '
+              f'{report.ordered_rolls:>12,}{"*" if report.roll_table else " "} '
+              f'{report.build_seconds * 1000:>8.1f}ms {report.table_bytes / 2 ** 20:>8.2f} MiB '
+              f'{report.strategy_bytes / 2 ** 20:>10.1f} MiB')
+    print('* ordered roll lookup is precomputed')
+
+
+if __name__ == '__main__':
+    main()
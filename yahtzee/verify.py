@@ -0,0 +1,260 @@
+"""
+Exhaustive differential verification of the fast scoring paths against the rules.
+
+Rule.calculate_value is the reference, through Rule.score so that RuleNotMetError
+scores 0. Every other way the code base scores dice is a Scorer, and each one is run on
+every ordered roll (7776 for five six-sided dice) and every hand (the 252 multisets),
+for every rule, and compared with the reference value by value. Scorers are checked in
+parallel across a process pool, after the reference itself is computed there a rule at
+a time.
+
+For each scorer and rule that disagree, the report counts the mismatches and keeps the
+minimal one: the smallest hand, as sorted dice, and the smallest ordering of it, so a
+sorted hand is shown whenever the hand itself fails.
+
+New fast paths get checked by adding them to SCORERS. A run takes about a second, so
+run it before benchmarking a change: python -m benchmarks --verify.
+
+Usage: python -m yahtzee.verify [--variant DICE:FACES] [--workers W] [--scorer NAME ...]
+"""
+import argparse
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from yahtzee import batch
+from yahtzee.game import Game
+from yahtzee.hands import hand_index
+from yahtzee.rules import Rule, variant_rules
+from yahtzee.scoring import ScoreTable
+from yahtzee.variant import STANDARD, Variant, parse_variant
+
+# Every ordered roll is held as a tuple, so this bounds the memory a run takes.
+MAX_CASES = 1 << 20
+
+Dice = Tuple[int, ...]
+
+
+class Scorer(NamedTuple):
+    """
+    An alternate way of scoring dice: score(table, cases) returns one row per case, with
+    the score of every rule in the table in column order.
+    """
+    name: str
+    score: Callable[[ScoreTable, Sequence[Dice]], Sequence[Sequence[int]]]
+    standard_only: bool = False
+    needs_numpy: bool = False
+
+
+class Mismatch(NamedTuple):
+    """The minimal case on which a scorer disagrees with a rule, and how many cases do."""
+    scorer: str
+    rule: str
+    dice: Dice
+    expected: int
+    actual: int
+    count: int
+
+
+class VerificationReport(NamedTuple):
+    variant: Variant
+    rules: Tuple[str, ...]
+    cases: int
+    scorers: Tuple[str, ...]
+    mismatches: Tuple[Mismatch, ...]
+    errors: Dict[str, str]
+    skipped: Dict[str, str]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches and not self.errors
+
+
+def _sorted_dice(table: ScoreTable, cases: Sequence[Dice]) -> List[List[int]]:
+    # Every table-based path assumes a rule doesn't care about the order of the dice.
+    rules = table.rules
+    return [[rule.score(sorted(dice)) for rule in rules] for dice in cases]
+
+
+def _score_table(table: ScoreTable, cases: Sequence[Dice]) -> List[List[int]]:
+    rows, index = table.rows, table.variant.hand_index
+    return [rows[index(dice)].tolist() for dice in cases]
+
+
+def _roll_table(table: ScoreTable, cases: Sequence[Dice]) -> List[List[int]]:
+    rows, variant = table.rows, table.variant
+    return [rows[variant.hand_of_code(variant.roll_code(dice))].tolist() for dice in cases]
+
+
+def _hand_index(table: ScoreTable, cases: Sequence[Dice]) -> List[List[int]]:
+    rows = table.rows
+    return [rows[hand_index(dice)].tolist() for dice in cases]
+
+
+def _game(table: ScoreTable, cases: Sequence[Dice]) -> List[List[int]]:
+    game = Game(table)
+    state, controllers, roll_code = game.state, game.rule_controllers, table.variant.roll_code
+    scores = []
+    for dice in cases:
+        state.dice = roll_code(dice)
+        scores.append([rc.calculate_value() for rc in controllers])
+    return scores
+
+
+def _batch_python(table: ScoreTable, cases: Sequence[Dice]) -> List[List[int]]:
+    return batch.score_batch(cases, table, use_numpy=False)
+
+
+def _batch_numpy(table: ScoreTable, cases: Sequence[Dice]) -> List[List[int]]:
+    return batch.score_batch(batch.np.array(cases), table, use_numpy=True).tolist()
+
+
+def _vector_env(table: ScoreTable, cases: Sequence[Dice]) -> List[List[int]]:
+    # A rule locked first in a fresh game earns no bonus, so the reward is its score.
+    from yahtzee.env import VectorEnv
+
+    np = batch.np
+    env = VectorEnv(len(cases), table, seed=0)
+    dice = np.array(cases, dtype=np.int8)
+    columns = []
+    for column in range(len(table.rules)):
+        env.reset()
+        env.dice = dice
+        columns.append(env.step(np.full(len(cases), VectorEnv.lock_action(column)))[1])
+    return np.stack(columns, axis=1).tolist()
+
+
+SCORERS: Dict[str, Scorer] = {scorer.name: scorer for scorer in [
+    Scorer('sorted_dice', _sorted_dice),
+    Scorer('score_table', _score_table),
+    Scorer('roll_table', _roll_table),
+    Scorer('hand_index', _hand_index, standard_only=True),
+    Scorer('game', _game),
+    Scorer('batch_python', _batch_python, standard_only=True),
+    Scorer('batch_numpy', _batch_numpy, standard_only=True, needs_numpy=True),
+    Scorer('vector_env', _vector_env, standard_only=True, needs_numpy=True),
+]}
+
+
+class _Cases:
+    """What every task of a run works from: the rules, their score table and the cases."""
+    rules: List[Rule]
+    table: ScoreTable
+    cases: List[Dice]
+
+    def __init__(self, rules: Sequence[Rule], variant: Variant):
+        self.rules = list(rules)
+        self.table = ScoreTable(rules, variant)
+        self.cases = [variant.decode(code) for code in range(variant.ordered_roll_count)]
+        self.cases += variant.hands
+
+
+# Set in each worker process by _attach.
+_worker: Optional[_Cases] = None
+
+
+def _attach(rules: Sequence[Rule], variant: Variant) -> None:
+    global _worker
+    _worker = _Cases(rules, variant)
+
+
+def _reference(column: int) -> array:
+    rule = _worker.rules[column]
+    return array('H', [rule.score(list(dice)) for dice in _worker.cases])
+
+
+def _check(args: Tuple[Scorer, List[array]]) -> Tuple[str, List[Mismatch], Optional[str]]:
+    """Runs one scorer on every case and compares it with the reference columns."""
+    scorer, reference = args
+    cases = _worker.cases
+    try:
+        rows = scorer.score(_worker.table, cases)
+        if len(rows) != len(cases):
+            raise ValueError(f'{len(rows)} rows for {len(cases)} cases.')
+        mismatches = []
+        for column, (rule, expected) in enumerate(zip(_worker.rules, reference)):
+            actual = [row[column] for row in rows]
+            bad = [i for i, (e, a) in enumerate(zip(expected, actual)) if e != a]
+            if bad:
+                i = min(bad, key=lambda i: (sorted(cases[i]), cases[i]))
+                mismatches.append(Mismatch(scorer.name, rule.name, cases[i], expected[i], actual[i], len(bad)))
+    except Exception as e:
+        return scorer.name, [], f'{type(e).__name__}: {e}'
+    return scorer.name, mismatches, None
+
+
+def verify(rules: Optional[Sequence[Rule]] = None, variant: Variant = STANDARD,
+           scorers: Optional[Sequence[Scorer]] = None, workers: Optional[int] = None) -> VerificationReport:
+    """
+    Checks every scorer (all of SCORERS by default) against the rules (variant_rules of
+    the variant by default) on every ordered roll and hand. Scorers that don't support
+    the variant, or need NumPy when it isn't installed, are skipped and reported as such.
+    With workers=1 everything runs in this process; otherwise on a pool, one per CPU by default.
+    """
+    start = time.perf_counter()
+    rules = list(rules) if rules is not None else variant_rules(variant.dice, variant.faces)
+    if variant.ordered_roll_count + variant.hand_count > MAX_CASES:
+        raise ValueError(f'{variant} has too many ordered rolls to check them all.')
+
+    skipped = {}
+    checked = []
+    for scorer in (scorers if scorers is not None else SCORERS.values()):
+        if scorer.standard_only and variant != STANDARD:
+            skipped[scorer.name] = f'only supports {STANDARD}'
+        elif scorer.needs_numpy and batch.np is None:
+            skipped[scorer.name] = 'NumPy is not installed'
+        else:
+            checked.append(scorer)
+
+    if workers == 1:
+        _attach(rules, variant)
+        reference = [_reference(column) for column in range(len(rules))]
+        results = [_check((scorer, reference)) for scorer in checked]
+    else:
+        with Pool(workers, initializer=_attach, initargs=(rules, variant)) as pool:
+            reference = pool.map(_reference, range(len(rules)))
+            results = pool.map(_check, [(scorer, reference) for scorer in checked])
+
+    mismatches = tuple(m for _, found, _ in results for m in found)
+    errors = {name: error for name, _, error in results if error is not None}
+    cases = variant.ordered_roll_count + variant.hand_count
+    return VerificationReport(variant, tuple(rule.name for rule in rules), cases,
+                              tuple(scorer.name for scorer in checked), mismatches, errors, skipped,
+                              time.perf_counter() - start)
+
+
+def format_report(report: VerificationReport) -> str:
+    variant = report.variant
+    lines = [f'{len(report.scorers)} scorers x {len(report.rules)} rules x {report.cases:,} cases '
+             f'({variant.ordered_roll_count:,} ordered rolls of {variant.dice}d{variant.faces} '
+             f'and {variant.hand_count:,} hands) in {report.seconds:.2f}s']
+    for name, reason in report.skipped.items():
+        lines.append(f'  skipped {name}: {reason}')
+    for name, error in report.errors.items():
+        lines.append(f'  ERROR   {name}: {error}')
+    for m in report.mismatches:
+        lines.append(f'  MISMATCH {m.scorer} on {m.rule}: {m.count:,} cases, e.g. {list(m.dice)} '
+                     f'scores {m.actual}, expected {m.expected}')
+    lines.append('OK' if report.ok else 'FAILED')
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Check every fast scoring path against the rules on every roll.')
+    parser.add_argument('--variant', type=parse_variant, default=STANDARD, metavar='DICE:FACES')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--scorer', action='append', choices=sorted(SCORERS),
+                        help='check only this scorer (repeatable); all of them by default')
+    args = parser.parse_args(argv)
+
+    scorers = [SCORERS[name] for name in args.scorer] if args.scorer else None
+    report = verify(variant=args.variant, scorers=scorers, workers=args.workers)
+    print(format_report(report))
+    return 0 if report.ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())